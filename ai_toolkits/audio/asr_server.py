@@ -0,0 +1,328 @@
+"""
+Local stand-in for the Tencent real-time ASR WebSocket service.
+
+The server speaks the subset of the protocol ``TencentASR`` relies on:
+
+1. on connect it sends the authentication handshake ``{"code": 0, ...}``
+2. binary PCM messages are segmented with a simple energy VAD; every detected
+   utterance produces a ``slice_type=0`` start, periodic ``slice_type=1``
+   partials and a ``slice_type=2`` end result once ``vad_silence_time`` ms of
+   silence have been received
+3. the text message ``{"type": "end"}`` flushes the open utterance and is
+   answered with the final completion frame ``{"code": 0, "final": 1}``
+
+Recognition latency, jitter and connection drops are configurable so the
+voice pipeline can be load-tested without Tencent Cloud credentials.
+
+Run standalone with::
+
+    python -m ai_toolkits.audio.asr_server --port 8765 --delay-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import urllib.parse
+from typing import Callable, Optional
+from uuid import uuid4
+
+import numpy as np
+import websockets
+
+logger = logging.getLogger(__name__)
+
+FILLER_WORDS = ["今天", "天气", "怎么样", "我们", "明天", "开会", "讨论", "一下", "项目", "进展"]
+
+
+def default_transcript(index: int, duration_ms: int) -> str:
+    """
+    Produce a deterministic transcript for the ``index``-th utterance.
+
+    The text grows with the amount of speech heard so far, so partial results
+    are prefixes of the final result, like a real recognizer.
+    """
+    words = [FILLER_WORDS[(index + i) % len(FILLER_WORDS)] for i in range(duration_ms // 250)]
+    return f"utterance {index}: " + " ".join(words)
+
+
+class _Session:
+    """Recognition state of one WebSocket connection."""
+
+    def __init__(self, server: "LocalASRServer", websocket, path: str):
+        params = urllib.parse.parse_qs(urllib.parse.urlparse(path).query)
+        engine = params.get("engine_model_type", ["8k_zh"])[0]
+
+        self.server = server
+        self.websocket = websocket
+        self.voice_id = params.get("voice_id", [uuid4().hex])[0]
+        self.vad_silence_ms = int(params.get("vad_silence_time", ["1000"])[0])
+        self.sampling_rate = 16000 if engine.startswith("16k") else 8000
+
+        self.position_ms = 0.0
+        self.in_speech = False
+        self.utterance_index = 0
+        self.speech_start_ms = 0.0
+        self.last_voice_ms = 0.0
+        self.last_partial_ms = 0.0
+        self.message_count = 0
+
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.last_due = 0.0
+
+    def _result(self, slice_type: int, end_ms: float) -> dict:
+        duration_ms = int(end_ms - self.speech_start_ms)
+        self.message_count += 1
+        return {
+            "code": 0,
+            "message": "success",
+            "voice_id": self.voice_id,
+            "message_id": f"{self.voice_id}_{self.message_count}",
+            "result": {
+                "slice_type": slice_type,
+                "index": self.utterance_index,
+                "start_time": int(self.speech_start_ms),
+                "end_time": int(end_ms),
+                "voice_text_str": self.server.transcript_fn(self.utterance_index, duration_ms),
+                "word_size": 0,
+                "word_list": [],
+            },
+        }
+
+    def schedule(self, message: dict) -> None:
+        """Queue a message for delivery after the simulated recognition delay."""
+        loop = asyncio.get_running_loop()
+        delay = self.server.recognition_delay_ms + random.uniform(-1, 1) * self.server.jitter_ms
+        # Jitter never reorders messages, a later result is never sent first.
+        due = max(loop.time() + max(delay, 0) / 1000, self.last_due)
+        self.last_due = due
+        self.outbox.put_nowait((due, json.dumps(message, ensure_ascii=False)))
+
+    def feed_audio(self, audio: bytes) -> None:
+        samples = np.frombuffer(audio[: len(audio) - len(audio) % 2], dtype="<i2")
+        if samples.size == 0:
+            return
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+        chunk_end_ms = self.position_ms + samples.size * 1000 / self.sampling_rate
+
+        if rms >= self.server.energy_threshold:
+            if not self.in_speech:
+                self.in_speech = True
+                self.speech_start_ms = self.position_ms
+                self.last_partial_ms = self.position_ms
+                self.schedule(self._result(0, chunk_end_ms))
+            self.last_voice_ms = chunk_end_ms
+            if chunk_end_ms - self.last_partial_ms >= self.server.partial_interval_ms:
+                self.last_partial_ms = chunk_end_ms
+                self.schedule(self._result(1, chunk_end_ms))
+        elif self.in_speech and chunk_end_ms - self.last_voice_ms >= self.vad_silence_ms:
+            self.end_utterance()
+
+        self.position_ms = chunk_end_ms
+
+    def end_utterance(self) -> None:
+        if not self.in_speech:
+            return
+        self.schedule(self._result(2, self.last_voice_ms))
+        self.in_speech = False
+        self.utterance_index += 1
+
+    def finish(self) -> None:
+        self.end_utterance()
+        self.message_count += 1
+        self.schedule({
+            "code": 0,
+            "message": "success",
+            "voice_id": self.voice_id,
+            "message_id": f"{self.voice_id}_{self.message_count}",
+            "final": 1,
+        })
+        self.outbox.put_nowait(None)
+
+
+class LocalASRServer:
+    """
+    Local WebSocket server emulating the Tencent real-time ASR protocol.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind, ``0`` picks a free port
+        recognition_delay_ms: Delay between hearing audio and sending its result
+        jitter_ms: Uniform +/- jitter applied to ``recognition_delay_ms``
+        partial_interval_ms: Audio time between two ``slice_type=1`` partials
+        energy_threshold: RMS level (int16 scale) above which a chunk is speech
+        disconnect_after_s: Drop every connection after this many seconds
+        disconnect_probability: Probability of dropping the connection on each
+            received audio message
+        max_sessions: Concurrent connection limit (an account quota); further
+            connections are refused with a non-zero ``code``
+        transcript_fn: ``(utterance_index, duration_ms) -> str`` text generator
+
+    Example:
+        async with LocalASRServer(recognition_delay_ms=80) as server:
+            asr = TencentASR(base_url=server.base_url)
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 recognition_delay_ms: float = 50,
+                 jitter_ms: float = 0,
+                 partial_interval_ms: float = 200,
+                 energy_threshold: float = 500,
+                 disconnect_after_s: Optional[float] = None,
+                 disconnect_probability: float = 0.0,
+                 max_sessions: Optional[int] = None,
+                 transcript_fn: Callable[[int, int], str] = default_transcript):
+        self.host = host
+        self.port = port
+        self.recognition_delay_ms = recognition_delay_ms
+        self.jitter_ms = jitter_ms
+        self.partial_interval_ms = partial_interval_ms
+        self.energy_threshold = energy_threshold
+        self.disconnect_after_s = disconnect_after_s
+        self.disconnect_probability = disconnect_probability
+        self.max_sessions = max_sessions
+        self.active_sessions = 0
+        self.transcript_fn = transcript_fn
+
+        self.stats = {
+            "connections": 0,
+            "audio_messages": 0,
+            "audio_bytes": 0,
+            "results_sent": 0,
+            "disconnects": 0,
+            "rejected": 0,
+        }
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to ``TencentASR(base_url=...)``."""
+        return f"ws://{self.host}:{self.port}/asr/v2/0?"
+
+    async def start(self) -> "LocalASRServer":
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+        logger.info(f"Local ASR server listening on {self.base_url}")
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.stop()
+
+    async def __aenter__(self) -> "LocalASRServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _handle(self, websocket, path: str = None) -> None:
+        # websockets >= 14 passes only the connection, older versions pass the path too
+        request = getattr(websocket, "request", None)
+        path = path or (request.path if request is not None else getattr(websocket, "path", ""))
+
+        if self.max_sessions is not None and self.active_sessions >= self.max_sessions:
+            self.stats["rejected"] += 1
+            await websocket.send(json.dumps({"code": 4000, "message": "concurrency limit exceeded"}))
+            await websocket.close()
+            return
+
+        self.stats["connections"] += 1
+        self.active_sessions += 1
+        session = _Session(self, websocket, path)
+        await websocket.send(json.dumps({"code": 0, "message": "success", "voice_id": session.voice_id}))
+
+        sender = asyncio.create_task(self._send_results(session))
+        deadline = None
+        if self.disconnect_after_s is not None:
+            deadline = asyncio.get_running_loop().time() + self.disconnect_after_s
+
+        try:
+            async for message in websocket:
+                if isinstance(message, (bytes, bytearray)):
+                    self.stats["audio_messages"] += 1
+                    self.stats["audio_bytes"] += len(message)
+                    if self._should_disconnect(deadline):
+                        self.stats["disconnects"] += 1
+                        await websocket.close(code=1011, reason="simulated disconnect")
+                        break
+                    session.feed_audio(message)
+                    continue
+
+                try:
+                    data = json.loads(message)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("type") == "end":
+                    session.finish()
+                    await sender
+                    await websocket.close()
+                    break
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.active_sessions -= 1
+            if not sender.done():
+                sender.cancel()
+
+    def _should_disconnect(self, deadline: Optional[float]) -> bool:
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            return True
+        return self.disconnect_probability > 0 and random.random() < self.disconnect_probability
+
+    async def _send_results(self, session: _Session) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await session.outbox.get()
+            if item is None:
+                return
+            due, payload = item
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await session.websocket.send(payload)
+            except websockets.exceptions.ConnectionClosed:
+                return
+            self.stats["results_sent"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Tencent ASR WebSocket stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=float, default=50, help="recognition delay")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="+/- jitter on the delay")
+    parser.add_argument("--disconnect-after", type=float, default=None, help="drop connections after N seconds")
+    parser.add_argument("--disconnect-probability", type=float, default=0.0, help="drop probability per audio message")
+    parser.add_argument("--max-sessions", type=int, default=None, help="refuse connections above this many")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = LocalASRServer(
+        host=args.host,
+        port=args.port,
+        recognition_delay_ms=args.delay_ms,
+        jitter_ms=args.jitter_ms,
+        disconnect_after_s=args.disconnect_after,
+        disconnect_probability=args.disconnect_probability,
+        max_sessions=args.max_sessions,
+    )
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
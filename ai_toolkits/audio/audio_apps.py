@@ -1,15 +1,20 @@
 from ai_toolkits.audio.real_time import RealTimeTask
 from ai_toolkits.audio.tencent_asr import TencentASR
 from ai_toolkits.audio.microphone import MicrophoneClient
+from ai_toolkits.audio.file_reader import FileAudioReader
 from ai_toolkits.audio.text_processor import (
     TranslateTextHandler, 
     ShortAnswerTextHandler,
     ConversationHandler,
     ConversationStreamHandler,
     SpeakOutStreamHandler,
-    NotetalkingTextHandler
+    NotetalkingTextHandler,
+    LiveCaptionTextHandler
 )
-from openai import AsyncClient
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import AsyncClient
 
 def create_translator() -> RealTimeTask:
     translation_handler = TranslateTextHandler()
@@ -28,8 +33,29 @@ def create_stateless_conversation_bot() -> RealTimeTask:
         trace_conversation=False
     )
     return task
+
+
+def create_file_transcriber(source, speed: float = None) -> RealTimeTask:
+    """Transcribe WAV/PCM files (a path, directory or glob) instead of the microphone."""
+    task = RealTimeTask(
+        audio_input_provider=FileAudioReader(source, speed=speed),
+        text_handler=NotetalkingTextHandler(),
+        trace_conversation=False
+    )
+    return task
     
 
+def create_live_captioner(duration_seconds: int = 120) -> RealTimeTask:
+    """Show interim transcripts as live captions while the user speaks."""
+    task = RealTimeTask(
+        audio_input_provider=MicrophoneClient(duration=duration_seconds),
+        text_handler=LiveCaptionTextHandler(),
+        stt_service=TencentASR(vad_silence=1000, stream_partials=True),
+        trace_conversation=False
+    )
+    return task
+
+
 def create_note_taking_bot(duration_seconds: int = 120) -> RealTimeTask:
     handler = NotetalkingTextHandler()
     task = RealTimeTask(
@@ -57,18 +83,21 @@ def create_conversation_bot(system_prmopt:str = None) -> RealTimeTask:
 
 def create_streaming_conversation_bot(
     system_prmopt:str = None, 
-    duration_seconds: int = 120) -> RealTimeTask:
+    duration_seconds: int = 120,
+    speculative: bool = False,
+    barge_in: bool = False) -> RealTimeTask:
     
     if system_prmopt is None:
         system_prmopt = "You are a helpful assistant, You provide concise and colloquial style answers."
         
     
-    conversation_handler = ConversationStreamHandler(system_prompt=system_prmopt)
+    conversation_handler = ConversationStreamHandler(
+        system_prompt=system_prmopt, speculative=speculative, barge_in=barge_in)
     
     task = RealTimeTask(
         audio_input_provider=MicrophoneClient(duration=duration_seconds),
         text_handler=conversation_handler,
-        stt_service=TencentASR(vad_silence=1800),
+        stt_service=TencentASR(vad_silence=1800, stream_partials=speculative or barge_in),
         trace_conversation=False
     )
     return task
@@ -78,7 +107,7 @@ def create_streaming_conversation_bot_qwen3(
     system_prmopt:str = None,
     duration_seconds: int = 120,
     extra_body: dict = None,
-    async_client:AsyncClient = None,
+    async_client:'AsyncClient' = None,
     create_trace:bool = True
     ) -> RealTimeTask:
     
@@ -104,18 +133,19 @@ def create_streaming_conversation_bot_qwen3(
 
 def create_siri_bot(
     system_prmopt:str = None, 
-    duration_seconds: int = 120) -> RealTimeTask:
+    duration_seconds: int = 120,
+    barge_in: bool = False) -> RealTimeTask:
     
     if system_prmopt is None:
         system_prmopt = "You are a helpful assistant, You provide concise and colloquial style answers."
         
     
-    conversation_handler = SpeakOutStreamHandler(system_prompt=system_prmopt)
+    conversation_handler = SpeakOutStreamHandler(system_prompt=system_prmopt, barge_in=barge_in)
     
     task = RealTimeTask(
         audio_input_provider=MicrophoneClient(duration=duration_seconds),
         text_handler=conversation_handler,
-        stt_service=TencentASR(vad_silence=1000),
+        stt_service=TencentASR(vad_silence=1000, stream_partials=barge_in),
         trace_conversation=False
     )
     return task
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+Audio format description, G.711 decoding and vectorized resampling.
+
+Audio sources describe what they produce with an ``AudioFormat``;
+``negotiate_engine`` picks the Tencent engine (8k or 16k) that fits the
+source best and ``AudioConverter`` turns the source stream into the 16-bit
+mono PCM that engine expects. All conversions work on whole buffers with
+NumPy, never sample by sample in Python.
+"""
+
+from dataclasses import dataclass
+from math import gcd
+from typing import Literal, Tuple
+
+import numpy as np
+
+Encoding = Literal["pcm_s16le", "mulaw", "alaw"]
+
+ENGINE_SAMPLING_RATES = {"8k": 8000, "16k": 16000}
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """
+    Format of an audio byte stream.
+
+    Attributes:
+        sample_rate: Samples per second per channel
+        encoding: ``pcm_s16le`` (16-bit little-endian PCM), ``mulaw`` or ``alaw`` (G.711)
+        channels: Number of interleaved channels
+    """
+    sample_rate: int = 8000
+    encoding: Encoding = "pcm_s16le"
+    channels: int = 1
+
+    @property
+    def bytes_per_sample(self) -> int:
+        return 2 if self.encoding == "pcm_s16le" else 1
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.sample_rate * self.channels * self.bytes_per_sample
+
+
+def _build_mulaw_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(u & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_alaw_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (a >> 4) & 0x07
+    mantissa = a & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0))
+    return np.where(a & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+MULAW_TABLE = _build_mulaw_table()
+ALAW_TABLE = _build_alaw_table()
+
+
+def decode_g711(data: bytes, encoding: Literal["mulaw", "alaw"]) -> np.ndarray:
+    """Decode G.711 mu-law/A-law bytes to int16 samples with a table lookup."""
+    table = MULAW_TABLE if encoding == "mulaw" else ALAW_TABLE
+    return table[np.frombuffer(data, dtype=np.uint8)]
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (``to_rate / from_rate = L / M``).
+
+    A windowed-sinc low-pass prototype is split into ``L`` polyphase branches.
+    Each output sample is a dot product of one branch with the most recent
+    input samples; all outputs of a buffer are computed at once with a
+    gathered index matrix. Filter history is kept between calls so chunk
+    boundaries are seamless.
+
+    ``taps_per_phase`` is the filter length in units of the slower rate, so
+    the anti-aliasing filter stays equally sharp for large decimation factors.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int, taps_per_phase: int = 24, block_size: int = 65536):
+        divisor = gcd(from_rate, to_rate)
+        self.up = to_rate // divisor
+        self.down = from_rate // divisor
+        self.taps = -(-taps_per_phase * max(self.up, self.down) // self.up)
+        self.block_size = block_size
+
+        n = self.up * self.taps
+        cutoff = 0.5 / max(self.up, self.down) * 0.9
+        t = np.arange(n) - (n - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, 8.0) * self.up
+        # phases[p, j] = prototype[p + j * up]
+        self.phases = prototype.reshape(self.taps, self.up).T.astype(np.float32).copy()
+
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0
+        self._produced = 0
+
+    def reset(self) -> None:
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0
+        self._produced = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next block of samples, returning float32 output."""
+        buffer = np.concatenate([self._history, samples.astype(np.float32, copy=False)])
+        base = self._consumed - self._history.size
+        total_in = self._consumed + samples.size
+        end = (total_in * self.up - 1) // self.down + 1 if total_in else 0
+
+        outputs = []
+        offsets = np.arange(self.taps)
+        for start in range(self._produced, end, self.block_size):
+            k = np.arange(start, min(start + self.block_size, end), dtype=np.int64)
+            upsampled = k * self.down
+            phase = upsampled % self.up
+            index = (upsampled // self.up - base)[:, None] - offsets[None, :]
+            outputs.append(np.einsum("kt,kt->k", buffer[index], self.phases[phase]))
+
+        self._produced = max(end, self._produced)
+        self._consumed = total_in
+        self._history = buffer[buffer.size - (self.taps - 1):]
+        if not outputs:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(outputs)
+
+
+class AudioConverter:
+    """
+    Convert a stream of ``source`` audio to 16-bit mono PCM at ``target_rate``.
+
+    Decodes G.711, down-mixes channels and resamples; chunks may be of any
+    size, partial samples are carried over to the next call.
+    """
+
+    def __init__(self, source: AudioFormat, target_rate: int):
+        self.source = source
+        self.target_rate = target_rate
+        self._frame_bytes = source.bytes_per_sample * source.channels
+        self._carry = b""
+        self._resampler = None
+        if source.sample_rate != target_rate:
+            self._resampler = PolyphaseResampler(source.sample_rate, target_rate)
+
+    @property
+    def is_passthrough(self) -> bool:
+        return (self.source.encoding == "pcm_s16le"
+                and self.source.channels == 1
+                and self.source.sample_rate == self.target_rate)
+
+    def convert(self, data: bytes) -> bytes:
+        if self.is_passthrough:
+            return data
+
+        data = self._carry + data
+        usable = len(data) - len(data) % self._frame_bytes
+        data, self._carry = data[:usable], data[usable:]
+
+        if self.source.encoding == "pcm_s16le":
+            samples = np.frombuffer(data, dtype="<i2")
+        else:
+            samples = decode_g711(data, self.source.encoding)
+
+        if self.source.channels > 1:
+            samples = samples.reshape(-1, self.source.channels).mean(axis=1)
+
+        if self._resampler is not None:
+            samples = np.clip(np.rint(self._resampler.process(samples)), -32768, 32767)
+        return samples.astype("<i2").tobytes()
+
+
+def negotiate_engine(source: AudioFormat, language: str = "zh") -> Tuple[str, int]:
+    """
+    Pick the Tencent engine model for a source format.
+
+    Sources sampled at 16 kHz or more use the 16k engine (downsampled if
+    needed); everything below, including 8 kHz telephony G.711, uses the
+    8k engine so no bandwidth is wasted on upsampling.
+
+    Returns:
+        Tuple[str, int]: ``engine_model_type`` (e.g. ``16k_zh``) and its sampling rate.
+    """
+    engine = "16k" if source.sample_rate >= ENGINE_SAMPLING_RATES["16k"] else "8k"
+    return f"{engine}_{language}", ENGINE_SAMPLING_RATES[engine]
@@ -1,7 +1,12 @@
 import logging
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Any, Optional, Union, Protocol
 import asyncio
+from .types import StreamTextInputFrame, TextInputFrame
+from .trace import TraceWriter
+from .latency import LatencyRecorder, monotonic_ms, stage_durations
 
 class AudioStreamReader(Protocol):
     async def receive_audio(self) -> None:
@@ -15,45 +20,261 @@ class BaseSTT(Protocol):
         ...
           
 class BaseTextHandler:
+    """
+    Consume transcripts from the text queue and pass sentences to ``do_process``.
     
-    def __init__(self, text_queue:asyncio.Queue = None):
+    With ``barge_in`` enabled, ``do_process`` runs as a task while the queue
+    is still read. New speech (a partial, a VAD start or another sentence)
+    cancels the running reply; ``do_process`` implementations should catch
+    ``asyncio.CancelledError`` to clean up (stop playback, record the
+    truncated reply) and re-raise.
+    
+    With a ``TraceWriter`` bound (``bind_trace``) every utterance is written
+    as one trace record when it is done. ``do_process`` implementations stamp
+    pipeline stages with ``mark`` (``llm_first_token``, ``llm_done``,
+    ``first_audio``) and add token counts with ``note_turn``. The stage
+    durations go into the trace record and, with a ``LatencyRecorder`` bound
+    (``bind_latency``), into its histograms.
+    """
+    barge_in: bool = False
+    merge_window_ms: float = 0
+    max_wait_ms: float = 1000
+    
+    def __init__(self, 
+                 text_queue:asyncio.Queue = None,
+                 merge_window_ms: Optional[float] = None,
+                 max_wait_ms: Optional[float] = None):
         self.text_queue = text_queue or asyncio.Queue()
         self.logger = logging.getLogger(self.__class__.__name__)
+        if merge_window_ms is not None:
+            self.merge_window_ms = merge_window_ms
+        if max_wait_ms is not None:
+            self.max_wait_ms = max_wait_ms
+        self.utterance_stats = []
+        self.barge_ins = 0
+        self.barge_in_latencies_ms = []
+        self._pending = deque()
+        self.trace: Optional[TraceWriter] = None
+        self.latency: Optional[LatencyRecorder] = None
+        self.current_turn = {}
+        self.current_marks = {}
         
     def bind_text_queue(self, text_queue:asyncio.Queue):
         self.text_queue = text_queue
         
+    def bind_trace(self, trace: Optional[TraceWriter]):
+        self.trace = trace
+        
+    def bind_latency(self, latency: Optional[LatencyRecorder]):
+        self.latency = latency
+        
+    def note_turn(self, **values) -> None:
+        """Add values to the trace record of the utterance being processed."""
+        self.current_turn.update(values)
+        
+    def mark(self, stage: str, at_ms: Optional[float] = None) -> None:
+        """
+        Stamp a pipeline stage of the utterance being processed.
+        
+        Args:
+            stage: Mark name, see ``latency.UTTERANCE_STAGES``
+            at_ms: ``time.monotonic()`` timestamp in ms, now by default
+        
+        The trace record gets the epoch time as ``{stage}_ms``.
+        """
+        now = monotonic_ms()
+        at_ms = now if at_ms is None else at_ms
+        self.current_marks[stage] = at_ms
+        self.current_turn[f"{stage}_ms"] = time.time() * 1000 - (now - at_ms)
+        
     @abstractmethod
     async def do_process(self, text: str) -> str:
         raise NotImplementedError("Subclasses must implement this method")
+    
+    async def close(self) -> None:
+        """Release resources held by the handler; called by ``RealTimeTask`` when the session ends."""
+    
+    async def on_partial(self, frame: StreamTextInputFrame) -> None:
+        """
+        Called for interim ASR hypotheses when the STT service streams partials.
+        
+        ``frame.stable_text`` is the part unlikely to change. The finished
+        sentence is still passed to ``do_process``; a sentence that ended
+        without text arrives here as an empty end frame. Default: ignore partials.
+        """
+        pass
+        
+    async def _next_item(self, timeout: Optional[float] = None):
+        """
+        Next queue item, items read during a barge-in first.
         
+        ``timeout=None`` waits indefinitely; a timeout ``<= 0`` only takes an
+        item that is already queued.
+        
+        Raises:
+            asyncio.TimeoutError: If no item arrived in time
+        """
+        if self._pending:
+            return self._pending.popleft()
+        if timeout is None:
+            return await self.text_queue.get()
+        if timeout <= 0:
+            try:
+                return self.text_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                raise asyncio.TimeoutError()
+        return await asyncio.wait_for(self.text_queue.get(), timeout=timeout)
+    
+    async def _accept(self, item, sentences: list) -> bool:
+        """
+        Route one queue item: partials to ``on_partial``, sentences into ``sentences``.
+        
+        Returns:
+            bool: True if the item was a sentence
+        """
+        if isinstance(item, StreamTextInputFrame) and (item.is_partial or not item.data):
+            await self.on_partial(item)
+            self.text_queue.task_done()
+            return False
+        sentences.append(item)
+        return True
+    
     async def process_text(self):
-        buffer = ""
+        """
+        Consume the text queue and call ``do_process`` once per utterance.
+        
+        The first sentence opens a merge window: sentences arriving within
+        ``merge_window_ms`` of the previous one are joined into the same
+        utterance, but the utterance is never held back longer than
+        ``max_wait_ms`` after its first sentence. Partials are passed to
+        ``on_partial`` and do not affect the window. With the default window
+        of 0 only sentences that are already queued are merged.
+        Per-utterance timings are appended to ``utterance_stats``.
+        """
+        loop = asyncio.get_running_loop()
         try:
             while True:
+                sentences = []
+                if not await self._accept(await self._next_item(), sentences):
+                    continue
+                
+                received_at, received_ms = loop.time(), time.time() * 1000
+                dequeued = monotonic_ms()
+                hard_deadline = received_at + self.max_wait_ms / 1000
+                quiet_deadline = received_at + self.merge_window_ms / 1000
+                while loop.time() < hard_deadline:
+                    try:
+                        item = await self._next_item(min(quiet_deadline, hard_deadline) - loop.time())
+                    except asyncio.TimeoutError:
+                        break
+                    if await self._accept(item, sentences):
+                        quiet_deadline = loop.time() + self.merge_window_ms / 1000
+                        dequeued = monotonic_ms()
+                
+                text = "".join(s.data if isinstance(s, TextInputFrame) else s for s in sentences)
+                started_at = loop.time()
+                self._start_turn(sentences[-1], dequeued)
                 try:
-                    item = await asyncio.wait_for(self.text_queue.get(), timeout=1.0)
-                    text_queue_empty = self.text_queue.empty()
-                    if not text_queue_empty:
-                        buffer += item
-                        self.text_queue.task_done()
-                        continue
-                    
-                    buffer += item
-                    processed = await self.do_process(buffer)
-                    buffer = ""
-                    end_call = "再见" in processed or "拜" in processed
-                    if end_call:
-                        print("Detected end call phrase, stopping processing.")
+                    processed = await self._run_reply(text) or ""
+                finally:
+                    for _ in sentences:
                         self.text_queue.task_done()
-                        break
-                    self.logger.info(f"Processed text: {processed}")
-                    self.text_queue.task_done()
-                except asyncio.TimeoutError:
-                    continue
-                except asyncio.CancelledError:
+                self._record_utterance(sentences, received_ms, received_at, started_at, loop.time())
+                stages = self._finish_turn()
+                self._trace_utterance(sentences, text, processed, received_ms, stages)
+                
+                end_call = "再见" in processed or "拜" in processed
+                if end_call:
+                    print("Detected end call phrase, stopping processing.")
                     break
-                await asyncio.sleep(0.01)
+                self.logger.info(f"Processed text: {processed}")
         except asyncio.CancelledError:
             self.logger.info("Text queue consumer cancelled")
-            raise
\ No newline at end of file
+            raise
+    
+    def _record_utterance(self, sentences: list, received_ms: float,
+                          received_at: float, started_at: float, finished_at: float) -> None:
+        # Only frames carry their enqueue time (epoch ms)
+        queue_wait_ms = None
+        if isinstance(sentences[0], TextInputFrame):
+            queue_wait_ms = max(0.0, received_ms - sentences[0].frame_created)
+        self.utterance_stats.append({
+            "sentences": len(sentences),
+            "queue_wait_ms": queue_wait_ms,
+            "merge_wait_ms": (started_at - received_at) * 1000,
+            "processing_ms": (finished_at - started_at) * 1000,
+        })
+    
+    def _start_turn(self, last_sentence, dequeued: float) -> None:
+        """Reset the per-utterance state; stage timings continue those of the last sentence."""
+        self.current_turn = {}
+        self.current_marks = dict(last_sentence.timings) if isinstance(last_sentence, StreamTextInputFrame) else {}
+        self.current_marks["dequeued"] = dequeued
+        self.mark("reply_start")
+    
+    def _finish_turn(self) -> dict:
+        """Stage durations of the utterance, observed by the latency recorder if bound."""
+        if self.latency is not None:
+            return self.latency.observe_marks(self.current_marks)
+        return stage_durations(self.current_marks)
+    
+    def _trace_utterance(self, sentences: list, text: str, reply: str, received_ms: float, stages: dict) -> None:
+        if self.trace is None:
+            return
+        last = sentences[-1]
+        self.trace.write({
+            "turn": len(self.utterance_stats) - 1,
+            "handler": self.__class__.__name__,
+            "user": text,
+            "reply": reply,
+            # When the ASR final result was queued (epoch ms)
+            "asr_final_ms": last.frame_created if isinstance(last, TextInputFrame) else received_ms,
+            "llm_first_token_ms": None,
+            "llm_done_ms": None,
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "interrupted": False,
+            **self.utterance_stats[-1],
+            **self.current_turn,
+            "stages_ms": stages,
+        })
+    
+    @staticmethod
+    def _is_speech(item) -> bool:
+        """Whether a queue item means the user is speaking."""
+        if isinstance(item, StreamTextInputFrame):
+            return item.is_partial or bool(item.data)
+        if isinstance(item, TextInputFrame):
+            return bool(item.data)
+        return bool(item)
+    
+    async def _run_reply(self, text: str) -> Optional[str]:
+        """Run ``do_process``, cancelling it on new speech when barge-in is enabled."""
+        if not self.barge_in:
+            return await self.do_process(text)
+        
+        reply = asyncio.create_task(self.do_process(text))
+        try:
+            while not reply.done():
+                getter = asyncio.ensure_future(self.text_queue.get())
+                done, _ = await asyncio.wait({reply, getter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    continue
+                
+                # Handled (and marked done) by the main loop after the reply
+                item = getter.result()
+                self._pending.append(item)
+                if not reply.done() and self._is_speech(item):
+                    heard_at = time.monotonic()
+                    self.note_turn(interrupted=True)
+                    reply.cancel()
+                    await asyncio.gather(reply, return_exceptions=True)
+                    self.barge_ins += 1
+                    self.barge_in_latencies_ms.append((time.monotonic() - heard_at) * 1000)
+                    self.logger.info("User started speaking, reply interrupted")
+                    return None
+            return reply.result()
+        finally:
+            if not reply.done():
+                reply.cancel()
\ No newline at end of file
@@ -0,0 +1,303 @@
+"""
+Batch transcription of recorded audio files.
+
+Every file is replayed through its own ``TencentASR`` session; a
+``SessionManager`` keeps at most ``concurrency`` sessions (WebSocket
+connections) running and shares the credentials between them. Results are
+appended to a JSONL file as each file finishes, so an interrupted batch can be
+resumed.
+
+Example:
+    transcriber = BatchTranscriber(concurrency=8)
+    summary = asyncio.run(transcriber.run(["calls/*.wav"], "transcripts.jsonl"))
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set, Union
+
+from .base import BaseTextHandler
+from .file_reader import FileAudioReader, expand_audio_sources
+from .sessions import SessionManager
+from .tencent_asr import ASRRefusedError, TencentASR, TencentASRConfig
+from .types import StreamTextInputFrame
+
+logger = logging.getLogger(__name__)
+
+# Errors in the input file itself: retrying cannot help
+_PERMANENT_ERRORS = (FileNotFoundError, ValueError, wave.Error, EOFError)
+
+
+class TranscriptCollector(BaseTextHandler):
+    """
+    Collect finished sentences with their audio offsets.
+
+    Needs ``TencentASR(stream_partials=True)``: only ``StreamTextInputFrame``
+    carries the sentence's ``start_time``/``end_time``. Partials are ignored
+    and nothing is merged, every final result is one sentence.
+    """
+
+    def __init__(self, text_queue: asyncio.Queue = None):
+        super().__init__(text_queue)
+        self.sentences: List[dict] = []
+
+    async def do_process(self, text: str) -> str:
+        return text
+
+    async def process_text(self):
+        while True:
+            item = await self.text_queue.get()
+            try:
+                if isinstance(item, StreamTextInputFrame):
+                    if item.is_end_bool and item.data:
+                        self.sentences.append({
+                            "text": item.data,
+                            "start_time": item.start_audio_time,
+                            "end_time": item.end_audio_time,
+                        })
+                elif item:
+                    self.sentences.append({"text": str(item), "start_time": None, "end_time": None})
+            finally:
+                self.text_queue.task_done()
+
+
+class _AdaptiveLimit:
+    """
+    Admission limit that follows the ASR service's concurrent session quota.
+
+    A refused session lowers the limit to the sessions still holding a slot;
+    every ``limit`` admitted sessions raise it by one again, up to ``maximum``.
+    """
+
+    def __init__(self, maximum: int):
+        self.maximum = self.limit = maximum
+        self.in_flight = 0
+        self._admitted = 0
+        self._waiters: List[asyncio.Future] = []
+
+    async def acquire(self) -> None:
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, refused: bool = False) -> None:
+        if refused:
+            self.limit = max(1, self.in_flight - 1)
+            self._admitted = 0
+        elif self.limit < self.maximum:
+            self._admitted += 1
+            if self._admitted >= self.limit:
+                self.limit += 1
+                self._admitted = 0
+        self.in_flight -= 1
+        # Every waiter checks the limit again; a cancelled one cannot swallow the wakeup
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+
+class BatchTranscriber:
+    """
+    Transcribe audio files with concurrent ASR sessions.
+
+    Files are replayed at ``speed`` (``None``: as fast as the session accepts
+    the audio). A file whose session fails, times out or ends without the
+    service's final result is retried with a fresh session, after a jittered
+    backoff, up to ``max_retries`` times. A session the service refuses at the
+    handshake (its concurrency quota is used up by this batch's other
+    sessions) is not a failure: the file waits for a slot again without using
+    up an attempt, and fewer sessions are started until the service admits
+    them again, so ``concurrency`` above the quota costs no files. One JSON
+    line is written per file:
+
+        {"file": "calls/0001.wav", "status": "ok", "attempts": 1,
+         "audio_s": 42.1, "elapsed_s": 3.2, "text": "...",
+         "sentences": [{"text": "...", "start_time": 1200, "end_time": 3400}]}
+
+    ``start_time``/``end_time`` are the sentence offsets in the file (ms) as
+    reported by the service. Failed files get ``"status": "failed"`` and an
+    ``"error"``.
+
+    Args:
+        concurrency: Maximum number of concurrent ASR sessions
+        asr_config: Shared ASR endpoint/credentials, read from the environment if omitted
+        vad_silence: Server VAD silence (ms) that ends a sentence
+        speed: Replay speed, see ``FileAudioReader``
+        max_retries: Retries per file after the first attempt
+        retry_backoff_s: Base delay of the exponential retry backoff
+        session_timeout_s: Give up on an attempt after this long (``None``: no limit)
+        stt_factory: Optional ``(manager) -> TencentASR`` override; it must stream partials
+    """
+
+    def __init__(self,
+                 concurrency: int = 4,
+                 asr_config: Optional[TencentASRConfig] = None,
+                 vad_silence: int = 500,
+                 speed: Optional[float] = None,
+                 max_retries: int = 2,
+                 retry_backoff_s: float = 1.0,
+                 session_timeout_s: Optional[float] = None,
+                 stt_factory: Optional[Callable[[SessionManager], TencentASR]] = None):
+        self.concurrency = concurrency
+        self.speed = speed
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.session_timeout_s = session_timeout_s
+        self.manager = SessionManager(
+            max_sessions=concurrency,
+            asr_config=asr_config,
+            vad_silence=vad_silence,
+            stt_factory=stt_factory or (lambda m: TencentASR(
+                vad_silence=m.vad_silence, config=m.asr_config, stream_partials=True)),
+        )
+        self._limit = _AdaptiveLimit(concurrency)
+        self.stats = {"files": 0, "ok": 0, "failed": 0, "skipped": 0, "retries": 0, "refused": 0, "audio_s": 0.0}
+
+    async def run(self,
+                  sources: Union[str, Path, Iterable[Union[str, Path]]],
+                  output: Union[str, Path],
+                  resume: bool = False,
+                  on_result: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Transcribe every audio file matched by ``sources`` into ``output``.
+
+        Args:
+            sources: Files, directories or glob patterns, see ``expand_audio_sources``
+            output: JSONL file the results are appended to
+            resume: Skip files that already have an ``ok`` record in ``output``
+            on_result: Called with each record as soon as it is written (progress)
+
+        Returns:
+            dict: ``stats`` plus the wall time and throughput (audio seconds per second)
+        """
+        paths = expand_audio_sources(sources)
+        done = _completed_files(output) if resume else set()
+        pending = [p for p in paths if str(p) not in done]
+        self.stats["files"] = len(paths)
+        self.stats["skipped"] = len(paths) - len(pending)
+
+        started = time.monotonic()
+        mode = "a" if resume else "w"
+        with open(output, mode, encoding="utf-8") as out:
+            if resume and out.tell() > 0 and not _ends_with_newline(output):
+                out.write("\n")
+
+            async def transcribe_and_write(path: Path) -> None:
+                record = await self.transcribe_file(path)
+                # Single-threaded: whole lines, flushed so a crash keeps finished files
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                if on_result is not None:
+                    on_result(record)
+
+            # Sessions queue for a slot in the manager, so all files can be scheduled at once
+            await asyncio.gather(*(transcribe_and_write(p) for p in pending))
+
+        elapsed = time.monotonic() - started
+        return {
+            **self.stats,
+            "elapsed_s": elapsed,
+            "audio_s_per_s": self.stats["audio_s"] / elapsed if elapsed > 0 else 0.0,
+        }
+
+    async def transcribe_file(self, path: Union[str, Path]) -> dict:
+        """Transcribe one file, with retries. Never raises for a failed file; see the record's status."""
+        started = time.monotonic()
+        record = {"file": str(path), "status": "failed", "attempts": 0}
+        attempt = 0
+        while True:
+            record["attempts"] = attempt + 1
+            await self._limit.acquire()
+            refused = not_admitted = False
+            try:
+                audio_s, sentences = await self._attempt(path)
+            except _PERMANENT_ERRORS as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+                break
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+                refused = isinstance(e, ASRRefusedError)
+                # Refused while none of our other sessions run: the quota is held elsewhere
+                # (or the credentials are wrong), waiting for our own sessions cannot help
+                not_admitted = refused and self._limit.in_flight > 1
+            else:
+                record.pop("error", None)
+                record.update({
+                    "status": "ok",
+                    "audio_s": round(audio_s, 3),
+                    "text": "".join(s["text"] for s in sentences),
+                    "sentences": sentences,
+                })
+                self.stats["audio_s"] += audio_s
+                break
+            finally:
+                self._limit.release(refused)
+
+            if not_admitted:
+                self.stats["refused"] += 1
+                logger.info(f"{path}: session refused, waiting for a slot (limit {self._limit.limit})")
+                await asyncio.sleep(random.uniform(0, self.retry_backoff_s))
+                continue
+            logger.warning(f"{path}: attempt {attempt + 1} failed: {record['error']}")
+            if attempt >= self.max_retries:
+                break
+            self.stats["retries"] += 1
+            await asyncio.sleep(random.uniform(0, self.retry_backoff_s * 2 ** attempt))
+            attempt += 1
+
+        record["elapsed_s"] = round(time.monotonic() - started, 3)
+        self.stats[record["status"]] += 1
+        return record
+
+    async def _attempt(self, path: Union[str, Path]) -> tuple:
+        collector = TranscriptCollector()
+        reader = FileAudioReader(path, speed=self.speed)
+        session = await self.manager.start_session(reader, lambda: collector, admission_timeout=None)
+        finished, _ = await asyncio.wait({session.runner}, timeout=self.session_timeout_s)
+        if not finished:
+            session.cancel()
+            await session.wait()
+            raise TimeoutError(f"no final result within {self.session_timeout_s}s")
+        if session.runner.cancelled():
+            raise asyncio.CancelledError()
+        if session.runner.exception() is not None:
+            raise session.runner.exception()
+        if not session.task.stt_service.final_received.is_set():
+            # The connection was lost for good; the transcript may be incomplete
+            raise ConnectionError("session ended without the final result")
+        return reader.audio_seconds_sent, collector.sentences
+
+
+def _completed_files(output: Union[str, Path]) -> Set[str]:
+    """Files with an ``ok`` record in an existing output file (truncated last lines are ignored)."""
+    if not os.path.exists(output):
+        return set()
+    completed = set()
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["file"])
+    return completed
+
+
+def _ends_with_newline(path: Union[str, Path]) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
@@ -1,12 +1,9 @@
 import uuid
 import json
 import click
-from ai_toolkits.audio.audio_apps import create_streaming_conversation_bot
-from ai_toolkits.audio.audio_apps import create_translator
-from ai_toolkits.audio.audio_apps import create_siri_bot
-from ai_toolkits.audio.audio_apps import create_note_taking_bot
-from ai_toolkits.llms.openai_provider import create_sync_client
-from ai_toolkits.files.parse import MarkDownFileReader
+
+# Subcommands import the audio stack (pyaudio, openai, rich, markitdown) when
+# they run, so `gotalk --help` only pays for click.
 
 @click.group()
 def cli():
@@ -15,10 +12,15 @@ def cli():
 
 @cli.command()
 @click.option('--duration', default=300, help='Duration in seconds for the streaming bot.')
-def chat(duration):
+@click.option('--speculative', is_flag=True, help='Start answering on stable partial transcripts.')
+@click.option('--barge-in', is_flag=True, help='Stop the reply when you start speaking.')
+def chat(duration, speculative, barge_in):
     """Starts the streaming conversation bot."""
-    bot = create_streaming_conversation_bot(duration_seconds=duration)
+    from ai_toolkits.audio.audio_apps import create_streaming_conversation_bot
+    bot = create_streaming_conversation_bot(duration_seconds=duration, speculative=speculative, barge_in=barge_in)
     bot.run_app()
+    if speculative:
+        print(f"Speculation: {bot.text_handler.speculation_stats}")
     
     
 @cli.command()
@@ -26,6 +28,8 @@ def chat(duration):
 @click.option('--duration', default=300, help='Duration in seconds for the streaming bot.')
 def url(url, duration):
     """Starts the streaming conversation bot."""
+    from ai_toolkits.audio.audio_apps import create_streaming_conversation_bot
+    from ai_toolkits.files.parse import MarkDownFileReader
     try:
         content = MarkDownFileReader().read(url)
         if content is None or len(content.strip()) == 0:
@@ -42,6 +46,7 @@ def url(url, duration):
 @cli.command()
 def translate():
     """Starts the translator bot."""
+    from ai_toolkits.audio.audio_apps import create_translator
     bot = create_translator()
     bot.run_app()
     
@@ -52,7 +57,9 @@ def translate():
     default=120, 
     help='Duration in seconds for the note-taking bot.')
 def note(duration:int = 120):
-    
+    from ai_toolkits.audio.audio_apps import create_note_taking_bot
+    from ai_toolkits.llms.openai_provider import create_sync_client
+
     def save_memory(bot):
         memory = bot.text_handler.memory
         fp = f"note_taking_memory_{str(uuid.uuid4())[:5]}.json"
@@ -92,7 +99,53 @@ def note(duration:int = 120):
 
 
 @cli.command()
-def siri():
+@click.option('--barge-in', is_flag=True, help='Stop speaking when you start speaking (use headphones).')
+def siri(barge_in):
     """Starts the Siri bot."""
-    bot = create_siri_bot()
-    bot.run_app()
\ No newline at end of file
+    from ai_toolkits.audio.audio_apps import create_siri_bot
+    bot = create_siri_bot(barge_in=barge_in)
+    bot.run_app()
+
+@cli.command()
+@click.argument('sources', nargs=-1, required=True)
+@click.option('--output', '-o', default='transcripts.jsonl', show_default=True, help='JSONL file, one record per audio file.')
+@click.option('--concurrency', '-j', default=4, show_default=True, help='Number of concurrent ASR sessions.')
+@click.option('--retries', default=2, show_default=True, help='Retries per file after a failed session.')
+@click.option('--speed', type=float, default=None, help='Replay speed, e.g. 1.0 for real time (default: as fast as possible).')
+@click.option('--vad-silence', default=500, show_default=True, help='Silence (ms) that ends a sentence.')
+@click.option('--timeout', type=float, default=None, help='Give up on a session after this many seconds.')
+@click.option('--resume', is_flag=True, help='Skip files that are already transcribed in the output.')
+def transcribe(sources, output, concurrency, retries, speed, vad_silence, timeout, resume):
+    """Transcribes audio files, directories or globs to JSONL."""
+    import asyncio
+    from ai_toolkits.audio.batch import BatchTranscriber
+    from ai_toolkits.audio.file_reader import expand_audio_sources
+
+    try:
+        paths = expand_audio_sources(sources)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e))
+
+    total, finished = len(paths), 0
+
+    def report(record):
+        nonlocal finished
+        finished += 1
+        # Files skipped by --resume count as done
+        done = finished + transcriber.stats["skipped"]
+        if record["status"] == "ok":
+            detail = f"{len(record['sentences'])} sentences, {record['audio_s']:.1f}s audio in {record['elapsed_s']:.1f}s"
+        else:
+            detail = f"FAILED after {record['attempts']} attempts: {record.get('error')}"
+        click.echo(f"[{done}/{total}] {record['file']}: {detail}")
+
+    transcriber = BatchTranscriber(
+        concurrency=concurrency, vad_silence=vad_silence, speed=speed,
+        max_retries=retries, session_timeout_s=timeout)
+    summary = asyncio.run(transcriber.run(paths, output, resume=resume, on_result=report))
+    click.echo(
+        f"{summary['ok']} transcribed, {summary['failed']} failed, {summary['skipped']} skipped; "
+        f"{summary['audio_s']:.1f}s of audio in {summary['elapsed_s']:.1f}s "
+        f"({summary['audio_s_per_s']:.1f}x real time), written to {output}")
+    if summary['failed']:
+        raise SystemExit(1)
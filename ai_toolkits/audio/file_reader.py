@@ -0,0 +1,208 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import wave
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+from .audio_format import AudioConverter, AudioFormat
+from .types import FastAudioFrame
+
+logger = logging.getLogger(__name__)
+
+WAV_EXTENSIONS = {".wav", ".wave"}
+RAW_PCM_EXTENSIONS = {".pcm", ".raw"}
+MULAW_EXTENSIONS = {".ulaw", ".mulaw", ".ul"}
+ALAW_EXTENSIONS = {".alaw", ".al"}
+AUDIO_EXTENSIONS = WAV_EXTENSIONS | RAW_PCM_EXTENSIONS | MULAW_EXTENSIONS | ALAW_EXTENSIONS
+
+
+def expand_audio_sources(source: Union[str, Path, Iterable[Union[str, Path]]]) -> List[Path]:
+    """
+    Expand a file, directory, glob pattern or list of those into audio file paths.
+
+    Directories are scanned (non-recursively) for WAV/raw PCM files, glob
+    patterns are expanded with ``glob.glob(recursive=True)``. The order of
+    the result is deterministic: every directory and glob match is sorted.
+
+    Args:
+        source: A path, a directory, a glob pattern, or an iterable of those.
+
+    Returns:
+        List[Path]: Audio files in the order they should be replayed.
+
+    Raises:
+        FileNotFoundError: If a source matches no audio file.
+    """
+    if isinstance(source, (str, Path)):
+        source = [source]
+
+    paths: List[Path] = []
+    for item in source:
+        item = str(item)
+        if glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+            matched = [Path(m) for m in matches if Path(m).suffix.lower() in AUDIO_EXTENSIONS]
+        elif os.path.isdir(item):
+            matched = sorted(p for p in Path(item).iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+        elif os.path.isfile(item):
+            matched = [Path(item)]
+        else:
+            matched = []
+
+        if not matched:
+            raise FileNotFoundError(f"No audio files found for source: {item}")
+        paths.extend(matched)
+    return paths
+
+
+def probe_audio_format(path: Union[str, Path], raw_sampling_rate: int = 8000) -> AudioFormat:
+    """
+    Determine the format of an audio file from its WAV header or extension.
+
+    Headerless files (raw PCM, ``.ulaw``/``.alaw`` G.711) are assumed to be
+    mono at ``raw_sampling_rate``.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in MULAW_EXTENSIONS:
+        return AudioFormat(raw_sampling_rate, "mulaw")
+    if suffix in ALAW_EXTENSIONS:
+        return AudioFormat(raw_sampling_rate, "alaw")
+    if suffix in RAW_PCM_EXTENSIONS:
+        return AudioFormat(raw_sampling_rate, "pcm_s16le")
+
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        return AudioFormat(wav.getframerate(), "pcm_s16le", wav.getnchannels())
+
+
+class FileAudioReader:
+    """
+    Replay WAV or raw PCM files as an audio stream.
+
+    Drop-in replacement for ``MicrophoneClient``: audio is cut into chunks of
+    ``chunk_ms`` and pushed to the audio input queue, followed by the usual
+    ``{"type": "end"}`` signal once every file has been replayed.
+
+    The replay pace is controlled by ``speed``:
+        - ``1.0`` replays at wall-clock speed (like a live microphone)
+        - ``N`` replays N times faster than real time
+        - ``None`` (or ``<= 0``) replays as fast as the consumer accepts; at most
+          ``max_pending_chunks`` chunks are left unsent in the queue at any time.
+
+    The reader emits 16-bit mono PCM at ``sampling_rate`` (by default the
+    rate of the first file) and advertises it as ``audio_format`` so the STT
+    service can pick a matching engine. Files in other formats are converted:
+    multi-channel WAVs are down-mixed, other rates are resampled and raw
+    G.711 files (``.ulaw``/``.alaw``) are decoded. Headerless files (including
+    raw PCM ``.pcm``/``.raw``) are assumed to be at ``raw_sampling_rate``.
+
+    With ``emit_frames=True`` chunks are wrapped in ``FastAudioFrame`` so they
+    carry a sequence number and creation timestamp.
+    """
+
+    def __init__(self,
+        source: Union[str, Path, Iterable[Union[str, Path]]],
+        audio_input_queue: asyncio.Queue = None,
+        sampling_rate: Optional[int] = None,
+        chunk_ms: int = 40,
+        speed: Optional[float] = 1.0,
+        gap_ms: int = 1000,
+        max_pending_chunks: int = 50,
+        raw_sampling_rate: int = 8000,
+        emit_frames: bool = False):
+
+        self.paths = expand_audio_sources(source)
+        self.audio_input_queue = audio_input_queue if audio_input_queue is not None else asyncio.Queue()
+        self.raw_sampling_rate = raw_sampling_rate
+        if sampling_rate is None:
+            sampling_rate = probe_audio_format(self.paths[0], raw_sampling_rate).sample_rate
+        self.sampling_rate = sampling_rate
+        self.chunk_ms = chunk_ms
+        self.chunk_size = int(sampling_rate * (chunk_ms / 1000))
+        self.chunk_bytes = self.chunk_size * 2
+        self.speed = speed if speed and speed > 0 else None
+        self.gap_ms = gap_ms
+        self.max_pending_chunks = max(1, max_pending_chunks)
+        self.emit_frames = emit_frames
+
+        self.chunks_sent = 0
+        self.audio_seconds_sent = 0.0
+        self.started_at: Optional[float] = None
+
+    def bind_audio_queue(self, audio_input_queue: asyncio.Queue):
+        self.audio_input_queue = audio_input_queue
+
+    @property
+    def audio_format(self) -> AudioFormat:
+        """Format of the emitted chunks: 16-bit mono PCM at ``sampling_rate``."""
+        return AudioFormat(self.sampling_rate)
+
+    def _read_pcm(self, path: Path) -> Iterator[bytes]:
+        """Yield 16-bit mono PCM blocks of roughly one second from a file."""
+        file_format = probe_audio_format(path, self.raw_sampling_rate)
+        converter = AudioConverter(file_format, self.sampling_rate)
+        block_frames = file_format.sample_rate
+
+        if path.suffix.lower() not in WAV_EXTENSIONS:
+            with open(path, "rb") as f:
+                while block := f.read(block_frames * file_format.bytes_per_sample):
+                    yield converter.convert(block)
+            return
+
+        with wave.open(str(path), "rb") as wav:
+            while block := wav.readframes(block_frames):
+                yield converter.convert(block)
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        """Yield fixed-size chunks across all files, with silence between files."""
+        gap = b"\x00" * (int(self.sampling_rate * self.gap_ms / 1000) * 2)
+        remainder = b""
+        for index, path in enumerate(self.paths):
+            logger.info(f"Replaying audio file {path}")
+            if index > 0 and gap:
+                remainder += gap
+            for block in self._read_pcm(path):
+                remainder += block
+                while len(remainder) >= self.chunk_bytes:
+                    yield remainder[:self.chunk_bytes]
+                    remainder = remainder[self.chunk_bytes:]
+        if remainder:
+            yield remainder
+
+    async def _wait_for_room(self):
+        """
+        Wait until fewer than ``max_pending_chunks`` chunks are queued, so up
+        to that many stay in flight. ``asyncio.Queue`` has no "item taken"
+        event to wait on, so the queue is polled, four times per chunk.
+        """
+        while self.audio_input_queue.qsize() >= self.max_pending_chunks:
+            await asyncio.sleep(self.chunk_ms / 4000)
+
+    async def receive_audio(self):
+        logger.info(f"Starting audio replay of {len(self.paths)} file(s) at speed {self.speed or 'max'}")
+        loop = asyncio.get_running_loop()
+        start = self.started_at = loop.time()
+
+        for chunk in self._iter_chunks():
+            await self.audio_input_queue.put(
+                FastAudioFrame(chunk, sampling_rate=self.sampling_rate) if self.emit_frames else chunk)
+            self.chunks_sent += 1
+            self.audio_seconds_sent += len(chunk) / 2 / self.sampling_rate
+
+            if self.speed is None:
+                await self._wait_for_room()
+                continue
+
+            delay = start + self.audio_seconds_sent / self.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        logger.info(f"Audio replay finished, {self.audio_seconds_sent:.1f}s of audio sent")
+        await self.audio_input_queue.put(json.dumps({"type": "end"}))
+        # Wait for the STT service to consume the end signal before returning,
+        # so RealTimeTask does not queue a second end signal behind it.
+        await self.audio_input_queue.join()
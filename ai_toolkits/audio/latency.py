@@ -0,0 +1,196 @@
+"""
+Per-stage latency histograms for the real-time voice pipeline.
+
+Components stamp monotonic timestamps (``time.monotonic()`` in ms) on each
+utterance as it moves through the pipeline:
+
+    speech_end_captured  microphone captured the last audio of the sentence
+    speech_end_sent      that audio was sent to the ASR service
+    asr_final            the final transcript was received
+    dequeued             the text handler took the sentence from the queue
+    reply_start          ``do_process`` started (after merging)
+    llm_first_token      first LLM token
+    llm_done             LLM stream finished
+    first_audio          TTS playback started
+
+``LatencyRecorder.observe_marks`` turns them into stage durations
+(``UTTERANCE_STAGES``); per-chunk and per-event stages (``ring_buffer``,
+``audio_queue``, ``ws_send``, ``reconnect``, ``replay``) are observed directly.
+Histograms export as JSON or Prometheus text.
+"""
+
+import bisect
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+# (stage, start mark, end mark or marks tried in order)
+UTTERANCE_STAGES: List[Tuple[str, str, Union[str, Tuple[str, ...]]]] = [
+    ("asr", "speech_end_sent", "asr_final"),
+    ("handler_queue", "asr_final", "dequeued"),
+    ("merge_wait", "dequeued", "reply_start"),
+    ("llm_ttft", "reply_start", "llm_first_token"),
+    ("llm_stream", "llm_first_token", "llm_done"),
+    ("tts_first_audio", "reply_start", "first_audio"),
+    ("response", "speech_end_captured", ("first_audio", "llm_first_token")),
+]
+
+STAGE_HELP = {
+    "ring_buffer": "microphone capture to audio queue, per chunk",
+    "audio_queue": "capture to WebSocket send, per audio chunk",
+    "ws_send": "WebSocket send call, per message",
+    "reconnect": "ASR connection lost to reconnected and replayed",
+    "replay": "resending unacknowledged audio after a reconnect",
+    "asr": "last audio sent to final transcript (includes the VAD silence)",
+    "handler_queue": "final transcript to text handler",
+    "merge_wait": "utterance coalescing",
+    "llm_ttft": "reply start to first LLM token",
+    "llm_stream": "first to last LLM token",
+    "tts_first_audio": "reply start to first audio",
+    "response": "end of speech to first token or audio",
+}
+
+
+def monotonic_ms() -> float:
+    return time.monotonic() * 1000
+
+
+def stage_durations(marks: Dict[str, float]) -> Dict[str, float]:
+    """Durations (ms) of the ``UTTERANCE_STAGES`` whose marks are present."""
+    durations = {}
+    for stage, start, ends in UTTERANCE_STAGES:
+        if start not in marks:
+            continue
+        for end in (ends,) if isinstance(ends, str) else ends:
+            if end in marks:
+                durations[stage] = marks[end] - marks[start]
+                break
+    return durations
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.sum_ms / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation within the bucket (narrowed to min/max)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = max(self.buckets_ms[i - 1], self.min_ms) if i > 0 else self.min_ms
+                upper = min(self.buckets_ms[i], self.max_ms) if i < len(self.buckets_ms) else self.max_ms
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "mean_ms": self.mean_ms,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {str(le): n for le, n in zip(list(self.buckets_ms) + ["+Inf"], self.counts)},
+        }
+
+
+class LatencyRecorder:
+    """
+    Latency histograms by pipeline stage.
+
+    Example:
+        latency = LatencyRecorder()
+        latency.observe("ws_send", 1.2)
+        latency.observe_marks({"reply_start": 100.0, "llm_first_token": 480.0})
+        print(latency.summary())
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, stage: str, ms: float) -> None:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram(self.buckets_ms)
+        histogram.observe(max(0.0, ms))
+
+    def observe_marks(self, marks: Dict[str, float]) -> Dict[str, float]:
+        """Observe the ``UTTERANCE_STAGES`` whose marks are present; returns their durations."""
+        durations = stage_durations(marks)
+        for stage, ms in durations.items():
+            self.observe(stage, ms)
+        return durations
+
+    def to_dict(self) -> dict:
+        return {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, name: str = "voice_pipeline_stage_latency_milliseconds") -> str:
+        """Histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {name} Latency of voice pipeline stages in milliseconds.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, histogram in self.histograms.items():
+            cumulative = 0
+            for le, n in zip(list(histogram.buckets_ms) + ["+Inf"], histogram.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum_ms:.3f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the histograms as Prometheus text (``.prom``) or JSON (anything else)."""
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json(indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def summary(self, stages: Optional[Iterable[str]] = None) -> str:
+        """
+        Plain-text table of count, mean and percentiles per stage. A requested
+        stage without samples gets a zero-count row.
+        """
+        order = [s for s in list(STAGE_HELP) + sorted(self.histograms) if s in self.histograms]
+        stages = list(dict.fromkeys(stages if stages is not None else order))
+        if not stages:
+            return "No latency samples recorded."
+        header = f"{'stage':<16}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"
+        rows = [header]
+        for stage in stages:
+            h = self.histograms.get(stage)
+            if h is None or not h.count:
+                rows.append(f"{stage:<16}{0:>7}" + f"{'-':>9}" * 5)
+                continue
+            rows.append(f"{stage:<16}{h.count:>7}{h.mean_ms:>9.1f}{h.quantile(0.5):>9.1f}"
+                        f"{h.quantile(0.95):>9.1f}{h.quantile(0.99):>9.1f}{h.max_ms:>9.1f}")
+        return "\n".join(rows)
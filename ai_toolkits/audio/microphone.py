@@ -1,22 +1,72 @@
 import asyncio
-import pyaudio
+import threading
+import time
 import json
 import logging
+from typing import Literal
+
+from .audio_format import AudioFormat
+from .latency import LatencyRecorder
+from .ring_buffer import AudioRingBuffer, OverflowPolicy
+from .types import FastAudioFrame
+
 logger = logging.getLogger(__name__)
 
+# 100 chunks of 40 ms = 4 seconds of audio waiting for the ASR link
+DEFAULT_AUDIO_QUEUE_SIZE = 100
+
+
 class MicrophoneClient:
+    """
+    Capture microphone audio without blocking the event loop.
+
+    PyAudio delivers audio on its own thread, either through the stream
+    callback (``capture_mode="callback"``) or a dedicated reader thread doing
+    blocking reads (``capture_mode="thread"``). Chunks are written into a
+    preallocated ``AudioRingBuffer`` and the event loop is woken with
+    ``call_soon_threadsafe``; ``receive_audio`` then moves them into the
+    (bounded) audio input queue.
+
+    If the ASR link is slow the queue fills up, ``receive_audio`` stops
+    draining the ring buffer and the ring buffer's ``overflow_policy``
+    decides which audio is dropped. Drops are counted in ``stats``.
+
+    With ``emit_frames=True`` chunks are wrapped in ``FastAudioFrame`` so they
+    carry a sequence number and their capture time (``created_ns``), which
+    ``TencentASR`` uses to measure capture-to-send latency. With a
+    ``LatencyRecorder`` bound the time chunks spend in the ring buffer is
+    observed as the ``ring_buffer`` stage.
+    """
+
     def __init__(self,
         audio_input_queue: asyncio.Queue = None,
-        sampling_rate: int = 8000, 
-        chunk_ms: int = 40, 
+        sampling_rate: int = 8000,
+        chunk_ms: int = 40,
         channels: int = 1,
-        duration:int = 30):
-        
-        self.audio_input_queue = audio_input_queue if audio_input_queue is not None else asyncio.Queue()
+        duration:int = 30,
+        capture_mode: Literal["callback", "thread"] = "callback",
+        ring_buffer_chunks: int = 50,
+        overflow_policy: OverflowPolicy = "drop_oldest",
+        emit_frames: bool = False):
+
+        if capture_mode not in ("callback", "thread"):
+            raise ValueError(f"Unknown capture mode: {capture_mode}")
+
+        self.audio_input_queue = audio_input_queue if audio_input_queue is not None else asyncio.Queue(maxsize=DEFAULT_AUDIO_QUEUE_SIZE)
         self.sampling_rate = sampling_rate
         self.chunk_size = int(sampling_rate * (chunk_ms / 1000))
         self.channels = channels
-            
+        self.capture_mode = capture_mode
+        self.ring_buffer = AudioRingBuffer(
+            capacity=ring_buffer_chunks,
+            chunk_bytes=self.chunk_size * channels * 2,
+            overflow_policy=overflow_policy)
+        self.input_overflows = 0
+        self.emit_frames = emit_frames
+
+        # Imported here so file-based pipelines do not need PortAudio installed
+        import pyaudio
+        self._pyaudio = pyaudio
         self.port_audio = pyaudio.PyAudio()
         self.duration = duration
         self.stream = self.port_audio.open(
@@ -24,20 +74,99 @@ class MicrophoneClient:
             channels=channels,
             rate=sampling_rate,
             input=True,
-            frames_per_buffer=self.chunk_size)
-        
+            frames_per_buffer=self.chunk_size,
+            stream_callback=self._on_audio if capture_mode == "callback" else None,
+            start=False)
+
+        self._loop: asyncio.AbstractEventLoop = None
+        self._frame_ready: asyncio.Event = None
+        self._stop_capture = threading.Event()
+        self._reader_thread: threading.Thread = None
+        self.latency: LatencyRecorder = None
+
+    def bind_latency(self, latency: LatencyRecorder):
+        self.latency = latency
+
     def bind_audio_queue(self, audio_input_queue: asyncio.Queue):
         self.audio_input_queue = audio_input_queue
-        
+
+    @property
+    def audio_format(self) -> AudioFormat:
+        """Format of the captured chunks, used for ASR engine negotiation."""
+        return AudioFormat(self.sampling_rate, "pcm_s16le", self.channels)
+
+    @property
+    def stats(self) -> dict:
+        """Capture counters: ring buffer usage, drops and PortAudio input overflows."""
+        return {**self.ring_buffer.stats(), "input_overflows": self.input_overflows}
+
+    def _push_chunk(self, data: bytes) -> None:
+        """Called on the capture thread: store the chunk and wake the event loop."""
+        if not self.ring_buffer.write(data):
+            logger.debug("Audio ring buffer full, dropped a chunk")
+        try:
+            self._loop.call_soon_threadsafe(self._frame_ready.set)
+        except RuntimeError:
+            # Event loop already closed, capture is shutting down
+            pass
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback."""
+        if status & self._pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self._push_chunk(in_data)
+        return (None, self._pyaudio.paContinue)
+
+    def _read_loop(self) -> None:
+        """Dedicated reader thread for ``capture_mode="thread"``."""
+        while not self._stop_capture.is_set() and self.stream.is_active():
+            data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            self._push_chunk(data)
+
+    def _start_capture(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._frame_ready = asyncio.Event()
+        self._stop_capture.clear()
+        self.stream.start_stream()
+        if self.capture_mode == "thread":
+            self._reader_thread = threading.Thread(target=self._read_loop, name="microphone-reader", daemon=True)
+            self._reader_thread.start()
+
+    def _stop(self) -> None:
+        self._stop_capture.set()
+        if self._reader_thread is not None:
+            self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
+        self.stream.stop_stream()
+
     async def receive_audio(self):
         logger.info("Starting audio recording...")
-        start = asyncio.get_event_loop().time()
-        while self.stream.is_active():
-            if asyncio.get_event_loop().time() - start > self.duration:
-                logger.info("Recording duration reached, stopping.")
-                await self.audio_input_queue.put(json.dumps({"type": "end"}))
-                await asyncio.sleep(100)
-            data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-            await self.audio_input_queue.put(data)
-            await asyncio.sleep(0.01)
-        
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.duration
+        self._start_capture()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._frame_ready.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                self._frame_ready.clear()
+                while (item := self.ring_buffer.read_timed()) is not None:
+                    data, captured_ns = item
+                    if self.latency is not None:
+                        self.latency.observe("ring_buffer", (time.monotonic_ns() - captured_ns) / 1e6)
+                    # Blocks when the queue is full; the ring buffer absorbs
+                    # (and eventually drops) audio until the ASR link catches up.
+                    await self.audio_input_queue.put(
+                        FastAudioFrame(data, sampling_rate=self.sampling_rate, created_ns=captured_ns)
+                        if self.emit_frames else data)
+        finally:
+            await asyncio.to_thread(self._stop)
+            logger.info(f"Audio capture stopped: {self.stats}")
+
+        logger.info("Recording duration reached, stopping.")
+        await self.audio_input_queue.put(json.dumps({"type": "end"}))
+        await self.audio_input_queue.join()
@@ -0,0 +1,90 @@
+"""
+Stability tracking for interim (partial) ASR hypotheses.
+
+Streaming ASR rewrites the tail of its hypothesis while the user is still
+speaking; the beginning of the sentence usually settles quickly.
+``PartialStabilityTracker`` remembers, for every character of the current
+hypothesis, since when it has been unchanged, so consumers can act on the
+prefix that is unlikely to change (live captions, speculative LLM calls).
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+def common_prefix_len(a: str, b: str) -> int:
+    """Length of the longest common prefix of two strings."""
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+@dataclass
+class PartialStability:
+    """
+    Stability of one hypothesis.
+
+    Attributes:
+        stable_prefix_len: Leading characters unchanged for at least ``stable_ms``
+        stability: ``stable_prefix_len / len(text)`` (1.0 for final results)
+        unchanged_ms: How long the whole hypothesis has been unchanged
+    """
+    stable_prefix_len: int = 0
+    stability: float = 0.0
+    unchanged_ms: float = 0.0
+
+
+class PartialStabilityTracker:
+    """
+    Track how long each character of the current utterance has been stable.
+
+    Args:
+        stable_ms: A character counts as stable once it has survived this long
+            unchanged across successive hypotheses
+    """
+
+    def __init__(self, stable_ms: float = 300):
+        self.stable_ms = stable_ms
+        self._text = ""
+        self._since: List[float] = []
+        self._changed_at = 0.0
+
+    def reset(self) -> None:
+        """Start a new utterance."""
+        self._text = ""
+        self._since = []
+        self._changed_at = 0.0
+
+    def update(self, text: str, final: bool = False, now: Optional[float] = None) -> PartialStability:
+        """
+        Register the latest hypothesis of the current utterance.
+
+        Args:
+            text: Full hypothesis text
+            final: The ASR service has finalized this text
+            now: ``time.monotonic()`` override, for replaying recorded results
+        """
+        now = time.monotonic() if now is None else now
+        if text != self._text:
+            keep = common_prefix_len(self._text, text)
+            self._since = self._since[:keep] + [now] * (len(text) - keep)
+            self._changed_at = now
+            self._text = text
+
+        if not text:
+            return PartialStability(stability=1.0 if final else 0.0)
+
+        unchanged_ms = (now - self._changed_at) * 1000
+        if final:
+            return PartialStability(len(text), 1.0, unchanged_ms)
+
+        threshold = now - self.stable_ms / 1000
+        stable = 0
+        for since in self._since:
+            if since > threshold:
+                break
+            stable += 1
+        return PartialStability(stable, stable / len(text), unchanged_ms)
@@ -1,10 +1,13 @@
 import logging
-from .microphone import MicrophoneClient
+from .microphone import MicrophoneClient, DEFAULT_AUDIO_QUEUE_SIZE
 from .tencent_asr import TencentASR
 from .text_processor import PrintOutTextHandler
 from .base import AudioStreamReader, BaseSTT, BaseTextHandler
+from .trace import TraceWriter
+from .latency import LatencyRecorder
 import asyncio
 from dataclasses import dataclass, field
+from typing import Optional
 
 logger = logging.getLogger(__name__)
         
@@ -13,27 +16,71 @@ class RealTimeTask:
     audio_input_provider: AudioStreamReader = field(default_factory=MicrophoneClient)
     text_handler: BaseTextHandler = field(default_factory=PrintOutTextHandler)
     stt_service: BaseSTT = field(default_factory=TencentASR)
-    audio_input_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    audio_input_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=DEFAULT_AUDIO_QUEUE_SIZE))
     text_output_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
     trace_conversation: bool = True
+    trace_dir: str = "trace"
+    trace_max_bytes: Optional[int] = 10 * 1024 * 1024
+    trace_compress: bool = False
+    latency: LatencyRecorder = field(default_factory=LatencyRecorder)
+    latency_report: Optional[str] = None
+    verbose: bool = True
     
     def __post_init__(self):
+        source_format = getattr(self.audio_input_provider, "audio_format", None)
+        if source_format is not None and hasattr(self.stt_service, "negotiate_format"):
+            self.stt_service.negotiate_format(source_format)
         self.audio_input_provider.bind_audio_queue(self.audio_input_queue)
         self.stt_service.bind_audio_queue(self.audio_input_queue)
         self.stt_service.bind_text_queue(self.text_output_queue)
         self.text_handler.bind_text_queue(self.text_output_queue)
+        for component in (self.audio_input_provider, self.stt_service, self.text_handler):
+            if hasattr(component, "bind_latency"):
+                component.bind_latency(self.latency)
+    
+    def _report_latency(self) -> None:
+        """Print the per-stage latency summary; write it to ``latency_report`` (.prom or JSON)."""
+        self._announce(f"Latency by stage:\n{self.latency.summary()}")
+        if self.latency_report:
+            try:
+                self.latency.write(self.latency_report)
+            except OSError as e:
+                logger.warning(f"Could not write latency report: {e}")
+    
+    def _open_trace(self) -> Optional[TraceWriter]:
+        """One JSONL record per turn, written as the turn completes."""
+        if not (self.trace_conversation and hasattr(self.text_handler, "conversation_history")):
+            return None
+        trace = TraceWriter(self.trace_dir, max_bytes=self.trace_max_bytes, compress=self.trace_compress)
+        history = self.text_handler.conversation_history
+        trace.write({
+            "type": "session",
+            "handler": self.text_handler.__class__.__name__,
+            "system_prompt": history[0]["content"] if len(history) else None,
+        })
+        self.text_handler.bind_trace(trace)
+        return trace
+    
+    def _announce(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+        else:
+            logger.info(message)
     
     async def run(self):
         await self.stt_service.connect()
         tasks = []
+        trace = None
         try:
-            print("Preparing to start...")
+            # Inside the try: if the trace cannot be opened, the cleanup still disconnects
+            trace = self._open_trace()
+            self._announce("Preparing to start...")
             record_task = asyncio.create_task(self.audio_input_provider.receive_audio())
             send_task = asyncio.create_task(self.stt_service.send_audio())
             receive_task = asyncio.create_task(self.stt_service.receive_results())
             consume_task = asyncio.create_task(self.text_handler.process_text())
             tasks = [record_task, send_task, receive_task, consume_task]
-            print("Start speaking now...")
+            self._announce("Start speaking now...")
             
             done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
             first_exc = None
@@ -75,6 +122,12 @@ class RealTimeTask:
                 raise first_exc
 
             logger.info("Workflow completed successfully.")
+        except asyncio.CancelledError:
+            logger.info("Session cancelled, stopping all tasks...")
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            raise
         except KeyboardInterrupt:
             logger.info("KeyboardInterrupt received, initiating graceful shutdown...")
             if not record_task.done():
@@ -97,18 +150,19 @@ class RealTimeTask:
             if tasks:
                 await asyncio.gather(*tasks, return_exceptions=True)
                 
-            if hasattr(self.text_handler, "conversation_history") and self.trace_conversation:
-                import json
-                import uuid
-                import os
-                os.makedirs("trace", exist_ok=True)
-                with open(f"trace/conversation_history-{uuid.uuid4()}.json", "w", encoding="utf-8") as f:
-                    json.dump(self.text_handler.conversation_history, f, ensure_ascii=False, indent=4)
+            if trace is not None:
+                self.text_handler.bind_trace(None)
+                await trace.aclose()
+            try:
+                await self.text_handler.close()
+            except Exception as e:
+                logger.warning(f"Error closing the text handler: {e}")
             try:
                 await self.stt_service.disconnect()
                 logger.info("Disconnected from STT service")
             except Exception as e:
                 logger.warning(f"Error during disconnect: {e}")
+            self._report_latency()
             logger.info("Cleanup completed.")   
     
     def run_app(self):
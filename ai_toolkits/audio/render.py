@@ -0,0 +1,107 @@
+"""
+Terminal presentation for text handlers, decoupled from token consumption.
+
+Handlers append streamed tokens to a ``TokenBuffer``, which is cheap.
+``RichRenderer`` samples the buffer at a fixed frame rate on Rich's refresh
+thread, so rendering cost no longer scales with the token rate.
+``HeadlessRenderer`` renders nothing and is meant for servers and benchmarks.
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Protocol
+
+from rich.console import Console
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBuffer:
+    """Append-only token buffer; ``text`` is joined lazily and cached."""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._text = ""
+        self._joined = 0
+
+    def append(self, token: str) -> None:
+        self._parts.append(token)
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    @property
+    def text(self) -> str:
+        if self._joined != len(self._parts):
+            # Snapshot the length first: the render thread may read while tokens arrive
+            count = len(self._parts)
+            self._text += "".join(self._parts[self._joined:count])
+            self._joined = count
+        return self._text
+
+
+class Renderer(Protocol):
+    def panel(self, text: str, title: str, border_style: str = "blue", style: str = "") -> None:
+        """Print a permanent panel."""
+        ...
+
+    def stream(self, buffer: TokenBuffer, title: str, border_style: str = "blue"):
+        """Context manager showing ``buffer`` live until the block exits."""
+        ...
+
+
+class _BufferView:
+    """Rich renderable that draws the current buffer content when sampled."""
+
+    def __init__(self, buffer: TokenBuffer, title: str, border_style: str):
+        self.buffer = buffer
+        self.title = title
+        self.border_style = border_style
+
+    def __rich__(self) -> Panel:
+        return Panel(Text(self.buffer.text, overflow="fold", no_wrap=False),
+                     title=self.title, title_align="left",
+                     border_style=self.border_style, padding=(0, 1))
+
+
+class RichRenderer:
+    """
+    Rich panels, with streamed text refreshed at most ``fps`` times per second.
+
+    Args:
+        console: Rich console, a new one by default
+        fps: Frame rate of live (streaming) panels
+    """
+
+    def __init__(self, console: Optional[Console] = None, fps: float = 10):
+        self.console = console or Console()
+        self.fps = fps
+
+    def panel(self, text: str, title: str, border_style: str = "blue", style: str = "") -> None:
+        self.console.print(Panel(Text(text, style=style, overflow="fold", no_wrap=False),
+                                 title=title, title_align="left",
+                                 border_style=border_style, padding=(0, 1)))
+
+    @contextmanager
+    def stream(self, buffer: TokenBuffer, title: str, border_style: str = "blue") -> Iterator[TokenBuffer]:
+        view = _BufferView(buffer, title, border_style)
+        with Live(view, console=self.console, refresh_per_second=self.fps, transient=True):
+            yield buffer
+
+
+class HeadlessRenderer:
+    """Renders nothing; panels are logged at debug level."""
+
+    def panel(self, text: str, title: str, border_style: str = "blue", style: str = "") -> None:
+        logger.debug(f"{title}: {text}")
+
+    @contextmanager
+    def stream(self, buffer: TokenBuffer, title: str, border_style: str = "blue") -> Iterator[TokenBuffer]:
+        yield buffer
+
+
+def make_renderer(headless: bool = False, fps: float = 10) -> Renderer:
+    return HeadlessRenderer() if headless else RichRenderer(fps=fps)
@@ -0,0 +1,66 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+
+class ReplayBuffer:
+    """
+    Audio sent to the ASR service that no final result has covered yet.
+
+    Every message is appended *before* it is sent, with its position in the
+    session's audio timeline (ms, as used by the result ``start_time`` /
+    ``end_time``). Results acknowledge audio up to an offset; whatever is left
+    is replayed, in order, onto the next session after a reconnect.
+
+    The buffer keeps at most ``max_ms`` of audio (the newest message is
+    always kept, so the message whose send failed is never lost). Audio that
+    had to be dropped is counted in ``dropped_ms``.
+
+    Args:
+        max_ms: Maximum buffered audio duration
+        bytes_per_ms: Size of one millisecond of audio as sent
+    """
+
+    def __init__(self, max_ms: float = 5000, bytes_per_ms: float = 16):
+        self.max_ms = max_ms
+        self.bytes_per_ms = bytes_per_ms
+        self.dropped_ms = 0.0
+        # (payload, session start ms, session end ms, capture time ms)
+        self._entries: Deque[Tuple[bytes, float, float, Optional[float]]] = deque()
+        self._session_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def buffered_ms(self) -> float:
+        if not self._entries:
+            return 0.0
+        return self._entries[-1][2] - self._entries[0][1]
+
+    @property
+    def oldest_offset_ms(self) -> float:
+        """Session offset of the oldest buffered audio (the session end if nothing is buffered)."""
+        return self._entries[0][1] if self._entries else self._session_ms
+
+    def append(self, payload: bytes, captured_ms: Optional[float] = None) -> None:
+        start = self._session_ms
+        self._session_ms += len(payload) / self.bytes_per_ms
+        self._entries.append((payload, start, self._session_ms, captured_ms))
+        while len(self._entries) > 1 and self.buffered_ms > self.max_ms:
+            _, dropped_start, dropped_end, _ = self._entries.popleft()
+            self.dropped_ms += dropped_end - dropped_start
+
+    def acknowledge(self, offset_ms: float) -> None:
+        """Forget audio that ends at or before ``offset_ms`` of the current session."""
+        while self._entries and self._entries[0][2] <= offset_ms:
+            self._entries.popleft()
+
+    def take(self) -> List[Tuple[bytes, Optional[float]]]:
+        """
+        Start a new session: return the unacknowledged ``(payload, captured_ms)``
+        in order and empty the buffer; replayed messages are appended again.
+        """
+        entries = [(payload, captured_ms) for payload, _, _, captured_ms in self._entries]
+        self._entries.clear()
+        self._session_ms = 0.0
+        return entries
@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Literal, Optional, Tuple
+
+OverflowPolicy = Literal["drop_oldest", "drop_newest"]
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity, thread-safe ring buffer of audio chunks.
+
+    Storage is a single preallocated ``bytearray`` of ``capacity`` slots of
+    ``chunk_bytes`` each, so the capture thread never allocates while writing.
+    When the buffer is full the ``overflow_policy`` decides which audio is lost:
+
+    - ``drop_oldest``: overwrite the oldest unread chunk (keeps latency low)
+    - ``drop_newest``: discard the incoming chunk (keeps the oldest audio)
+
+    Each slot also keeps the ``time.monotonic_ns()`` of its write, so readers
+    can tell when the audio was captured (``read_timed``).
+
+    Attributes:
+        chunks_written: Chunks accepted into the buffer
+        chunks_read: Chunks handed to the reader
+        chunks_dropped: Chunks lost because the buffer was full
+    """
+
+    def __init__(self, capacity: int, chunk_bytes: int, overflow_policy: OverflowPolicy = "drop_oldest"):
+        if capacity <= 0 or chunk_bytes <= 0:
+            raise ValueError("capacity and chunk_bytes must be positive")
+        if overflow_policy not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.capacity = capacity
+        self.chunk_bytes = chunk_bytes
+        self.overflow_policy = overflow_policy
+
+        self._buffer = bytearray(capacity * chunk_bytes)
+        self._lengths = [0] * capacity
+        self._written_ns = [0] * capacity
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+        self.chunks_written = 0
+        self.chunks_read = 0
+        self.chunks_dropped = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def write(self, data: bytes) -> bool:
+        """
+        Store one chunk, splitting payloads larger than ``chunk_bytes``.
+
+        Returns:
+            bool: False if (part of) the data was dropped because the buffer was full.
+        """
+        accepted = True
+        view = memoryview(data)
+        now_ns = time.monotonic_ns()
+        with self._lock:
+            for offset in range(0, len(view), self.chunk_bytes):
+                piece = view[offset:offset + self.chunk_bytes]
+                if self._count == self.capacity:
+                    self.chunks_dropped += 1
+                    accepted = False
+                    if self.overflow_policy == "drop_newest":
+                        continue
+                    self._head = (self._head + 1) % self.capacity
+                    self._count -= 1
+
+                slot = (self._head + self._count) % self.capacity
+                start = slot * self.chunk_bytes
+                self._buffer[start:start + len(piece)] = piece
+                self._lengths[slot] = len(piece)
+                self._written_ns[slot] = now_ns
+                self._count += 1
+                self.chunks_written += 1
+        return accepted
+
+    def read(self) -> Optional[bytes]:
+        """Pop the oldest chunk, or return None if the buffer is empty."""
+        item = self.read_timed()
+        return None if item is None else item[0]
+
+    def read_timed(self) -> Optional[Tuple[bytes, int]]:
+        """Pop the oldest chunk with its write time (``time.monotonic_ns()``), or None."""
+        with self._lock:
+            if self._count == 0:
+                return None
+            start = self._head * self.chunk_bytes
+            chunk = bytes(self._buffer[start:start + self._lengths[self._head]])
+            written_ns = self._written_ns[self._head]
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self.chunks_read += 1
+            return chunk, written_ns
+
+    def clear(self) -> None:
+        with self._lock:
+            self._head = 0
+            self._count = 0
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "buffered": self._count,
+            "chunks_written": self.chunks_written,
+            "chunks_read": self.chunks_read,
+            "chunks_dropped": self.chunks_dropped,
+        }
@@ -0,0 +1,219 @@
+"""
+Run many isolated voice sessions on one event loop.
+
+Every session gets its own ``TencentASR`` connection, text handler and
+queues, while the expensive pieces are shared: one ``TencentASRConfig``
+(credentials are read once) and one pooled async LLM client.
+
+Example:
+    manager = SessionManager(max_sessions=200)
+    session = await manager.start_session(
+        FileAudioReader("calls/0001.wav"),
+        lambda: ConversationStreamHandler(async_client=manager.llm_client),
+    )
+    await manager.wait_all()
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Set
+from uuid import uuid4
+
+from .base import AudioStreamReader, BaseTextHandler
+from .microphone import DEFAULT_AUDIO_QUEUE_SIZE
+from .real_time import RealTimeTask
+from .tencent_asr import TencentASR, TencentASRConfig
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionError(RuntimeError):
+    """Raised when a session cannot be admitted because the manager is full."""
+
+
+@dataclass
+class ManagedSession:
+    """A running (or finished) session owned by a ``SessionManager``."""
+    session_id: str
+    task: RealTimeTask
+    runner: Optional[asyncio.Task] = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def done(self) -> bool:
+        return self.runner is not None and self.runner.done()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.runner is not None and self.runner.cancelled()
+
+    def cancel(self) -> bool:
+        """Request cancellation of this session only."""
+        return self.runner is not None and self.runner.cancel()
+
+    async def wait(self) -> None:
+        """Wait for the session to finish, swallowing its cancellation."""
+        if self.runner is not None:
+            await asyncio.gather(self.runner, return_exceptions=True)
+
+
+class SessionManager:
+    """
+    Admission-controlled runtime for concurrent ``RealTimeTask`` sessions.
+
+    Args:
+        max_sessions: Maximum number of concurrently running sessions
+        asr_config: Shared ASR endpoint/credentials, read from the environment if omitted
+        llm_client: Shared async LLM client, created on first use of ``llm_client``
+        vad_silence: VAD silence threshold passed to every ``TencentASR``
+        audio_queue_size: Bound of each session's audio input queue
+        stt_factory: Optional ``(manager) -> BaseSTT`` override, e.g. to add VAD
+
+    ``sessions`` holds the running sessions by id. A finished session is
+    removed (the ``ManagedSession`` returned by ``start_session`` stays
+    usable) and only counted in ``stats``, so a long-running server does not
+    keep every call it ever handled.
+    """
+
+    def __init__(self,
+                 max_sessions: int = 100,
+                 asr_config: Optional[TencentASRConfig] = None,
+                 llm_client=None,
+                 vad_silence: int = 500,
+                 audio_queue_size: int = DEFAULT_AUDIO_QUEUE_SIZE,
+                 stt_factory: Optional[Callable[["SessionManager"], object]] = None):
+        self.max_sessions = max_sessions
+        self.asr_config = asr_config or TencentASRConfig.from_env()
+        self.vad_silence = vad_silence
+        self.audio_queue_size = audio_queue_size
+        self.stt_factory = stt_factory
+        self._llm_client = llm_client
+
+        self._slots = asyncio.Semaphore(max_sessions)
+        self.sessions: Dict[str, ManagedSession] = {}
+        # Ids of sessions waiting for admission, so a concurrent start with the same id is refused
+        self._reserved: Set[str] = set()
+        self._active = 0
+        self.stats = {"admitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    @property
+    def llm_client(self):
+        """The pooled async LLM client shared by every session's text handler."""
+        if self._llm_client is None:
+            from ai_toolkits.llms.openai_provider import create_async_client
+            self._llm_client = create_async_client()
+        return self._llm_client
+
+    @property
+    def active_sessions(self) -> int:
+        return self._active
+
+    def _create_stt(self):
+        if self.stt_factory is not None:
+            return self.stt_factory(self)
+        return TencentASR(vad_silence=self.vad_silence, config=self.asr_config)
+
+    async def start_session(self,
+                            audio_source: AudioStreamReader,
+                            handler_factory: Callable[[], BaseTextHandler],
+                            session_id: Optional[str] = None,
+                            admission_timeout: Optional[float] = 0) -> ManagedSession:
+        """
+        Admit and start a new session.
+
+        Args:
+            audio_source: Audio reader for this call (microphone, file replay, ...)
+            handler_factory: Creates the session's text handler; use
+                ``self.llm_client`` inside it to share the LLM connection pool
+            session_id: Optional id, a random one is generated otherwise
+            admission_timeout: ``0`` rejects immediately when full, ``None`` waits
+                for a free slot indefinitely, a number waits up to that many seconds
+
+        Raises:
+            AdmissionError: If no slot became available
+            ValueError: If ``session_id`` is already in use
+        """
+        session_id = session_id or uuid4().hex
+        if session_id in self.sessions or session_id in self._reserved:
+            raise ValueError(f"Session {session_id} is already running")
+
+        self._reserved.add(session_id)
+        try:
+            if not await self._acquire_slot(admission_timeout):
+                self.stats["rejected"] += 1
+                raise AdmissionError(f"Session limit of {self.max_sessions} reached")
+
+            try:
+                task = RealTimeTask(
+                    audio_input_provider=audio_source,
+                    text_handler=handler_factory(),
+                    stt_service=self._create_stt(),
+                    audio_input_queue=asyncio.Queue(maxsize=self.audio_queue_size),
+                    text_output_queue=asyncio.Queue(),
+                    trace_conversation=False,
+                    verbose=False,
+                )
+            except BaseException:
+                self._slots.release()
+                raise
+
+            session = ManagedSession(session_id=session_id, task=task)
+            session.runner = asyncio.create_task(task.run(), name=f"session-{session_id}")
+            session.runner.add_done_callback(lambda _: self._on_session_done(session))
+            self.sessions[session_id] = session
+        finally:
+            self._reserved.discard(session_id)
+        self._active += 1
+        self.stats["admitted"] += 1
+        logger.info(f"Session {session_id} started ({self.active_sessions}/{self.max_sessions} active)")
+        return session
+
+    async def _acquire_slot(self, timeout: Optional[float]) -> bool:
+        if timeout == 0:
+            if self._slots.locked():
+                return False
+            await self._slots.acquire()
+            return True
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _on_session_done(self, session: ManagedSession) -> None:
+        self._slots.release()
+        self._active -= 1
+        self.sessions.pop(session.session_id, None)
+        session.finished_at = time.monotonic()
+        if session.runner.cancelled():
+            self.stats["cancelled"] += 1
+            logger.info(f"Session {session.session_id} cancelled")
+        elif session.runner.exception() is not None:
+            session.error = session.runner.exception()
+            self.stats["failed"] += 1
+            logger.error(f"Session {session.session_id} failed: {session.error}")
+        else:
+            self.stats["completed"] += 1
+            logger.info(f"Session {session.session_id} completed")
+
+    def cancel(self, session_id: str) -> bool:
+        """Cancel one session; other sessions are not affected."""
+        session = self.sessions.get(session_id)
+        return session is not None and session.cancel()
+
+    async def wait_all(self) -> None:
+        """Wait until every admitted session, including ones started meanwhile, has finished."""
+        while runners := [s.runner for s in self.sessions.values() if s.runner is not None]:
+            await asyncio.gather(*runners, return_exceptions=True)
+            # Let the done callbacks remove the finished sessions
+            await asyncio.sleep(0)
+
+    async def shutdown(self) -> None:
+        """Cancel all running sessions and wait for their cleanup."""
+        for session in list(self.sessions.values()):
+            session.cancel()
+        await self.wait_all()
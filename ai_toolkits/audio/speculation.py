@@ -0,0 +1,108 @@
+"""
+Speculative LLM generation on stable partial transcripts.
+
+While the user is still speaking the ASR service only sends partials; the
+final sentence arrives ``vad_silence`` ms after the user stopped. A
+``SpeculativeCompletion`` starts the chat completion as soon as the partial
+hypothesis has been stable for a while and buffers the streamed tokens. If
+the final transcript matches the speculated one the buffered tokens are
+committed instantly, otherwise the speculation is cancelled.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_IGNORED = re.compile(r"[\W_]+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Drop whitespace and punctuation, which the final result often adds."""
+    return _IGNORED.sub("", text or "").lower()
+
+
+class SpeculativeCompletion:
+    """
+    A chat completion started ahead of the final transcript.
+
+    Args:
+        text: The partial transcript the completion was started for
+        open_stream: Coroutine factory returning an async iterator of content
+            strings, e.g. the handler's streaming completion
+        delay: Seconds to wait before actually calling the LLM; the
+            speculation can still be cancelled for free during the delay
+    """
+
+    def __init__(self,
+                 text: str,
+                 open_stream: Callable[[], Awaitable[AsyncIterator[str]]],
+                 delay: float = 0.0):
+        self.text = text
+        self.key = normalize_transcript(text)
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.tokens_buffered = 0
+        self.error: Optional[Exception] = None
+        # Token usage of the completion, filled in by ``open_stream`` if it reports it
+        self.usage: dict = {}
+        self._open_stream = open_stream
+        self._delay = delay
+        self._tokens: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def launched(self) -> bool:
+        """True once the LLM request has been sent."""
+        return self.started_at is not None
+
+    def matches(self, text: str) -> bool:
+        return self.key == normalize_transcript(text)
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    async def _run(self) -> None:
+        try:
+            if self._delay > 0:
+                await asyncio.sleep(self._delay)
+            self.started_at = time.monotonic()
+            async for content in await self._open_stream():
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                self.tokens_buffered += 1
+                self._tokens.put_nowait(content)
+        except Exception as e:
+            logger.warning(f"Speculative completion failed: {e}")
+            self.error = e
+        finally:
+            self._tokens.put_nowait(None)
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    async def contents(self) -> AsyncIterator[str]:
+        """Buffered content first, then the rest of the stream as it arrives."""
+        while (content := await self._tokens.get()) is not None:
+            yield content
+        if self.error is not None:
+            raise self.error
+
+
+def summarize_turns(turn_stats: List[dict]) -> dict:
+    """Aggregate per-turn speculation records into hit rate and latency saved."""
+    turns = len(turn_stats)
+    hits = [t for t in turn_stats if t["speculation"] == "hit"]
+    speculated = [t for t in turn_stats if t["speculation"] in ("hit", "miss")]
+    return {
+        "turns": turns,
+        "speculated": len(speculated),
+        "hits": len(hits),
+        "hit_rate": len(hits) / turns if turns else 0.0,
+        "mean_latency_saved_ms": sum(t["latency_saved_ms"] for t in hits) / len(hits) if hits else 0.0,
+        "wasted_speculations": sum(t["wasted_speculations"] for t in turn_stats),
+    }
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import bisect
+import copy
 import hashlib
 import hmac
 import json
@@ -11,19 +13,47 @@ import time
 import urllib.parse
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from dataclasses import dataclass, replace
+from typing import List, Optional
 from uuid import uuid4
 
 import websockets
 from pydantic import BaseModel, Field
-import os
 from ai_toolkits.load_env import get_env_var
+from .types import AudioInputFrame, FastAudioFrame, StreamTextInputFrame
+from .partials import PartialStabilityTracker
+from .audio_format import AudioConverter, AudioFormat, ENGINE_SAMPLING_RATES, negotiate_engine
+from .vad import EnergyVAD
+from .latency import LatencyRecorder, monotonic_ms
+from .replay_buffer import ReplayBuffer
 
-# Configuration
-BASE_URL = get_env_var("TENCENT_ASR_BASE_URL") 
-PART_URL = get_env_var("TENCENT_ASR_PART_URL") 
-SECRET_KEY = get_env_var("TENCENT_ASR_SECRET_KEY")
-SECRET_ID = get_env_var("TENCENT_ASR_SECRET_ID")
+
+@dataclass(frozen=True)
+class TencentASRConfig:
+    """
+    Connection settings and credentials for Tencent real-time ASR.
+
+    One config can be shared by any number of ``TencentASR`` sessions.
+    Use ``from_env`` to read the ``TENCENT_ASR_*`` environment variables.
+    """
+    base_url: Optional[str] = None
+    part_url: Optional[str] = None
+    secret_id: Optional[str] = None
+    secret_key: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> 'TencentASRConfig':
+        """Create a config from the ``TENCENT_ASR_*`` environment variables."""
+        return cls(
+            base_url=get_env_var("TENCENT_ASR_BASE_URL"),
+            part_url=get_env_var("TENCENT_ASR_PART_URL"),
+            secret_id=get_env_var("TENCENT_ASR_SECRET_ID"),
+            secret_key=get_env_var("TENCENT_ASR_SECRET_KEY"),
+        )
+
+
+# Returned by _next_audio_chunk when a pending send batch reached its max delay
+_BATCH_DEADLINE = object()
 
 
 class ASRConnectionState(Enum):
@@ -34,6 +64,17 @@ class ASRConnectionState(Enum):
     ENDING = "ending"
 
 
+class ASRRefusedError(ConnectionError):
+    """
+    Raised when the service answers the handshake with a non-zero ``code``,
+    e.g. because the account's concurrent session quota is used up.
+    """
+
+    def __init__(self, code: int, response: str):
+        super().__init__(f"ASR authentication failed: {response}")
+        self.code = code
+
+
 class TencentASRResponse(BaseModel):
     """Represents a response from Tencent ASR service."""
     
@@ -100,20 +141,27 @@ def _url_encode(component: str) -> str:
 
 def _generate_signature(message: str, secret_key: str = None) -> str:
     """Generate HMAC-SHA1 signature for authentication."""
-    secret_key = secret_key or SECRET_KEY
+    secret_key = secret_key or ""
     hmac_obj = hmac.new(secret_key.encode(), message.encode(), hashlib.sha1)
     hmac_digest = hmac_obj.digest()
     return base64.b64encode(hmac_digest).decode('utf-8')
 
 
-def _build_api_url(vad_silence: int = 1000) -> str:
-    """Build the WebSocket API URL with authentication parameters."""
+def _build_api_url(config: TencentASRConfig, vad_silence: int = 1000, engine_model_type: str = "8k_zh") -> str:
+    """
+    Build the WebSocket API URL with authentication parameters.
+
+    Args:
+        config: Endpoint and credentials to sign the request with
+        vad_silence: VAD silence threshold in milliseconds
+        engine_model_type: Recognition engine, e.g. ``8k_zh`` or ``16k_zh``
+    """
     params = [
-        "engine_model_type=8k_zh",
+        f"engine_model_type={engine_model_type}",
         "needvad=1",
         f"timestamp={int(time.time())}",
         f"vad_silence_time={vad_silence}",
-        f"secretid={SECRET_ID}",
+        f"secretid={config.secret_id}",
         f"expired={int((datetime.now() + timedelta(days=1)).timestamp())}",
         f"voice_id={_generate_unique_id()}",
         "voice_format=1",
@@ -122,10 +170,10 @@ def _build_api_url(vad_silence: int = 1000) -> str:
     params.sort()
     
     query_string = "&".join(params)
-    signature = _generate_signature(PART_URL + query_string)
+    signature = _generate_signature((config.part_url or "") + query_string, config.secret_key)
     encoded_signature = _url_encode(signature)
     
-    return f"{BASE_URL}{query_string}&signature={encoded_signature}"
+    return f"{config.base_url}{query_string}&signature={encoded_signature}"
 
 class TencentASR:
     """
@@ -138,7 +186,19 @@ class TencentASR:
     def __init__(self, 
                  audio_input_queue: Optional[asyncio.Queue] = None,
                  text_output_queue: Optional[asyncio.Queue] = None,
-                 vad_silence: int = 500):
+                 vad_silence: int = 500,
+                 base_url: Optional[str] = None,
+                 config: Optional[TencentASRConfig] = None,
+                 vad: Optional[EnergyVAD] = None,
+                 send_batch_ms: int = 0,
+                 send_batch_bytes: Optional[int] = None,
+                 send_max_delay_ms: int = 100,
+                 engine_model_type: str = "8k_zh",
+                 stream_partials: bool = False,
+                 partial_stable_ms: int = 300,
+                 replay_buffer_ms: int = 5000,
+                 reconnect_backoff_ms: int = 200,
+                 reconnect_backoff_max_ms: int = 5000):
         """
         Initialize Tencent ASR client.
         
@@ -146,11 +206,70 @@ class TencentASR:
             audio_input_queue: Queue for incoming audio data
             text_output_queue: Queue for outgoing transcription results
             vad_silence: VAD silence threshold in milliseconds
+            base_url: Optional WebSocket base URL overriding ``config.base_url``
+            config: Shared endpoint/credentials, read from the environment if omitted
+            vad: Optional client-side VAD; silent chunks it rejects are not sent.
+                The session uses a copy, the object passed in is not modified
+            send_batch_ms: Coalesce queued audio into messages of this duration
+                (e.g. 100-200); ``0`` sends one message per chunk
+            send_batch_bytes: Alternative batch target in bytes
+            send_max_delay_ms: Maximum time audio waits in an incomplete batch
+            engine_model_type: Recognition engine; replaced by ``negotiate_format``
+                when the audio source advertises its ``AudioFormat``
+            stream_partials: Emit interim and final results as ``StreamTextInputFrame``
+                instead of plain strings for finished sentences only
+            partial_stable_ms: Time a character must survive unchanged to count
+                towards a partial's ``stable_prefix_len``
+            replay_buffer_ms: Sent audio not yet covered by a result that is
+                kept and replayed, in order, after a reconnect
+            reconnect_backoff_ms: Base delay of the jittered exponential
+                reconnect backoff
+            reconnect_backoff_max_ms: Maximum reconnect delay
         """
         self._vad_silence = vad_silence
-        self._websocket_url = _build_api_url(vad_silence)
+        self._config = config or TencentASRConfig.from_env()
+        if base_url:
+            self._config = replace(self._config, base_url=base_url)
+        self._engine_model_type = engine_model_type
+        self._sampling_rate = ENGINE_SAMPLING_RATES[engine_model_type.split("_")[0]]
+        self._converter: Optional[AudioConverter] = None
+        self._websocket_url = _build_api_url(self._config, vad_silence, engine_model_type)
         self._logger = logging.getLogger(__name__)
         
+        # A detector is stateful and the caller's may be a template shared by
+        # sessions: work on a copy, so its hangover and rate are ours to set
+        self._vad = copy.deepcopy(vad)
+        if self._vad is not None:
+            # The server must still receive its own VAD silence to close a sentence
+            min_hangover = vad_silence + 200
+            if self._vad.hangover_ms is None:
+                self._vad.hangover_ms = min_hangover
+            elif self._vad.hangover_ms < min_hangover:
+                self._logger.warning(f"VAD hangover {self._vad.hangover_ms}ms is shorter than the ASR VAD silence "
+                                     f"{vad_silence}ms, sentences may not be finalized")
+        
+        # Send-side coalescing of audio chunks into fewer WebSocket messages
+        self._send_batch_ms = send_batch_ms
+        self._send_batch_bytes = send_batch_bytes or int(send_batch_ms * self._sampling_rate * 2 / 1000)
+        self._send_max_delay = send_max_delay_ms / 1000
+        self._pending_audio: List[bytes] = []
+        self._pending_bytes = 0
+        self._batch_deadline: Optional[float] = None
+        self.send_stats = {"messages": 0, "bytes": 0}
+        
+        # Latency instrumentation: audio offset (ms, as reported in results)
+        # at the end of each sent message -> when it was sent and captured
+        self.latency: Optional[LatencyRecorder] = None
+        self._audio_sent_ms = 0.0
+        self._sent_offsets: List[float] = []
+        self._sent_times: List[tuple] = []
+        self._pending_captured_ms: Optional[float] = None
+        
+        # Interim results
+        self._stream_partials = stream_partials
+        self._stability = PartialStabilityTracker(stable_ms=partial_stable_ms)
+        self._utterance_open = False
+        
         # Queues for audio and text processing
         self._audio_input_queue = audio_input_queue or asyncio.Queue()
         self._text_output_queue = text_output_queue or asyncio.Queue()
@@ -159,8 +278,27 @@ class TencentASR:
         self._websocket: Optional[websockets.WebSocketServerProtocol] = None
         self._connection_state = ASRConnectionState.DISCONNECTED
         
-        # Reconnection settings
+        # Reconnection settings: attempts per outage, jittered exponential backoff
         self._max_reconnects = 3
+        self._backoff_ms = reconnect_backoff_ms
+        self._backoff_max_ms = reconnect_backoff_max_ms
+        self._reconnect_lock = asyncio.Lock()
+        self._generation = 0
+        self._presigned_url: Optional[str] = None
+        self._presigned_at = 0.0
+        self._replay = ReplayBuffer(replay_buffer_ms, self._sampling_rate * 2 / 1000)
+        # Where the current session's audio starts in the whole stream; result
+        # offsets restart at 0 after a reconnect and are shifted by this
+        self._stream_offset_ms = 0.0
+        self.reconnect_stats = {
+            "reconnects": 0,
+            "failed_attempts": 0,
+            "outage_ms": 0.0,
+            "replayed_messages": 0,
+            "replayed_audio_ms": 0.0,
+            "replay_send_ms": 0.0,
+            "replay_dropped_ms": 0.0,
+        }
         
         # Synchronization primitives
         self._final_result_received = asyncio.Event()
@@ -173,6 +311,14 @@ class TencentASR:
     def bind_text_queue(self, queue: asyncio.Queue) -> None:
         """Bind a new text output queue."""
         self._text_output_queue = queue
+        
+    def bind_latency(self, latency: Optional[LatencyRecorder]) -> None:
+        """
+        Record per-chunk ``audio_queue``/``ws_send`` latencies and stamp final
+        ``StreamTextInputFrame``s with ``speech_end_captured``,
+        ``speech_end_sent`` and ``asr_final`` timings.
+        """
+        self.latency = latency
     
     @property
     def is_connected(self) -> bool:
@@ -187,6 +333,40 @@ class TencentASR:
         except AttributeError:
             return False
     
+    def negotiate_format(self, source_format: AudioFormat, language: str = "zh") -> str:
+        """
+        Pick the engine for the audio source and set up conversion to its input format.
+        
+        Must be called before ``connect``. G.711 sources are decoded and sources
+        at other rates are resampled to the chosen engine's sampling rate.
+        
+        Returns:
+            str: The selected ``engine_model_type``
+        """
+        if self._connection_state != ASRConnectionState.DISCONNECTED:
+            raise RuntimeError("Audio format must be negotiated before connecting")
+        
+        self._engine_model_type, self._sampling_rate = negotiate_engine(source_format, language)
+        converter = AudioConverter(source_format, self._sampling_rate)
+        self._converter = None if converter.is_passthrough else converter
+        if self._send_batch_ms:
+            self._send_batch_bytes = int(self._send_batch_ms * self._sampling_rate * 2 / 1000)
+        if self._vad is not None:
+            self._vad.set_sampling_rate(self._sampling_rate)
+        self._replay.bytes_per_ms = self._sampling_rate * 2 / 1000
+        self._websocket_url = _build_api_url(self._config, self._vad_silence, self._engine_model_type)
+        self._logger.info(f"Negotiated engine {self._engine_model_type} for source {source_format}")
+        return self._engine_model_type
+    
+    @property
+    def engine_model_type(self) -> str:
+        return self._engine_model_type
+    
+    @property
+    def vad(self) -> Optional[EnergyVAD]:
+        """This session's copy of the client-side VAD, exposing ``saved_ratio`` and ``stats()``."""
+        return self._vad
+    
     @property
     def audio_input_queue(self) -> asyncio.Queue:
         """Get the audio input queue."""
@@ -202,7 +382,8 @@ class TencentASR:
         Connect to Tencent ASR WebSocket service.
         
         Raises:
-            ConnectionError: If connection or authentication fails
+            ASRRefusedError: If the service refuses the session (authentication, quota)
+            ConnectionError: If the connection fails
         """
         if self._connection_state != ASRConnectionState.DISCONNECTED:
             self._logger.warning("Already connected or connecting")
@@ -219,10 +400,11 @@ class TencentASR:
             auth_data = json.loads(auth_response)
             
             if auth_data.get('code') != 0:
-                raise ConnectionError(f"ASR authentication failed: {auth_response}")
+                raise ASRRefusedError(auth_data.get('code'), auth_response)
             
             self._connection_state = ASRConnectionState.CONNECTED
             self._logger.info("ASR WebSocket connection successful")
+            self._presign_url()
             
         except Exception as e:
             self._connection_state = ASRConnectionState.DISCONNECTED
@@ -248,17 +430,93 @@ class TencentASR:
             self._websocket = None
             self._connection_state = ASRConnectionState.DISCONNECTED
     
-    async def _try_reconnect(self) -> bool:
-        """Try to reconnect with fresh URL."""
-        try:
+    def _presign_url(self) -> None:
+        """Sign the URL of the next session ahead of time, so a reconnect does not wait for it."""
+        self._presigned_url = _build_api_url(self._config, self._vad_silence, self._engine_model_type)
+        self._presigned_at = time.monotonic()
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff, in seconds."""
+        ceiling = min(self._backoff_max_ms, self._backoff_ms * 2 ** attempt)
+        return random.uniform(0, ceiling) / 1000
+    
+    async def _wait_for_reconnect(self) -> None:
+        """Wait while the other loop is reconnecting."""
+        if self._reconnect_lock.locked():
+            async with self._reconnect_lock:
+                pass
+    
+    async def _reconnect(self, generation: int) -> bool:
+        """
+        Replace the session that failed, unless the other loop already did.
+        
+        Attempts use jittered exponential backoff and a pre-signed URL. The
+        unacknowledged audio of the replay buffer is sent to the new session
+        in order before anything else.
+        
+        Args:
+            generation: Session generation seen by the caller when it failed
+        """
+        async with self._reconnect_lock:
+            if generation != self._generation and self._connection_state == ASRConnectionState.CONNECTED:
+                return True
+            
+            lost_at = time.monotonic()
             await self.disconnect()
-            await asyncio.sleep(1)
-            self._websocket_url = _build_api_url(self._vad_silence)
-            await self.connect()
-            return True
-        except Exception as e:
-            self._logger.error(f"Reconnection failed: {e}")
+            for attempt in range(self._max_reconnects):
+                self._logger.info(f"Attempting reconnection {attempt + 1}/{self._max_reconnects}")
+                await asyncio.sleep(self._backoff_delay(attempt))
+                # Signatures carry a timestamp, re-sign if the pre-signed URL is stale
+                if self._presigned_url is None or time.monotonic() - self._presigned_at > 60:
+                    self._presign_url()
+                self._websocket_url, self._presigned_url = self._presigned_url, None
+                if self._vad is not None:
+                    self._vad.reset()
+                self._stability.reset()
+                self._utterance_open = False
+                # Result offsets restart with the new session
+                self._reset_send_offsets()
+                try:
+                    await self.connect()
+                    await self._replay_unacknowledged()
+                except Exception as e:
+                    self.reconnect_stats["failed_attempts"] += 1
+                    self._logger.error(f"Reconnection failed: {e}")
+                    await self.disconnect()
+                    continue
+                
+                self._generation += 1
+                outage_ms = (time.monotonic() - lost_at) * 1000
+                self.reconnect_stats["reconnects"] += 1
+                self.reconnect_stats["outage_ms"] += outage_ms
+                if self.latency is not None:
+                    self.latency.observe("reconnect", outage_ms)
+                return True
             return False
+    
+    async def _replay_unacknowledged(self) -> None:
+        """Send the buffered audio of the lost session to the new one, in order."""
+        self._stream_offset_ms += self._replay.oldest_offset_ms
+        entries = self._replay.take()
+        # Buffer everything again first, so a failure during the replay loses nothing
+        for payload, captured_ms in entries:
+            self._replay.append(payload, captured_ms)
+        started = monotonic_ms()
+        audio_ms = 0.0
+        for payload, captured_ms in entries:
+            await self._websocket.send(payload)
+            audio_ms += len(payload) / self._replay.bytes_per_ms
+            if self.latency is not None:
+                self._pending_captured_ms = captured_ms
+                self._record_send_offset(len(payload), monotonic_ms())
+        replay_ms = monotonic_ms() - started
+        self.reconnect_stats["replayed_messages"] += len(entries)
+        self.reconnect_stats["replayed_audio_ms"] += audio_ms
+        self.reconnect_stats["replay_send_ms"] += replay_ms
+        self.reconnect_stats["replay_dropped_ms"] = self._replay.dropped_ms
+        if self.latency is not None and entries:
+            self.latency.observe("replay", replay_ms)
+        self._logger.info(f"Replayed {len(entries)} messages ({audio_ms:.0f} ms of audio) in {replay_ms:.1f} ms")
         
     async def send_audio_stream(self) -> None:
         """
@@ -266,22 +524,31 @@ class TencentASR:
         
         Continuously reads audio chunks from the input queue and sends them
         as binary messages to the ASR WebSocket. Handles end signals properly.
+        When the connection drops, the session is replaced and the
+        unacknowledged audio is replayed before sending continues.
         """
         self._logger.info("Starting audio stream transmission")
-        reconnect_attempts = 0
         
         try:
-            while self._connection_state == ASRConnectionState.CONNECTED:
+            while True:
+                await self._wait_for_reconnect()
+                if self._connection_state != ASRConnectionState.CONNECTED:
+                    break
                 if not self._websocket:
                     self._logger.warning("WebSocket is None, stopping audio transmission")
                     break
                 
-                # Get audio chunk from queue
-                audio_chunk = await self._audio_input_queue.get()
-                task_completed = False
+                # Get audio chunk from queue, or flush a batch that waited too long
+                audio_chunk = await self._next_audio_chunk()
+                is_queue_item = audio_chunk is not _BATCH_DEADLINE
+                task_completed = not is_queue_item
+                await self._wait_for_reconnect()
+                generation = self._generation
                 
                 try:
-                    if await self._handle_audio_chunk(audio_chunk):
+                    if not is_queue_item:
+                        await self._flush_audio_batch()
+                    elif await self._handle_audio_chunk(audio_chunk):
                         # End signal processed, stop sending
                         task_completed = True
                         break
@@ -289,16 +556,9 @@ class TencentASR:
                 except (websockets.exceptions.ConnectionClosedError, 
                         websockets.exceptions.ConnectionClosedOK) as e:
                     self._logger.warning(f"Connection lost during audio transmission: {e}")
-                    
-                    # Try to reconnect
-                    if reconnect_attempts < self._max_reconnects:
-                        reconnect_attempts += 1
-                        self._logger.info(f"Attempting reconnection {reconnect_attempts}/{self._max_reconnects}")
-                        
-                        if await self._try_reconnect():
-                            # Put the chunk back for retry
-                            await self._audio_input_queue.put(audio_chunk)
-                            continue
+                    # The failed message is in the replay buffer and is resent in order
+                    if await self._reconnect(generation):
+                        continue
                     
                     self._logger.error("Max reconnection attempts reached or reconnection failed")
                     break
@@ -315,12 +575,34 @@ class TencentASR:
         finally:
             self._logger.info("Audio stream transmission completed")
     
+    async def _next_audio_chunk(self):
+        """
+        Get the next queue item.
+        
+        While a send batch is pending, waits at most until the batch deadline
+        and returns ``_BATCH_DEADLINE`` if nothing arrived in time.
+        """
+        if not self._pending_audio:
+            return await self._audio_input_queue.get()
+        try:
+            return self._audio_input_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        timeout = self._batch_deadline - asyncio.get_running_loop().time()
+        if timeout <= 0:
+            return _BATCH_DEADLINE
+        try:
+            return await asyncio.wait_for(self._audio_input_queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return _BATCH_DEADLINE
+    
     async def _handle_audio_chunk(self, audio_chunk) -> bool:
         """
         Handle a single audio chunk or end signal.
         
         Args:
-            audio_chunk: Audio data (bytes) or end signal (None/str)
+            audio_chunk: Audio data (bytes, FastAudioFrame or AudioInputFrame)
+                or end signal (None/str)
             
         Returns:
             True if end signal was processed, False otherwise
@@ -341,6 +623,12 @@ class TencentASR:
         elif isinstance(audio_chunk, (bytes, bytearray)):
             await self._send_binary_audio(audio_chunk)
         
+        elif isinstance(audio_chunk, FastAudioFrame):
+            await self._send_binary_audio(audio_chunk.data, captured_ms=audio_chunk.created_ns / 1e6)
+        
+        elif isinstance(audio_chunk, AudioInputFrame):
+            await self._send_binary_audio(audio_chunk.data)
+        
         else:
             self._logger.warning(f"Unexpected audio chunk type: {type(audio_chunk)}")
         
@@ -358,16 +646,91 @@ class TencentASR:
         
         return False
     
-    async def _send_binary_audio(self, audio_data: bytes) -> None:
-        """Send binary audio data to ASR service."""
-        if len(audio_data) > 0:
-            await self._websocket.send(audio_data)
-        else:
+    async def _send_binary_audio(self, audio_data: bytes, captured_ms: Optional[float] = None) -> None:
+        """
+        Send binary audio data to ASR service, filtered by the VAD if enabled.
+        
+        ``captured_ms`` is the monotonic capture time of the chunk (frames
+        only); plain bytes count as captured when they are dequeued.
+        """
+        if len(audio_data) == 0:
             self._logger.warning("Received empty audio chunk, skipping")
+            return
+        
+        if self.latency is not None:
+            if captured_ms is None:
+                captured_ms = monotonic_ms()
+            else:
+                self.latency.observe("audio_queue", monotonic_ms() - captured_ms)
+            self._pending_captured_ms = captured_ms
+        
+        if self._converter is not None:
+            audio_data = self._converter.convert(audio_data)
+        chunks = [audio_data] if self._vad is None else self._vad.process(audio_data)
+        
+        if not self._send_batch_bytes:
+            for chunk in chunks:
+                await self._send_message(chunk)
+            return
+        
+        for chunk in chunks:
+            if not self._pending_audio:
+                self._batch_deadline = asyncio.get_running_loop().time() + self._send_max_delay
+            self._pending_audio.append(chunk)
+            self._pending_bytes += len(chunk)
+        if self._pending_bytes >= self._send_batch_bytes:
+            await self._flush_audio_batch()
+    
+    async def _flush_audio_batch(self) -> None:
+        """Send all pending audio as one message; a failed message is replayed after reconnecting."""
+        if not self._pending_audio:
+            return
+        payload = self._pending_audio[0] if len(self._pending_audio) == 1 else b"".join(self._pending_audio)
+        self._pending_audio = []
+        self._pending_bytes = 0
+        self._batch_deadline = None
+        await self._send_message(payload)
+    
+    async def _send_message(self, payload: bytes) -> None:
+        # Kept until a result covers it, so it can be replayed after a reconnect
+        self._replay.append(payload, self._pending_captured_ms)
+        if self.latency is None:
+            await self._websocket.send(payload)
+        else:
+            started = monotonic_ms()
+            await self._websocket.send(payload)
+            sent = monotonic_ms()
+            self.latency.observe("ws_send", sent - started)
+            self._record_send_offset(len(payload), sent)
+        self.send_stats["messages"] += 1
+        self.send_stats["bytes"] += len(payload)
+    
+    def _record_send_offset(self, payload_bytes: int, sent_ms: float) -> None:
+        self._audio_sent_ms += payload_bytes / (self._sampling_rate * 2 / 1000)
+        self._sent_offsets.append(self._audio_sent_ms)
+        self._sent_times.append((sent_ms, self._pending_captured_ms or sent_ms))
+        if len(self._sent_offsets) > 2000:
+            # Results refer to recent audio only; keep the last ~40 s at 40 ms per message
+            del self._sent_offsets[:1000]
+            del self._sent_times[:1000]
+    
+    def _reset_send_offsets(self) -> None:
+        self._audio_sent_ms = 0.0
+        self._sent_offsets.clear()
+        self._sent_times.clear()
+    
+    def _speech_end_timings(self, end_audio_ms: float) -> dict:
+        """Monotonic timings of a final result ending at ``end_audio_ms`` of sent audio."""
+        timings = {"asr_final": monotonic_ms()}
+        i = bisect.bisect_left(self._sent_offsets, end_audio_ms)
+        if self._sent_offsets and i < len(self._sent_offsets):
+            timings["speech_end_sent"], timings["speech_end_captured"] = self._sent_times[i]
+        return timings
     
     async def _send_end_signal(self) -> None:
         """Send end signal to ASR service if not already sent."""
         if not self._end_signal_sent:
+            await self._flush_audio_batch()
             end_message = json.dumps({"type": "end"})
             await self._websocket.send(end_message)
             self._end_signal_sent = True
@@ -384,14 +747,17 @@ class TencentASR:
         Stops when final result is received or connection is closed.
         """
         self._logger.info("Starting to receive ASR results")
-        reconnect_attempts = 0
         
         try:
-            while self._connection_state in (ASRConnectionState.CONNECTED, ASRConnectionState.ENDING):
+            while True:
+                await self._wait_for_reconnect()
+                if self._connection_state not in (ASRConnectionState.CONNECTED, ASRConnectionState.ENDING):
+                    break
                 if not self._websocket:
                     self._logger.warning("WebSocket is None, stopping result reception")
                     break
                 
+                generation = self._generation
                 try:
                     message = await self._websocket.recv()
                 except (websockets.exceptions.ConnectionClosedOK,
@@ -403,19 +769,14 @@ class TencentASR:
                         self._logger.info("Connection closed during ending state, this is expected")
                         break
                     
-                    # Try to reconnect
-                    if reconnect_attempts < self._max_reconnects:
-                        reconnect_attempts += 1
-                        self._logger.info(f"Attempting reconnection {reconnect_attempts}/{self._max_reconnects}")
-                        
-                        if await self._try_reconnect():
-                            continue
+                    if await self._reconnect(generation):
+                        continue
                     
                     self._logger.error("Max reconnection attempts reached or reconnection failed")
                     break
                 
                 try:
-                    if await self._process_asr_message(message):
+                    if await self._process_asr_message(message, current_session=generation == self._generation):
                         # Final result received, stop processing
                         break
                         
@@ -430,12 +791,14 @@ class TencentASR:
         finally:
             self._logger.info("ASR result reception completed")
     
-    async def _process_asr_message(self, message: str) -> bool:
+    async def _process_asr_message(self, message: str, current_session: bool = True) -> bool:
         """
         Process a single ASR message.
         
         Args:
             message: Raw message from ASR service
+            current_session: False if the session was replaced since the
+                message was received; its offsets must not acknowledge audio
             
         Returns:
             True if final result was received, False otherwise
@@ -444,6 +807,8 @@ class TencentASR:
         self._logger.debug(f"Received ASR data: {data}")
         
         response = TencentASRResponse.from_tencent_data(data)
+        if current_session and 'result' in data:
+            self._acknowledge(response)
         
         # Log response details
         self._logger.debug(f"ASR Response - sentence: '{response.sentence}', "
@@ -453,9 +818,14 @@ class TencentASR:
                           f"is_final: {response.is_final_result}")
         
         # Send meaningful results to output queue
-        if response.is_vad_end or response.is_final_result:
+        if self._stream_partials:
+            await self._emit_stream_frame(response, is_result='result' in data)
+        elif response.is_vad_end or response.is_final_result:
             if response.has_content:
                 self._logger.info(f"Got ASR result: {response.sentence}")
+                if self.latency is not None:
+                    # Plain strings carry no timings, observe the recognition stage here
+                    self.latency.observe_marks(self._speech_end_timings(response.end_time))
                 await self._text_output_queue.put(response.sentence)
         
         # Check for final result
@@ -465,6 +835,53 @@ class TencentASR:
             return True
             
         return False
+    
+    def _acknowledge(self, response: TencentASRResponse) -> None:
+        """Drop replay audio the service no longer needs: before a sentence start, up to a sentence end."""
+        if response.is_vad_end:
+            self._replay.acknowledge(response.end_time)
+        elif response.slice_type == 0:
+            self._replay.acknowledge(response.start_time)
+    
+    async def _emit_stream_frame(self, response: TencentASRResponse, is_result: bool = True) -> None:
+        """Forward a start/partial/end result as a ``StreamTextInputFrame``."""
+        is_end = response.is_vad_end or response.is_final_result
+        if not response.has_content:
+            if is_result and response.slice_type == 0 and not is_end and not self._utterance_open:
+                # VAD start: the user began speaking, no text yet (used for barge-in)
+                self._utterance_open = True
+                await self._text_output_queue.put(StreamTextInputFrame(
+                    data="", is_start=True,
+                    start_audio_time=response.start_time + self._stream_offset_ms,
+                    end_audio_time=response.end_time + self._stream_offset_ms))
+            elif is_end and self._utterance_open:
+                # Sentence ended without text; tell consumers to drop the partial
+                await self._text_output_queue.put(StreamTextInputFrame(
+                    data="", is_end_bool=True, stability=1.0,
+                    start_audio_time=response.start_time + self._stream_offset_ms,
+                    end_audio_time=response.end_time + self._stream_offset_ms))
+                self._stability.reset()
+                self._utterance_open = False
+            return
+        
+        stability = self._stability.update(response.sentence, final=is_end)
+        frame = StreamTextInputFrame(
+            data=response.sentence,
+            start_audio_time=response.start_time + self._stream_offset_ms,
+            end_audio_time=response.end_time + self._stream_offset_ms,
+            is_start=not self._utterance_open,
+            is_end_bool=is_end,
+            stable_prefix_len=stability.stable_prefix_len,
+            stability=stability.stability,
+            unchanged_ms=stability.unchanged_ms,
+            timings=self._speech_end_timings(response.end_time) if is_end and self.latency is not None else {},
+        )
+        self._utterance_open = not is_end
+        if is_end:
+            self._stability.reset()
+            self._logger.info(f"Got ASR result: {response.sentence}")
+        await self._text_output_queue.put(frame)
+    
     async def send_end_signal_and_wait(self) -> None:
         """
         Send end signal to ASR service and wait for final result.
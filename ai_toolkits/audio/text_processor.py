@@ -1,11 +1,27 @@
 from .base import BaseTextHandler
+from .types import StreamTextInputFrame
+from .speculation import SpeculativeCompletion, summarize_turns
+from .tts import TTSBackend, TTSPipeline, default_tts_backend
+from .render import Renderer, RichRenderer, TokenBuffer
 from ai_toolkits.llms.openai_provider import create_async_client
+from ai_toolkits.llms.memory import ConversationMemory, llm_summarizer
 import asyncio
 from rich.console import Console
-from rich.panel import Panel
 from rich.live import Live
 from rich.text import Text
 import subprocess
+import time
+
+# Appended to replies cut off by the user so the model knows they were not heard in full
+INTERRUPTED_MARK = " [interrupted]"
+
+def _record_usage(chunk, usage: dict) -> None:
+    """Copy the token counts of a streamed chunk into ``usage`` (only the last chunk has them)."""
+    chunk_usage = getattr(chunk, "usage", None)
+    if usage is not None and chunk_usage is not None:
+        usage["prompt_tokens"] = chunk_usage.prompt_tokens
+        usage["completion_tokens"] = chunk_usage.completion_tokens
+
 
 def speak_mac(text):
     subprocess.call(['say', text, "-r", "200", "-v", "Tingting"])
@@ -20,28 +36,59 @@ class PrintOutTextHandler(BaseTextHandler):
         
 
 class NotetalkingTextHandler(BaseTextHandler):
+    def __init__(self, text_queue:asyncio.Queue = None, renderer: Renderer = None):
+        super().__init__(text_queue)
+        self.memory = []
+        self.renderer = renderer if renderer is not None else RichRenderer()
+
+    async def do_process(self, text: str) -> str:
+        self.memory.append(text)
+        self.renderer.panel(text, title="🎤 Transcription", border_style="magenta", style="bold white")
+        return text
+
+class LiveCaptionTextHandler(BaseTextHandler):
+    """
+    Render live captions from streamed partials (``TencentASR(stream_partials=True)``).
+    
+    The stable prefix is shown in bold, the tail that may still change is
+    dimmed; finished sentences are printed as permanent lines.
+    """
     def __init__(self, text_queue:asyncio.Queue = None):
         super().__init__(text_queue)
         self.memory = []
         self.console = Console()
+        self.live = None
+
+    async def on_partial(self, frame: StreamTextInputFrame) -> None:
+        if frame.is_end_bool:
+            self._stop_live()
+            return
+        caption = Text(overflow="fold")
+        caption.append(frame.stable_text, style="bold white")
+        caption.append(frame.data[frame.stable_prefix_len:], style="dim")
+        if self.live is None:
+            self.live = Live(caption, console=self.console, refresh_per_second=10, transient=True)
+            self.live.start()
+        else:
+            self.live.update(caption)
+
+    def _stop_live(self) -> None:
+        if self.live is not None:
+            self.live.stop()
+            self.live = None
 
     async def do_process(self, text: str) -> str:
+        self._stop_live()
         self.memory.append(text)
-        panel = Panel(
-            Text(text, style="bold white", overflow="fold"),
-            title="🎤 Transcription",
-            title_align="left",
-            border_style="magenta",
-            padding=(0, 1)
-        )
-        self.console.print(panel)
+        self.console.print(Text(text, style="bold white", overflow="fold"))
         return text
 
+
 class TranslateTextHandler(BaseTextHandler):
     
-    def __init__(self, text_queue:asyncio.Queue = None):
+    def __init__(self, text_queue:asyncio.Queue = None, async_client = None):
         super().__init__(text_queue)
-        self.client = create_async_client()
+        self.client = async_client if async_client is not None else create_async_client()
         self.text_queue = text_queue
         
     async def do_process(self, text: str) -> str:
@@ -55,9 +102,9 @@ class TranslateTextHandler(BaseTextHandler):
 
 class ShortAnswerTextHandler(BaseTextHandler):
     
-    def __init__(self, text_queue:asyncio.Queue = None):
+    def __init__(self, text_queue:asyncio.Queue = None, async_client = None):
         super().__init__(text_queue)
-        self.client = create_async_client()
+        self.client = async_client if async_client is not None else create_async_client()
         self.text_queue = text_queue
         
     async def do_process(self, text: str) -> str:
@@ -73,55 +120,77 @@ class ConversationHandler(BaseTextHandler):
     
     def __init__(self, 
                  text_queue:asyncio.Queue = None, 
-                 system_prompt: str = "You are a helpful assistant, You provide concise and colloquial style answers."
+                 system_prompt: str = "You are a helpful assistant, You provide concise and colloquial style answers.",
+                 async_client = None,
+                 renderer: Renderer = None,
+                 max_history_tokens: int = 8000,
+                 summarize_history: bool = False
                 ):
         super().__init__(text_queue)
-        self.client = create_async_client()
+        self.client = async_client if async_client is not None else create_async_client()
         self.text_queue = text_queue
-        self.conversation_history = [{"role": "system", "content": system_prompt}]
+        self.conversation_history = ConversationMemory(
+            system_prompt, max_prompt_tokens=max_history_tokens,
+            summarizer=llm_summarizer(self.client) if summarize_history else None)
         self.turns = 0
-        self.console = Console()
+        self.renderer = renderer if renderer is not None else RichRenderer()
         
     async def do_process(self, text: str) -> str:
-        # Beautiful user message in a panel
-        user_panel = Panel(
-            text, 
-            title="😊 User", 
-            title_align="left",
-            border_style="green",
-            padding=(0, 1)
-        )
-        self.console.print(user_panel)
+        self.renderer.panel(text, title="😊 User", border_style="green")
         
         self.conversation_history.append({"role": "user", "content": text})
+        self.note_turn(prompt_tokens=self.conversation_history.prompt_tokens)
         response = await self.client.chat.completions.create(
             model="gpt-4.1",
-            messages=self.conversation_history,
+            messages=self.conversation_history.for_request(),
         )
         reply = response.choices[0].message.content
+        self.mark("llm_first_token")
+        self.mark("llm_done")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.note_turn(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
         self.conversation_history.append({"role": "assistant", "content": reply})
         
-        # Beautiful assistant message in a panel
-        assistant_panel = Panel(
-            reply, 
-            title="🤖 Assistant", 
-            title_align="left",
-            border_style="blue",
-            padding=(0, 1)
-        )
-        self.console.print(assistant_panel)
+        self.renderer.panel(reply, title="🤖 Assistant", border_style="blue")
         
         self.turns += 1
         return reply
     
     
 class ConversationStreamHandler(BaseTextHandler):
+    """
+    Streaming chat handler.
+    
+    With ``speculative=True`` (requires ``TencentASR(stream_partials=True)``)
+    the completion is started once the partial transcript has been unchanged
+    for ``speculation_window_ms``. If the final transcript matches, the
+    buffered reply is shown immediately; otherwise the speculation is
+    cancelled and a normal request is made. Per-turn results are recorded in
+    ``turn_stats`` and aggregated by ``speculation_stats``.
+    
+    With ``barge_in=True`` the reply is aborted as soon as the user speaks
+    again; the part already shown is kept in ``conversation_history``.
+    
+    Tokens are only appended to a buffer; the ``renderer`` samples it at its
+    own frame rate (``HeadlessRenderer`` for no output at all).
+    
+    ``conversation_history`` is a ``ConversationMemory``: the prompt is kept
+    under ``max_history_tokens`` by evicting the oldest turns, or by folding
+    them into a running summary with ``summarize_history=True``.
+    """
     
     def __init__(self, 
                  text_queue:asyncio.Queue = None, 
                  system_prompt: str = "You are a helpful assistant, You provide concise and colloquial style answers.",
                  async_client = None,
-                 extra_body:dict = None
+                 extra_body:dict = None,
+                 speculative: bool = False,
+                 speculation_window_ms: int = 400,
+                 barge_in: bool = False,
+                 renderer: Renderer = None,
+                 max_history_tokens: int = 8000,
+                 summarize_history: bool = False
                 ):
         super().__init__(text_queue)
         
@@ -131,98 +200,202 @@ class ConversationStreamHandler(BaseTextHandler):
             self.client = async_client
             
         self.text_queue = text_queue
-        self.conversation_history = [{"role": "system", "content": system_prompt}]
+        self.conversation_history = ConversationMemory(
+            system_prompt, max_prompt_tokens=max_history_tokens,
+            summarizer=llm_summarizer(self.client) if summarize_history else None)
         self.turns = 0
         self.extra_body = extra_body
-        self.console = Console()
+        self.renderer = renderer if renderer is not None else RichRenderer()
         self.do_cancel = asyncio.Event()
         
+        self.barge_in = barge_in
+        self.speculative = speculative
+        self.speculation_window_ms = speculation_window_ms
+        self.turn_stats = []
+        self._speculation: SpeculativeCompletion = None
+        self._wasted_speculations = 0
+        
     async def cancel(self):
-        await self.do_cancel.set()
+        """Stop the reply that is currently streaming."""
+        self.do_cancel.set()
+    
+    @property
+    def speculation_stats(self) -> dict:
+        return summarize_turns(self.turn_stats)
+    
+    async def _open_stream(self, messages: list, usage: dict = None):
+        stream = await self.client.chat.completions.create(
+            model="gpt-4.1",
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            extra_body=self.extra_body
+        )
+        return self._iter_content(stream, usage)
+    
+    async def _iter_content(self, stream, usage: dict = None):
+        """Content strings of ``stream``; the final chunk's token counts go to ``usage``."""
+        try:
+            async for chunk in stream:
+                _record_usage(chunk, usage)
+                # Extract content with early returns to avoid nested ifs
+                if not (hasattr(chunk, "choices") and len(chunk.choices) > 0):
+                    continue
+                
+                if not hasattr(chunk.choices[0], "delta"):
+                    continue
+                
+                content = getattr(chunk.choices[0].delta, "content", "")
+                if content:
+                    yield content
+        finally:
+            # Abort the HTTP response when the consumer stops early
+            close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+    
+    def _drop_speculation(self) -> None:
+        if self._speculation is None:
+            return
+        self._speculation.cancel()
+        if self._speculation.launched:
+            self._wasted_speculations += 1
+        self._speculation = None
+        
+    async def on_partial(self, frame: StreamTextInputFrame) -> None:
+        if not self.speculative:
+            return
+        if frame.is_end_bool or not frame.data:
+            # The sentence was dropped by the ASR service
+            self._drop_speculation()
+            return
+        if self._speculation is not None and self._speculation.matches(frame.data):
+            return
+        
+        self._drop_speculation()
+        messages = self.conversation_history.messages + [{"role": "user", "content": frame.data}]
+        delay = max(0.0, self.speculation_window_ms - frame.unchanged_ms) / 1000
+        speculation = SpeculativeCompletion(
+            frame.data, lambda: self._open_stream(messages, speculation.usage), delay=delay)
+        self._speculation = speculation
+    
+    def _take_speculation(self, text: str):
+        """Return the running speculation if it was made for ``text``."""
+        speculation, self._speculation = self._speculation, None
+        if speculation is None:
+            return None
+        if speculation.launched and speculation.matches(text) and not speculation.failed:
+            return speculation
+        speculation.cancel()
+        if speculation.launched:
+            self._wasted_speculations += 1
+        return None
         
     async def do_process(self, text: str) -> bool:
-        # Beautiful user message in a panel
-        user_panel = Panel(
-            text, 
-            title="😊 User", 
-            title_align="left",
-            border_style="green",
-            padding=(0, 1)
-        )
-        self.console.print(user_panel)
+        self.renderer.panel(text, title="😊 User", border_style="green")
 
+        final_at = time.monotonic()
+        speculation = self._take_speculation(text)
+        turn = {
+            "turn": self.turns,
+            "speculation": "hit" if speculation else ("miss" if self._wasted_speculations else "none"),
+            "wasted_speculations": self._wasted_speculations,
+            "ttft_ms": None,
+            "latency_saved_ms": 0.0,
+            "interrupted": False,
+            "prompt_tokens": None,
+        }
+        self._wasted_speculations = 0
+        
         self.conversation_history.append({"role": "user", "content": text})
+        turn["prompt_tokens"] = self.conversation_history.prompt_tokens
+        tokens = TokenBuffer()
+        contents = None
+        usage = speculation.usage if speculation is not None else {}
         try:
-            # Try streaming if supported by the client
-            stream = await self.client.chat.completions.create(
-                model="gpt-4.1",
-                messages=self.conversation_history,
-                stream=True,
-                extra_body=self.extra_body
-            )
+            if speculation is not None:
+                contents = speculation.contents()
+            else:
+                contents = await self._open_stream(self.conversation_history.for_request(), usage)
 
-            buffer = ""
-            panel_title = "🤖 Assistant (streaming)"
-            with Live(Panel("", 
-                            title=panel_title, 
-                            title_align="left", 
-                            border_style="blue", 
-                            padding=(0, 1)), 
-                      console=self.console, 
-                      refresh_per_second=10, 
-                      transient=True) as live:
-                
-                async for chunk in stream:
+            with self.renderer.stream(tokens, title="🤖 Assistant (streaming)"):
+                async for content in contents:
                     if self.do_cancel.is_set():
                         break
                     
-                    # Extract content with early returns to avoid nested ifs
-                    if not (hasattr(chunk, "choices") and len(chunk.choices) > 0):
-                        continue
-                    
-                    if not hasattr(chunk.choices[0], "delta"):
-                        continue
-                    
-                    content = getattr(chunk.choices[0].delta, "content", "")
-                    if not content:
-                        continue
-                    await asyncio.sleep(0.005)
-                    # Update buffer and display
-                    buffer += content
-                    display_text = Text(buffer, overflow='fold', no_wrap=False)
-                    live.update(Panel(display_text, title=panel_title, title_align="left", border_style="blue", padding=(0, 1)))
+                    if turn["ttft_ms"] is None:
+                        turn["ttft_ms"] = (time.monotonic() - final_at) * 1000
+                        self.mark("llm_first_token")
+                    tokens.append(content)
+            self.mark("llm_done")
+            buffer = tokens.text
             
             if self.do_cancel.is_set():
                 self.do_cancel.clear()
             
-            # After Live context ends, display a permanent final panel
-            final_text = Text(buffer, overflow='fold', no_wrap=False)
-            final_panel = Panel(
-                final_text, 
-                title="🤖 Assistant", 
-                title_align="left", 
-                border_style="blue", 
-                padding=(0, 1)
-            )
-            self.console.print(final_panel)
+            if speculation is not None and speculation.first_token_at is not None:
+                # Without speculation the first token would have taken the
+                # same time to first token, counted from the final transcript
+                llm_ttft_ms = (speculation.first_token_at - speculation.started_at) * 1000
+                turn["latency_saved_ms"] = max(0.0, llm_ttft_ms - (turn["ttft_ms"] or 0.0))
+            
+            # After the live view ends, display a permanent final panel
+            self.renderer.panel(buffer, title="🤖 Assistant", border_style="blue")
 
             self.conversation_history.append({"role": "assistant", "content": buffer})
 
             return buffer
+        except asyncio.CancelledError:
+            # Barge-in: keep what was shown so the next turn has the context
+            turn["interrupted"] = True
+            if speculation is not None:
+                speculation.cancel()
+            self.conversation_history.append({"role": "assistant", "content": tokens.text + INTERRUPTED_MARK})
+            self.renderer.panel(tokens.text, title="🤖 Assistant (interrupted)", border_style="blue")
+            raise
         except Exception as e:
             raise e
         finally:
+            if contents is not None:
+                await contents.aclose()
+            self.turn_stats.append(turn)
+            # Usage comes with the last chunk; an interrupted stream has none,
+            # then count streamed chunks (about one token each)
+            self.note_turn(prompt_tokens=usage.get("prompt_tokens", turn["prompt_tokens"]),
+                           completion_tokens=usage.get("completion_tokens", len(tokens)),
+                           speculation=turn["speculation"])
+            if self.speculative:
+                self.logger.info(f"Turn {turn['turn']}: speculation {turn['speculation']}, "
+                                 f"ttft {turn['ttft_ms']}ms, saved {turn['latency_saved_ms']:.0f}ms")
             self.turns += 1
             
             
 
 class SpeakOutStreamHandler(BaseTextHandler):
+    """
+    Speak the streamed reply sentence by sentence.
+    
+    Tokens are segmented into sentences as they arrive; a ``TTSPipeline``
+    synthesizes them ahead of playback while the LLM stream keeps being
+    consumed. ``tts_backend`` defaults to macOS ``say`` (a silent backend on
+    other platforms). Per-reply time to first audio and inter-sentence gaps
+    are recorded in ``tts_stats``.
+    
+    With ``barge_in=True`` the user speaking again stops the LLM stream and
+    the current playback; sentences not yet spoken are dropped and the part
+    that was spoken is kept in ``conversation_history``.
+    """
     
     def __init__(self, 
                  text_queue:asyncio.Queue = None, 
                  system_prompt: str = "You are a helpful assistant, You provide concise and colloquial style answers.",
                  async_client = None,
-                 extra_body:dict = None
+                 extra_body:dict = None,
+                 barge_in: bool = False,
+                 tts_backend: TTSBackend = None,
+                 tts_lookahead: int = 2,
+                 max_history_tokens: int = 8000,
+                 summarize_history: bool = False
                 ):
         super().__init__(text_queue)
         
@@ -232,25 +405,41 @@ class SpeakOutStreamHandler(BaseTextHandler):
             self.client = async_client
             
         self.text_queue = text_queue
-        self.conversation_history = [{"role": "system", "content": system_prompt}]
+        self.conversation_history = ConversationMemory(
+            system_prompt, max_prompt_tokens=max_history_tokens,
+            summarizer=llm_summarizer(self.client) if summarize_history else None)
         self.turns = 0
         self.extra_body = extra_body
+        self.barge_in = barge_in
+        self.tts_backend = tts_backend if tts_backend is not None else default_tts_backend()
+        self.tts_lookahead = tts_lookahead
+        self.tts_stats = []
+        
+    async def close(self) -> None:
+        """Close the TTS backend (temporary audio files, output WAV)."""
+        await self.tts_backend.close()
         
     async def do_process(self, text: str) -> bool:
         print(f"Answering user query {text}...")
         self.conversation_history.append({"role": "user", "content": text})
+        self.note_turn(prompt_tokens=self.conversation_history.prompt_tokens)
+        pipeline = TTSPipeline(self.tts_backend, lookahead=self.tts_lookahead)
+        stream = None
+        chunks = 0
+        usage = {}
         try:
             # Try streaming if supported by the client
             stream = await self.client.chat.completions.create(
                 model="gpt-4.1",
-                messages=self.conversation_history,
+                messages=self.conversation_history.for_request(),
                 stream=True,
+                stream_options={"include_usage": True},
                 extra_body=self.extra_body
             )
 
             complete_reply = ""
-            buffer = ""
             async for chunk in stream:
+                _record_usage(chunk, usage)
                 # Extract content with early returns to avoid nested ifs
                 if not (hasattr(chunk, "choices") and len(chunk.choices) > 0):
                     continue
@@ -262,27 +451,37 @@ class SpeakOutStreamHandler(BaseTextHandler):
                 if not content:
                     continue
                 
-                # Update buffer and complete reply
-                buffer += content
+                if not chunks:
+                    self.mark("llm_first_token")
+                chunks += 1
                 complete_reply += content
-                
-                # if content is a punctuation, speak out the buffer
-                puncts = {',', '!', '?', '.', '。', '…', '...'}
-                if content and (content in puncts) and len(buffer.strip()) > 5:
-                    to_speak = buffer.strip()
-                    if to_speak:
-                        # Use asyncio.to_thread for non-blocking TTS
-                        await asyncio.to_thread(speak_mac, to_speak)
-                    buffer = ""
-            # Speak any remaining buffer content at the end
-            if buffer.strip():
-                await asyncio.to_thread(speak_mac, buffer.strip())
+                pipeline.feed(content)
+            self.mark("llm_done")
+            
+            # Speak the remaining text and wait for playback to finish
+            await pipeline.finish()
                 
             # Fix: Add complete_reply to conversation history, not buffer
             self.conversation_history.append({"role": "assistant", "content": complete_reply})
 
             return complete_reply
+        except asyncio.CancelledError:
+            # Barge-in: only what was (being) spoken reached the user
+            print("Interrupted by user.")
+            await pipeline.cancel()
+            self.conversation_history.append({"role": "assistant", "content": pipeline.spoken_text + INTERRUPTED_MARK})
+            if stream is not None and hasattr(stream, "close"):
+                await stream.close()
+            raise
         except Exception as e:
+            await pipeline.cancel()
             raise e
         finally:
-            self.turns += 1
\ No newline at end of file
+            self.tts_stats.append(pipeline.stats.to_dict())
+            if pipeline.stats.first_audio_at is not None:
+                self.mark("first_audio", pipeline.stats.first_audio_at * 1000)
+            if usage:
+                self.note_turn(**usage)
+            else:
+                self.note_turn(completion_tokens=chunks)
+            self.turns += 1
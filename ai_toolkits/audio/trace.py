@@ -0,0 +1,155 @@
+"""
+Append-only JSONL conversation traces.
+
+``TraceWriter.write`` only puts the record on a queue; a background thread
+serializes, writes and flushes it, so tracing never blocks the event loop and
+every finished turn is on disk even if the process is killed. Files are
+rotated once they reach ``max_bytes`` and can be gzip-compressed.
+
+Files are named ``{prefix}-{session}.{index}.jsonl`` (``.jsonl.gz`` when
+compressed) and can be read back with ``read_trace``.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class TraceWriter:
+    """
+    Write trace records as JSON lines on a background thread.
+
+    Args:
+        directory: Output directory, created if missing
+        prefix: File name prefix
+        max_bytes: Start a new file once the current one reaches this size
+            (compressed size with ``compress``); ``None`` never rotates
+        compress: Write gzip-compressed files
+
+    Example:
+        trace = TraceWriter("trace", compress=True)
+        trace.write({"turn": 0, "user": "你好", "reply": "你好！"})
+        await trace.aclose()
+    """
+
+    def __init__(self,
+                 directory: str = "trace",
+                 prefix: str = "conversation",
+                 max_bytes: Optional[int] = 10 * 1024 * 1024,
+                 compress: bool = False):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.session = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.files: List[str] = []
+        self.records_written = 0
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._raw = None
+        self._file = None
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> None:
+        """Queue a record; never blocks."""
+        if self._closed:
+            logger.warning("Trace writer is closed, record dropped")
+            return
+        self._queue.put(record)
+
+    def close(self) -> None:
+        """Write the queued records and close the file (blocking)."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_CLOSE)
+        self._thread.join()
+
+    async def aclose(self) -> None:
+        """``close`` without blocking the event loop."""
+        await asyncio.to_thread(self.close)
+
+    def _open_next(self) -> None:
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        path = os.path.join(self.directory, f"{self.prefix}-{self.session}.{len(self.files):03d}{suffix}")
+        self._raw = open(path, "ab")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab") if self.compress else self._raw
+        self.files.append(path)
+        logger.info(f"Writing conversation trace to {path}")
+
+    def _close_file(self) -> None:
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.close()
+        self._file = self._raw = None
+
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            # Write everything queued so far, then flush once
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for record in batch:
+                if record is _CLOSE:
+                    closing = True
+                    continue
+                try:
+                    lines.append(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Trace record is not serializable, dropped: {e}")
+            try:
+                self._write_lines(lines)
+            except OSError as e:
+                logger.error(f"Failed to write conversation trace: {e}")
+        if self._file is not None:
+            self._close_file()
+
+    def _write_lines(self, lines: List[bytes]) -> None:
+        for line in lines:
+            if self._file is None:
+                self._open_next()
+            self._file.write(line)
+            self.records_written += 1
+            if self.max_bytes is not None and self._raw.tell() >= self.max_bytes:
+                self._close_file()
+        if self._file is not None:
+            self._file.flush()
+
+
+def read_trace(path: str) -> Iterator[dict]:
+    """
+    Records of one trace file, plain or gzip-compressed.
+    
+    Files of a killed process are read up to the last complete record.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping truncated record in {path}")
+                    continue
+                yield record
+        except EOFError:
+            # A gzip file without trailer: the writer did not close it
+            logger.warning(f"Trace {path} was not closed properly")
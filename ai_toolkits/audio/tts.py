@@ -0,0 +1,302 @@
+"""
+Pipelined sentence-level text-to-speech.
+
+LLM tokens are split into sentences as they arrive (``SentenceSegmenter``).
+``TTSPipeline`` synthesizes sentences ahead of playback on one task and plays
+the finished clips back to back on another, so token consumption, synthesis
+and playback overlap and there is no synthesis gap between sentences.
+
+Synthesis and playback go through a ``TTSBackend``:
+    - ``MacSayBackend``: macOS ``say`` (synthesis to AIFF) and ``afplay``
+    - ``WavWriterBackend``: writes a placeholder tone per sentence to a WAV file
+    - ``NullBackend``: produces nothing, optionally simulating timings
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import List, Optional, Protocol
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sentence (and long clause) boundaries, ASCII and CJK
+_BOUNDARY = re.compile(r"[.!?,;:。！？，；：…\n]+")
+
+
+class SentenceSegmenter:
+    """
+    Split a token stream into speakable sentences.
+
+    A segment ends at punctuation once it has at least ``min_chars``
+    characters, so very short fragments ("Hi,") are joined with the next one.
+    """
+
+    def __init__(self, min_chars: int = 6):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        """Add a token and return the sentences it completed."""
+        self._buffer += token
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()]
+            if len(candidate.strip()) >= self.min_chars:
+                sentences.append(candidate.strip())
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left at the end of the reply."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest or None
+
+
+@dataclass
+class AudioClip:
+    """A synthesized sentence, ready to be played."""
+    text: str
+    duration_s: float = 0.0
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+
+
+class TTSBackend(Protocol):
+    async def synthesize(self, text: str) -> AudioClip:
+        ...
+
+    async def play(self, clip: AudioClip) -> None:
+        """Play a clip; cancelling must stop playback immediately."""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+async def _run_process(*args) -> None:
+    """Run a subprocess; cancelling terminates it."""
+    process = await asyncio.create_subprocess_exec(*args)
+    try:
+        await process.wait()
+    except asyncio.CancelledError:
+        process.terminate()
+        await process.wait()
+        raise
+
+
+class MacSayBackend:
+    """macOS ``say`` voice: synthesize to AIFF files, play them with ``afplay``."""
+
+    def __init__(self, voice: str = "Tingting", rate: int = 200):
+        self.voice = voice
+        self.rate = rate
+        self._tmpdir = tempfile.mkdtemp(prefix="tts-")
+        self._count = 0
+
+    async def synthesize(self, text: str) -> AudioClip:
+        self._count += 1
+        path = os.path.join(self._tmpdir, f"{self._count}.aiff")
+        await _run_process("say", text, "-r", str(self.rate), "-v", self.voice, "-o", path)
+        return AudioClip(text=text, path=path)
+
+    async def play(self, clip: AudioClip) -> None:
+        try:
+            await _run_process("afplay", clip.path)
+        finally:
+            os.remove(clip.path)
+
+    async def close(self) -> None:
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+class NullBackend:
+    """
+    Silent backend for servers and tests.
+
+    Args:
+        synth_ms_per_char: Simulated synthesis time per character
+        chars_per_second: Simulated speaking rate; ``None`` plays instantly
+    """
+
+    def __init__(self, synth_ms_per_char: float = 0.0, chars_per_second: Optional[float] = None):
+        self.synth_ms_per_char = synth_ms_per_char
+        self.chars_per_second = chars_per_second
+
+    def _duration(self, text: str) -> float:
+        return len(text) / self.chars_per_second if self.chars_per_second else 0.0
+
+    async def synthesize(self, text: str) -> AudioClip:
+        if self.synth_ms_per_char:
+            await asyncio.sleep(len(text) * self.synth_ms_per_char / 1000)
+        return AudioClip(text=text, duration_s=self._duration(text))
+
+    async def play(self, clip: AudioClip) -> None:
+        if clip.duration_s:
+            await asyncio.sleep(clip.duration_s)
+
+    async def close(self) -> None:
+        pass
+
+
+class WavWriterBackend(NullBackend):
+    """
+    Write a placeholder tone per sentence into one WAV file instead of speaking.
+
+    Sentences are separated by silence that matches their actual playback
+    gaps, so the file shows the pipeline's timing. Playback runs in real
+    time when ``chars_per_second`` is set.
+    """
+
+    def __init__(self,
+                 path: str,
+                 sampling_rate: int = 16000,
+                 synth_ms_per_char: float = 0.0,
+                 chars_per_second: Optional[float] = 5.0):
+        super().__init__(synth_ms_per_char, chars_per_second)
+        self.path = path
+        self.sampling_rate = sampling_rate
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sampling_rate)
+        self._last_end: Optional[float] = None
+
+    async def synthesize(self, text: str) -> AudioClip:
+        clip = await super().synthesize(text)
+        duration = clip.duration_s or 0.2
+        t = np.arange(int(duration * self.sampling_rate)) / self.sampling_rate
+        tone = 3000 * np.sin(2 * np.pi * 440 * t) * np.minimum(1.0, 50 * t[::-1])
+        clip.data = tone.astype("<i2").tobytes()
+        return clip
+
+    async def play(self, clip: AudioClip) -> None:
+        now = time.monotonic()
+        if self._last_end is not None and now > self._last_end:
+            self._wav.writeframes(bytes(2 * int((now - self._last_end) * self.sampling_rate)))
+        self._wav.writeframes(clip.data)
+        await super().play(clip)
+        self._last_end = time.monotonic()
+
+    async def close(self) -> None:
+        self._wav.close()
+
+
+def default_tts_backend() -> TTSBackend:
+    """``say`` on macOS, a silent backend elsewhere."""
+    if sys.platform == "darwin" and shutil.which("say"):
+        return MacSayBackend()
+    logger.warning("macOS 'say' is not available, replies will not be spoken")
+    return NullBackend()
+
+
+@dataclass
+class TTSStats:
+    """Timings of one spoken reply, in seconds of ``time.monotonic()``."""
+    started_at: float = field(default_factory=time.monotonic)
+    first_audio_at: Optional[float] = None
+    sentences: int = 0
+    gaps_ms: List[float] = field(default_factory=list)
+
+    @property
+    def time_to_first_audio_ms(self) -> Optional[float]:
+        if self.first_audio_at is None:
+            return None
+        return (self.first_audio_at - self.started_at) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "sentences": self.sentences,
+            "time_to_first_audio_ms": self.time_to_first_audio_ms,
+            "mean_gap_ms": sum(self.gaps_ms) / len(self.gaps_ms) if self.gaps_ms else 0.0,
+            "max_gap_ms": max(self.gaps_ms, default=0.0),
+        }
+
+
+class TTSPipeline:
+    """
+    Speak one streamed reply: segment, synthesize ahead, play back to back.
+
+    Args:
+        backend: Synthesis/playback backend
+        lookahead: Maximum number of synthesized clips waiting for playback
+        min_chars: Minimum sentence length for the segmenter
+
+    Example:
+        pipeline = TTSPipeline(backend)
+        async for token in tokens:
+            pipeline.feed(token)
+        await pipeline.finish()
+    """
+
+    def __init__(self, backend: TTSBackend, lookahead: int = 2, min_chars: int = 6):
+        self.backend = backend
+        self.segmenter = SentenceSegmenter(min_chars)
+        self.stats = TTSStats()
+        self.spoken: List[str] = []
+        self._sentences: asyncio.Queue = asyncio.Queue()
+        self._clips: asyncio.Queue = asyncio.Queue(maxsize=lookahead)
+        self._synth_task = asyncio.create_task(self._synthesize_loop())
+        self._play_task = asyncio.create_task(self._play_loop())
+
+    @property
+    def spoken_text(self) -> str:
+        """Text of the sentences whose playback started."""
+        # Sentences are stripped: no separator between CJK sentences, like
+        # the streamed reply, but keep a space between English ones
+        text = ""
+        for sentence in self.spoken:
+            if text and text[-1].isascii() and sentence[:1].isascii():
+                text += " "
+            text += sentence
+        return text
+
+    def feed(self, token: str) -> None:
+        for sentence in self.segmenter.feed(token):
+            self._sentences.put_nowait(sentence)
+
+    async def finish(self) -> None:
+        """Speak the remaining text and wait until playback is done."""
+        rest = self.segmenter.flush()
+        if rest:
+            self._sentences.put_nowait(rest)
+        self._sentences.put_nowait(None)
+        await asyncio.gather(self._synth_task, self._play_task)
+
+    async def cancel(self) -> None:
+        """Stop playback now and drop every sentence not yet spoken."""
+        for task in (self._synth_task, self._play_task):
+            task.cancel()
+        await asyncio.gather(self._synth_task, self._play_task, return_exceptions=True)
+
+    async def _synthesize_loop(self) -> None:
+        try:
+            while (sentence := await self._sentences.get()) is not None:
+                await self._clips.put(await self.backend.synthesize(sentence))
+        except Exception:
+            self._play_task.cancel()
+            raise
+        await self._clips.put(None)
+
+    async def _play_loop(self) -> None:
+        last_end = None
+        while (clip := await self._clips.get()) is not None:
+            start = time.monotonic()
+            if self.stats.first_audio_at is None:
+                self.stats.first_audio_at = start
+            elif last_end is not None:
+                self.stats.gaps_ms.append((start - last_end) * 1000)
+            self.spoken.append(clip.text)
+            self.stats.sentences += 1
+            await self.backend.play(clip)
+            last_end = time.monotonic()
@@ -6,13 +6,19 @@ Frames are used to transport data through asyncio queues between different
 components of the audio processing pipeline.
 """
 
-from typing import Literal, Any
+from itertools import count
+from typing import Dict, Literal, Any, Optional
 from uuid import uuid4
 from pydantic import BaseModel, Field
 import time
 
 DEFAULT_SAMPLING_RATE = 8000
 
+# Offset between the monotonic clock and the epoch, measured once at import so
+# hot-path frames only read the cheap monotonic clock.
+_EPOCH_OFFSET_MS = time.time() * 1000 - time.monotonic_ns() / 1e6
+_audio_sequence = count()
+
 
 def _time_in_millis() -> int:
     """Generate current timestamp in milliseconds."""
@@ -193,6 +199,10 @@ class StreamTextInputFrame(TextInputFrame):
     Attributes:
         is_start: Flag indicating if this is the start of a stream
         is_end_bool: Flag indicating if this is the end of a stream
+        stable_prefix_len: Number of leading characters unlikely to change
+        stability: Fraction of the text that is stable (1.0 when final)
+        unchanged_ms: How long the whole hypothesis has been unchanged
+        timings: Monotonic timestamps (ms) of pipeline stages, see ``latency``
     """
     data:str = None
     data_type: Literal['text'] = 'text' 
@@ -202,3 +212,97 @@ class StreamTextInputFrame(TextInputFrame):
     end_audio_sequence_id: int = Field(default=-1)
     is_start:bool = Field(default=False)
     is_end_bool:bool = Field(default=False)
+    stable_prefix_len: int = Field(default=0)
+    stability: float = Field(default=0.0)
+    unchanged_ms: float = Field(default=0.0)
+    timings: Dict[str, float] = Field(default_factory=dict)
+    
+    @property
+    def is_partial(self) -> bool:
+        """True for interim hypotheses that may still change."""
+        return not self.is_end_bool
+    
+    @property
+    def stable_text(self) -> str:
+        """The prefix of ``data`` that is unlikely to change."""
+        return (self.data or "")[:self.stable_prefix_len]
+
+
+class FastAudioFrame:
+    """
+    Compact audio frame for the hot audio path.
+    
+    A ``__slots__`` class with no validation: construction only reads the
+    monotonic clock and a sequence counter. The ``frame_id`` UUID and the
+    epoch ``frame_created`` timestamp are computed lazily on first access.
+    Use ``to_frame``/``from_frame`` to convert losslessly to and from
+    ``AudioInputFrame`` at component boundaries.
+    
+    Attributes:
+        data: Raw audio data in bytes format
+        sequence_id: Monotonic sequence number (auto-assigned if not given)
+        sampling_rate: Audio sampling rate in Hz
+        created_ns: ``time.monotonic_ns()`` at creation
+    """
+    __slots__ = ("data", "sequence_id", "sampling_rate", "created_ns", "_frame_id", "_frame_created")
+    
+    def __init__(self,
+                 data: bytes,
+                 sequence_id: Optional[int] = None,
+                 sampling_rate: int = DEFAULT_SAMPLING_RATE,
+                 created_ns: Optional[int] = None):
+        self.data = data
+        self.sequence_id = next(_audio_sequence) if sequence_id is None else sequence_id
+        self.sampling_rate = sampling_rate
+        self.created_ns = time.monotonic_ns() if created_ns is None else created_ns
+        self._frame_id = None
+        self._frame_created = None
+    
+    @property
+    def frame_id(self) -> str:
+        """Unique identifier, generated on first access."""
+        if self._frame_id is None:
+            self._frame_id = _create_unique_id()
+        return self._frame_id
+    
+    @property
+    def frame_created(self) -> float:
+        """Creation timestamp in epoch milliseconds, like ``Frame.frame_created``."""
+        if self._frame_created is None:
+            return int(self.created_ns / 1e6 + _EPOCH_OFFSET_MS)
+        return self._frame_created
+    
+    @property
+    def duration_ms(self) -> float:
+        """Duration of the 16-bit mono audio payload."""
+        return len(self.data) / 2 * 1000 / self.sampling_rate
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __repr__(self) -> str:
+        return (f"FastAudioFrame(sequence_id={self.sequence_id}, bytes={len(self.data)}, "
+                f"sampling_rate={self.sampling_rate})")
+    
+    def to_frame(self) -> AudioInputFrame:
+        """Convert to the validated pydantic ``AudioInputFrame``."""
+        return AudioInputFrame(
+            data=self.data,
+            sequence_id=self.sequence_id,
+            sampling_rate=self.sampling_rate,
+            frame_created=self.frame_created,
+            frame_id=self.frame_id,
+        )
+    
+    @classmethod
+    def from_frame(cls, frame: AudioInputFrame) -> "FastAudioFrame":
+        """Create from an ``AudioInputFrame``, keeping its id and timestamp."""
+        fast = cls(
+            data=frame.data,
+            sequence_id=frame.sequence_id,
+            sampling_rate=frame.sampling_rate,
+            created_ns=int((frame.frame_created - _EPOCH_OFFSET_MS) * 1e6),
+        )
+        fast._frame_id = frame.frame_id
+        fast._frame_created = frame.frame_created
+        return fast
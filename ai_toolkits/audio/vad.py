@@ -0,0 +1,180 @@
+"""
+Client-side voice activity detection for the ASR send path.
+
+``EnergyVAD`` decides per audio chunk whether it has to be sent to the ASR
+service. Silence is suppressed (or thinned out to periodic keep-alive chunks)
+so long pauses do not cost bandwidth, billing minutes and server-side VAD work.
+"""
+
+import logging
+from collections import deque
+from typing import Deque, List, Literal, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EnergyVAD:
+    """
+    Energy + zero-crossing-rate voice activity detector for 16-bit PCM.
+
+    Each chunk is reshaped into ``frame_ms`` analysis frames and analysed in
+    one vectorized pass: a frame is speech when its RMS energy is above the
+    (adaptive) threshold and its zero-crossing rate looks like voice rather
+    than hiss, or when it is loud enough to be speech regardless of ZCR.
+
+    Around speech the detector keeps:
+        - a pre-roll buffer: silent chunks preceding an onset are sent with
+          it so word onsets are not clipped
+        - a hangover: chunks are still sent for ``hangover_ms`` after the last
+          speech frame. The ASR service needs to *hear* its own VAD silence to
+          finish a sentence, so the hangover must be longer than the server's
+          ``vad_silence_time``; ``TencentASR`` sets it automatically on its own
+          copy of the detector when left as ``None``.
+
+    Note that suppressed audio shifts the ``start_time``/``end_time`` reported
+    by the ASR service, which only counts the audio it received.
+
+    Args:
+        sampling_rate: Sampling rate of the PCM input
+        frame_ms: Analysis frame length
+        energy_threshold: Minimum RMS (int16 scale) of a speech frame
+        noise_ratio: Frames must also exceed ``noise_floor * noise_ratio``
+        max_zcr: Maximum zero-crossing rate (crossings per sample) of voiced frames
+        hangover_ms: Audio still sent after the last speech frame
+        preroll_ms: Audio sent ahead of a speech onset
+        silence_policy: ``suppress`` drops silence entirely, ``thin`` sends one
+            chunk every ``keepalive_ms`` to keep the connection alive
+        keepalive_ms: Interval between silent chunks for the ``thin`` policy
+    """
+
+    def __init__(self,
+                 sampling_rate: int = 8000,
+                 frame_ms: int = 10,
+                 energy_threshold: float = 300.0,
+                 noise_ratio: float = 3.0,
+                 max_zcr: float = 0.35,
+                 hangover_ms: Optional[int] = None,
+                 preroll_ms: int = 300,
+                 silence_policy: Literal["suppress", "thin"] = "thin",
+                 keepalive_ms: int = 1000):
+        if silence_policy not in ("suppress", "thin"):
+            raise ValueError(f"Unknown silence policy: {silence_policy}")
+
+        self.frame_ms = frame_ms
+        self.set_sampling_rate(sampling_rate)
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.max_zcr = max_zcr
+        self.hangover_ms = hangover_ms
+        self.preroll_ms = preroll_ms
+        self.silence_policy = silence_policy
+        self.keepalive_ms = keepalive_ms
+
+        self.noise_floor = energy_threshold / noise_ratio
+        self._preroll: Deque[bytes] = deque()
+        self._preroll_duration_ms = 0.0
+        self._in_speech = False
+        self._position_ms = 0.0
+        self._last_voice_ms = float("-inf")
+        self._last_sent_ms = float("-inf")
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.speech_onsets = 0
+
+    @property
+    def saved_ratio(self) -> float:
+        """Fraction of the incoming audio that was not sent."""
+        if self.bytes_in == 0:
+            return 0.0
+        return 1.0 - self.bytes_out / self.bytes_in
+
+    def stats(self) -> dict:
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "saved_ratio": self.saved_ratio,
+            "speech_onsets": self.speech_onsets,
+            "noise_floor": self.noise_floor,
+        }
+
+    def reset(self) -> None:
+        """Forget speech state, e.g. after reconnecting to a fresh ASR session."""
+        self._preroll.clear()
+        self._preroll_duration_ms = 0.0
+        self._in_speech = False
+        self._last_voice_ms = float("-inf")
+        self._last_sent_ms = float("-inf")
+
+    def set_sampling_rate(self, sampling_rate: int) -> None:
+        """Adapt the analysis to a new input rate, e.g. after format negotiation."""
+        self.sampling_rate = sampling_rate
+        self.frame_size = max(1, int(sampling_rate * self.frame_ms / 1000))
+    
+    def is_speech(self, chunk: bytes) -> bool:
+        """Vectorized speech decision for one chunk of int16 PCM."""
+        samples = np.frombuffer(chunk[: len(chunk) - len(chunk) % 2], dtype="<i2")
+        n_frames = samples.size // self.frame_size
+        if n_frames == 0:
+            return False
+
+        frames = samples[: n_frames * self.frame_size].reshape(n_frames, self.frame_size).astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_size
+
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        voiced = (rms >= threshold) & ((zcr <= self.max_zcr) | (rms >= 3 * threshold))
+
+        quiet = rms[~voiced]
+        if quiet.size:
+            # Track the background level only on non-speech frames
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(quiet.mean())
+        return bool(voiced.any())
+
+    def process(self, chunk: bytes) -> List[bytes]:
+        """
+        Feed one chunk and return the chunks that should be sent, in order.
+
+        Returns an empty list for suppressed silence, the pre-roll plus the
+        chunk on a speech onset, and ``[chunk]`` otherwise.
+        """
+        duration_ms = len(chunk) / 2 * 1000 / self.sampling_rate
+        chunk_start_ms = self._position_ms
+        self._position_ms += duration_ms
+        self.bytes_in += len(chunk)
+
+        if self.is_speech(chunk):
+            self._last_voice_ms = self._position_ms
+            if not self._in_speech:
+                self._in_speech = True
+                self.speech_onsets += 1
+                out = list(self._preroll) + [chunk]
+                self._preroll.clear()
+                self._preroll_duration_ms = 0.0
+                return self._emit(out)
+            return self._emit([chunk])
+
+        if self._in_speech and self._position_ms - self._last_voice_ms <= (self.hangover_ms or 0):
+            return self._emit([chunk])
+        self._in_speech = False
+
+        if self.silence_policy == "thin" and chunk_start_ms - self._last_sent_ms >= self.keepalive_ms:
+            # Audio before a keep-alive chunk must not be replayed later as pre-roll
+            self._preroll.clear()
+            self._preroll_duration_ms = 0.0
+            return self._emit([chunk])
+
+        self._preroll.append(chunk)
+        self._preroll_duration_ms += duration_ms
+        while self._preroll and self._preroll_duration_ms > self.preroll_ms:
+            dropped = self._preroll.popleft()
+            self._preroll_duration_ms -= len(dropped) / 2 * 1000 / self.sampling_rate
+        return []
+
+    def _emit(self, chunks: List[bytes]) -> List[bytes]:
+        self.bytes_out += sum(len(c) for c in chunks)
+        self._last_sent_ms = self._position_ms
+        return chunks
@@ -1 +1,12 @@
-from .sentence_transformer import SentenceTransformerEmbedding
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from ai_toolkits.lazy_import import lazy_exports
+
+_EXPORTS = {
+    "SentenceTransformerEmbedding": ".sentence_transformer",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .sentence_transformer import SentenceTransformerEmbedding
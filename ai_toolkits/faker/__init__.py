@@ -1 +1,13 @@
-from .persona import PersonaProfile, ConversationSimulator
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from ai_toolkits.lazy_import import lazy_exports
+
+_EXPORTS = {
+    "PersonaProfile": ".persona",
+    "ConversationSimulator": ".persona",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .persona import ConversationSimulator, PersonaProfile
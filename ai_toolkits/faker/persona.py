@@ -2,6 +2,7 @@ import random
 from dataclasses import dataclass, field
 from typing import List, Optional, Protocol
 from ai_toolkits.llms.openai_provider import create_sync_client
+from ai_toolkits.llms.memory import ConversationMemory
 from faker import Faker
 
 class PersonalAxis(Protocol):
@@ -256,6 +257,7 @@ class OpenAIChatter:
     persona:str = None
     opponent_persona:str = "Unknown"
     scenario:str = "Undefined"
+    max_history_tokens:int = 4000
     
     def __post_init__(self):
         if not self.persona:
@@ -277,14 +279,13 @@ class OpenAIChatter:
             "Since you are talking via telephone, do not reply long messages, keep it simple, short and communicative. less than 50 Chinese characters is preferred."
             "Do follow your persona instruction"
         )
-        self.messages = [
-            {'role': "system","content": self.system_prompt}
-        ]
+        # Oldest turns are evicted once the prompt exceeds max_history_tokens
+        self.messages = ConversationMemory(self.system_prompt, max_prompt_tokens=self.max_history_tokens)
         
     def greeting(self):
         return self.client.chat.completions.create(
             model = 'gpt-4.1',
-            messages= self.messages + [{'role':"user", "content":"First, generate a greeting message to start a conversation."}],
+            messages= self.messages.messages + [{'role':"user", "content":"First, generate a greeting message to start a conversation."}],
         ).choices[0].message.content
     
     def add_user_message(self, message:str):
@@ -301,7 +302,7 @@ class OpenAIChatter:
                     print(f"Retrying chat, attempt {attempt+1}...")
                 response = self.client.chat.completions.create(
                     model = 'gpt-4.1',
-                    messages= self.messages,
+                    messages= self.messages.for_request(),
                 )
                 if response.choices[0].message.content:
                     return response
@@ -1 +1,18 @@
-from .pipeline import SemanticPipeline
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from ai_toolkits.lazy_import import lazy_exports
+
+_EXPORTS = {
+    "SemanticPipeline": ".pipeline",
+    "LLMResultCache": ".cache",
+    "BulkFileReader": ".bulk",
+    "ChunkedDocument": ".incremental",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .bulk import BulkFileReader
+    from .cache import LLMResultCache
+    from .incremental import ChunkedDocument
+    from .pipeline import SemanticPipeline
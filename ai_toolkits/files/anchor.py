@@ -1,12 +1,20 @@
 # pydantic_models.py
-from typing import List
+import asyncio
+import json
+import logging
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from ai_toolkits.files.cache import LLMResultCache
 from ai_toolkits.files.planner import SplitPlanner
-from ai_toolkits.structured.extractor import acreate_object_openai_safe
+from ai_toolkits.files.resolver import ResolvedAnchor
+from ai_toolkits.files.windows import TextWindow, compact_view, merge_window_anchors, split_windows
+from ai_toolkits.structured.extractor import ErrorResponse, acreate_object_openai_safe
 from ai_toolkits.llms.openai_provider import create_async_client
 
+logger = logging.getLogger(__name__)
+
 
 ANCHOR_FINDER_PROMPT = """
 Semantically split the following text into smaller chunks by identifying the optimal split points(anchors).
@@ -44,10 +52,21 @@ class SemanticSplitAnchors(BaseModel):
     
     
 class AnchorFinder:
+    """
+    Plan a document's split and find its anchor sentences with an LLM.
+
+    With a ``cache`` (``LLMResultCache``) the plan and the anchors of every
+    text/window are stored keyed by a hash of the text, plan, prompt
+    template, model and output schema, so re-running unchanged documents
+    makes no LLM calls. The cache is shared with the default planner.
+    """
     
-    def __init__(self):
-        self.planner = SplitPlanner()
-        self.client = create_async_client()
+    def __init__(self, client=None, planner: SplitPlanner = None,
+                 model: str = "gpt-4o", cache: Optional[LLMResultCache] = None):
+        self.client = client or create_async_client()
+        self.model = model
+        self.cache = cache
+        self.planner = planner or SplitPlanner(client=self.client, model=model, cache=cache)
 
     async def run(self, text: str) -> SemanticSplitAnchors:
         
@@ -56,10 +75,81 @@ class AnchorFinder:
         print(f"Split plan: {plan}\n")
         print("Finding anchors based on the plan...")
         
-        response = await acreate_object_openai_safe(
+        response = await self.find_anchors(text, plan)
+        if not isinstance(response, ErrorResponse):
+            print(f"Anchor sentences found: {response.anchor_sentences}\n")
+        return response
+
+    async def find_anchors(self, text: str, plan: str):
+        """Anchors in ``text`` following ``plan``, from the cache or ``request_anchors``."""
+        if self.cache is None:
+            return await self.request_anchors(text, plan)
+
+        schema = SemanticSplitAnchors.model_json_schema()
+        key = LLMResultCache.make_key("AnchorFinder", ANCHOR_FINDER_PROMPT, self.model, schema, plan, text)
+        # SQLite I/O off the event loop, other windows' calls keep running
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return SemanticSplitAnchors.model_validate_json(cached)
+        response = await self.request_anchors(text, plan)
+        # Failures are not cached, the next run retries them
+        if not isinstance(response, ErrorResponse):
+            value = json.dumps(response.model_dump(), ensure_ascii=False)
+            await asyncio.to_thread(self.cache.put, key, value)
+        return response
+
+    async def request_anchors(self, text: str, plan: str):
+        """One LLM call: anchors in ``text`` following ``plan``; an ``ErrorResponse`` if it failed."""
+        return await acreate_object_openai_safe(
             output_cls=SemanticSplitAnchors,
             prompt=ANCHOR_FINDER_PROMPT.format(plan=plan, text=text),
-            client=self.client
+            client=self.client,
+            model=self.model
         )
-        print(f"Anchor sentences found: {response.anchor_sentences}\n")
-        return response
+
+    async def run_windowed(self,
+                           text: str,
+                           window_chars: int = 8000,
+                           overlap_chars: int = 800,
+                           max_concurrency: int = 4,
+                           retries: int = 1) -> List[ResolvedAnchor]:
+        """
+        Find anchors in a long document window by window (map-reduce).
+
+        The split is planned once from a compact view of the document (opening,
+        section headers, excerpts). Anchors are then found in overlapping
+        windows, at most ``max_concurrency`` LLM calls at a time, and merged
+        by document offset; see ``merge_window_anchors``. A window whose call
+        still fails after ``retries`` retries contributes no anchors instead
+        of failing the document.
+
+        Args:
+            text: The document
+            window_chars: Maximum window length in characters
+            overlap_chars: Characters shared by neighbouring windows
+            max_concurrency: Maximum number of concurrent anchor calls
+            retries: Retries per failed window
+
+        Returns:
+            List[ResolvedAnchor]: Anchors in document order, with their offsets
+        """
+        windows = split_windows(text, window_chars, overlap_chars)
+        plan = await self.planner.run(document=compact_view(text, max_chars=window_chars // 2))
+        logger.info(f"Split plan: {plan}")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def window_anchors(window: TextWindow) -> List[str]:
+            async with semaphore:
+                for attempt in range(retries + 1):
+                    response = await self.find_anchors(window.text, plan)
+                    if not isinstance(response, ErrorResponse):
+                        return response.anchor_sentences
+                    logger.warning(f"Anchors for window {window.start}-{window.end} failed "
+                                   f"(attempt {attempt + 1}): {response.error}")
+                return []
+
+        anchors_per_window = await asyncio.gather(*(window_anchors(w) for w in windows))
+        anchors = merge_window_anchors(windows, anchors_per_window)
+        logger.info(f"{len(anchors)} anchors from {len(windows)} windows")
+        return anchors
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ai_toolkits", "llm_results.sqlite")
+
+
+class LLMResultCache:
+    """
+    Persistent cache of LLM results, keyed by a hash of everything that
+    determines the result (document text, prompt template, model, schema).
+
+    Results are stored in one SQLite file. When the stored values exceed
+    ``max_bytes`` the least recently used entries are evicted, down to 90% of
+    the limit. ``stats`` counts hits, misses, writes and evictions.
+
+    Example:
+        cache = LLMResultCache()
+        key = LLMResultCache.make_key("planner", PLAN_PROMPT, "gpt-4o", document)
+        plan = cache.get(key)
+        if plan is None:
+            plan = await call_llm(...)
+            cache.put(key, plan)
+
+    Args:
+        path: SQLite file, created with its directory if missing
+        max_bytes: Size bound of the stored values
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """SHA-256 over the parts; non-string parts are JSON encoded."""
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part if isinstance(part, str) else json.dumps(part, sort_keys=True, ensure_ascii=False)
+            encoded = data.encode("utf-8")
+            # Length prefix, so ("ab", "c") and ("a", "bc") differ
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.stats["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"Not caching a {size} byte result, larger than the cache")
+            return
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now))
+            self._bytes += size - (old[0] if old else 0)
+            self.stats["writes"] += 1
+            if self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target_bytes: int) -> None:
+        """Delete least recently used entries until at most ``target_bytes`` remain."""
+        rows = self._db.execute("SELECT key, size FROM results ORDER BY last_used").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._bytes <= target_bytes:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", evicted)
+        self.stats["evictions"] += len(evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
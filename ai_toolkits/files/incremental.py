@@ -0,0 +1,204 @@
+import bisect
+import difflib
+import hashlib
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from ai_toolkits.files.windows import split_at_offsets
+
+
+@dataclass
+class Chunk:
+    """
+    The chunk ``text[start:end]`` of a document.
+
+    ``id`` is derived from the chunk's content, so a chunk that is unchanged
+    in a new version of the document keeps its id, and its ``metadata``
+    (e.g. the embedding computed for it downstream) is carried over.
+    """
+    id: str
+    start: int
+    end: int
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ChunkedDocument:
+    """A document with its chunks; keep it (``to_dict``) to re-chunk the next version incrementally."""
+    text: str
+    chunks: List[Chunk]
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "chunks": [asdict(chunk) for chunk in self.chunks]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChunkedDocument":
+        return cls(text=data["text"], chunks=[Chunk(**chunk) for chunk in data["chunks"]])
+
+
+@dataclass
+class ChunkDiff:
+    """
+    The chunks of a new document version compared with the previous version.
+
+    ``added``/``removed`` are what an index has to insert and delete;
+    ``unchanged`` chunks keep their ids and metadata. ``rechunked_chars`` is
+    how much of the new text was chunked again.
+    """
+    document: ChunkedDocument
+    added: List[Chunk]
+    removed: List[Chunk]
+    unchanged: List[Chunk]
+    rechunked_chars: int = 0
+
+    @property
+    def added_ids(self) -> List[str]:
+        return [chunk.id for chunk in self.added]
+
+    @property
+    def removed_ids(self) -> List[str]:
+        return [chunk.id for chunk in self.removed]
+
+    @property
+    def unchanged_ids(self) -> List[str]:
+        return [chunk.id for chunk in self.unchanged]
+
+
+def build_document(text: str, offsets: Sequence[int], previous_chunks: Sequence[Chunk] = ()) -> ChunkedDocument:
+    """
+    Chunk ``text`` at ``offsets`` (see ``split_at_offsets``) and give every
+    chunk its content id. Identical chunks are numbered in document order.
+    Chunks with the id of one of ``previous_chunks`` get a copy of its metadata.
+    """
+    metadata = {chunk.id: chunk.metadata for chunk in previous_chunks}
+    chunks, seen, start = [], {}, 0
+    for chunk_text in split_at_offsets(text, offsets) if text else []:
+        digest = hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()[:16]
+        seen[digest] = seen.get(digest, 0) + 1
+        chunk_id = digest if seen[digest] == 1 else f"{digest}-{seen[digest]}"
+        chunks.append(Chunk(id=chunk_id, start=start, end=start + len(chunk_text), text=chunk_text,
+                            metadata=dict(metadata.get(chunk_id, {}))))
+        start += len(chunk_text)
+    return ChunkedDocument(text=text, chunks=chunks)
+
+
+def diff_chunks(previous: ChunkedDocument, document: ChunkedDocument, rechunked_chars: int = 0) -> ChunkDiff:
+    old_ids = {chunk.id for chunk in previous.chunks}
+    new_ids = {chunk.id for chunk in document.chunks}
+    return ChunkDiff(
+        document=document,
+        added=[chunk for chunk in document.chunks if chunk.id not in old_ids],
+        removed=[chunk for chunk in previous.chunks if chunk.id not in new_ids],
+        unchanged=[chunk for chunk in document.chunks if chunk.id in old_ids],
+        rechunked_chars=rechunked_chars,
+    )
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    # Binary search with slice comparisons: C speed on long documents
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_length(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def text_opcodes(old: str, new: str) -> List[Tuple[str, int, int, int, int]]:
+    """
+    ``difflib`` opcodes ``(tag, i1, i2, j1, j2)`` turning ``old`` into
+    ``new``, in character offsets. The common prefix and suffix are cut off
+    first; the rest is compared line by line.
+    """
+    prefix = _common_prefix_length(old, new)
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - prefix)
+    a, b = old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]
+
+    opcodes = [("equal", 0, prefix, 0, prefix)] if prefix else []
+    if a or b:
+        a_lines, b_lines = a.splitlines(keepends=True), b.splitlines(keepends=True)
+        a_starts, b_starts = [0], [0]
+        for line in a_lines:
+            a_starts.append(a_starts[-1] + len(line))
+        for line in b_lines:
+            b_starts.append(b_starts[-1] + len(line))
+        matcher = difflib.SequenceMatcher(None, a_lines, b_lines)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            opcodes.append((tag, prefix + a_starts[i1], prefix + a_starts[i2],
+                            prefix + b_starts[j1], prefix + b_starts[j2]))
+    if suffix:
+        opcodes.append(("equal", len(old) - suffix, len(old), len(new) - suffix, len(new)))
+    return opcodes
+
+
+def plan_rechunk(previous: ChunkedDocument, text: str,
+                 margin_chunks: int = 1) -> Tuple[List[Tuple[Chunk, int]], List[Tuple[int, int]]]:
+    """
+    Decide which chunks of ``previous`` survive in ``text`` and which
+    regions of ``text`` have to be chunked again.
+
+    A chunk is dirty if an edit overlaps it (or inserts text inside it or
+    right after it); ``margin_chunks`` chunks on both sides of a dirty chunk
+    are re-chunked with it, so its boundaries can move.
+
+    Returns:
+        The clean chunks with their new start offsets, and the dirty regions
+        ``(start, end)`` of ``text``; together they cover ``text`` exactly.
+    """
+    chunks = previous.chunks
+    if not chunks:
+        return [], [(0, len(text))] if text else []
+
+    starts = [chunk.start for chunk in chunks]
+    ends = [chunk.end for chunk in chunks]
+    opcodes = text_opcodes(previous.text, text)
+    dirty = [False] * len(chunks)
+    for tag, i1, i2, _, _ in opcodes:
+        if tag == "equal":
+            continue
+        if i1 == i2:
+            # Insertion: belongs to the chunk it is in, or ends
+            first = last = min(bisect.bisect_left(ends, i1), len(chunks) - 1)
+        else:
+            first, last = bisect.bisect_right(ends, i1), bisect.bisect_left(starts, i2) - 1
+        for k in range(first, last + 1):
+            dirty[k] = True
+
+    marked = [k for k, is_dirty in enumerate(dirty) if is_dirty]
+    for k in marked:
+        for m in range(max(0, k - margin_chunks), min(len(chunks), k + margin_chunks + 1)):
+            dirty[m] = True
+
+    equal = [op for op in opcodes if op[0] == "equal"]
+    equal_starts = [op[1] for op in equal]
+    clean, regions = [], []
+    region_start = 0
+    for k, chunk in enumerate(chunks):
+        if dirty[k]:
+            continue
+        _, i1, i2, j1, _ = equal[bisect.bisect_right(equal_starts, chunk.start) - 1]
+        if chunk.end > i2:
+            # Not inside one unchanged block after all: re-chunk it
+            continue
+        new_start = j1 + chunk.start - i1
+        if new_start > region_start:
+            regions.append((region_start, new_start))
+        clean.append((chunk, new_start))
+        region_start = new_start + len(chunk.text)
+    if region_start < len(text):
+        regions.append((region_start, len(text)))
+    return clean, regions
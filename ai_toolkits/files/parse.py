@@ -1,4 +1,3 @@
-from markitdown import MarkItDown
 from abc import ABC, abstractmethod
 
 class BaseFileReader(ABC):
@@ -12,6 +11,7 @@ class MarkDownFileReader(BaseFileReader):
     def __init__(self, **kwargs):
         if not kwargs.get("enable_plugins"):
             kwargs["enable_plugins"] = False
+        from markitdown import MarkItDown
         self.md = MarkItDown(**kwargs)
 
     def read(self, fp: str) -> str:
@@ -1,19 +1,73 @@
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
+
 from ai_toolkits.files.parse import MarkDownFileReader
 from ai_toolkits.files.anchor import AnchorFinder
+from ai_toolkits.files.bulk import BulkFileReader, ParsedDocument
+from ai_toolkits.files.cache import LLMResultCache
+from ai_toolkits.files.incremental import ChunkDiff, ChunkedDocument, build_document, diff_chunks, plan_rechunk
 from ai_toolkits.files.recursive import langchain_recursive_chinese_split
+from ai_toolkits.files.resolver import resolve_anchors
+from ai_toolkits.files.windows import split_at_offsets
 
 
 class SemanticPipeline:
-    def __init__(self, trim_long_chunks:bool = False):
-        self.reader = MarkDownFileReader()
-        self.anchor_finder = AnchorFinder()
+    """
+    Split documents into semantic chunks at LLM-chosen anchor sentences.
+
+    Documents longer than ``window_chars`` are split window by window
+    (``AnchorFinder.run_windowed``): one plan from a compact view, then up to
+    ``max_concurrency`` concurrent anchor calls on overlapping windows, so
+    long documents neither exceed the context limit nor run as one serial
+    call. ``window_chars=None`` always sends the whole document.
+
+    Pass a ``cache`` (``LLMResultCache``) to keep the planner and anchor
+    results on disk: re-running an unchanged corpus then makes no LLM calls.
+    It is also attached to a given ``anchor_finder`` and its planner.
+    """
+    def __init__(self,
+                 trim_long_chunks:bool = False,
+                 window_chars: Optional[int] = 8000,
+                 window_overlap_chars: int = 800,
+                 max_concurrency: int = 4,
+                 anchor_finder: AnchorFinder = None,
+                 cache: Optional[LLMResultCache] = None):
+        self._reader = None
+        if anchor_finder is None:
+            anchor_finder = AnchorFinder(cache=cache)
+        elif cache is not None:
+            if anchor_finder.cache not in (None, cache) or anchor_finder.planner.cache not in (None, cache):
+                raise ValueError("anchor_finder already has a different cache")
+            anchor_finder.cache = anchor_finder.planner.cache = cache
+        self.anchor_finder = anchor_finder
         self.trim_long_chunks = trim_long_chunks
+        self.window_chars = window_chars
+        self.window_overlap_chars = window_overlap_chars
+        self.max_concurrency = max_concurrency
         
+    @property
+    def reader(self) -> MarkDownFileReader:
+        # Created on first use: markitdown is only needed for split_file
+        if self._reader is None:
+            self._reader = MarkDownFileReader()
+        return self._reader
+        
+    async def split_offsets(self, text: str) -> List[int]:
+        """Offsets in ``text`` where the LLM-chosen chunks start."""
+        if self.window_chars and len(text) > self.window_chars:
+            anchors = await self.anchor_finder.run_windowed(
+                text,
+                window_chars=self.window_chars,
+                overlap_chars=self.window_overlap_chars,
+                max_concurrency=self.max_concurrency)
+        else:
+            response = await self.anchor_finder.run(text)
+            anchors = resolve_anchors(text, response.anchor_sentences)
+        return [anchor.offset for anchor in anchors]
+
     async def split_text(self, text: str):
-        response = await self.anchor_finder.run(text)
-        for anchor in response.anchor_sentences:
-            text = text.replace(anchor, f"<new-chunk>{anchor}")
-        chunks = text.split("<new-chunk>")
+        chunks = split_at_offsets(text, await self.split_offsets(text))
         chunks = [chunk.strip() for chunk in chunks if len(chunk.strip()) > 0]
         
         if not self.trim_long_chunks:
@@ -31,3 +85,110 @@ class SemanticPipeline:
         doc_content = self.reader.read(file_path)
         chunks =await self.split_text(doc_content)
         return chunks
+
+    async def split_document(self, text: str) -> ChunkedDocument:
+        """
+        Split ``text`` into chunks with content ids and offsets.
+
+        Unlike ``split_text`` the chunks are exact slices of the text (not
+        stripped, not trimmed), so the result can be re-chunked incrementally
+        with ``resplit_document`` when the document changes.
+        """
+        return build_document(text, await self.split_offsets(text))
+
+    async def resplit_document(self, previous: ChunkedDocument, text: str,
+                               margin_chunks: int = 1) -> ChunkDiff:
+        """
+        Re-chunk a new version of a document, reusing the unchanged chunks.
+
+        The new text is diffed against ``previous.text``; only the chunks an
+        edit touches, plus ``margin_chunks`` neighbours on each side, are
+        chunked again by the LLM (see ``plan_rechunk``). All other chunks are
+        reused verbatim, with their ids and metadata (e.g. embeddings).
+
+        Example:
+            doc = await pipeline.split_document(old_text)
+            diff = await pipeline.resplit_document(doc, new_text)
+            index.delete(diff.removed_ids)
+            index.add(diff.added)
+
+        Returns:
+            ChunkDiff: The new ``document`` and its added/removed/unchanged chunks
+        """
+        clean, regions = plan_rechunk(previous, text, margin_chunks)
+
+        async def region_offsets(start: int, end: int) -> List[int]:
+            if not text[start:end].strip():
+                return []
+            return [start + offset for offset in await self.split_offsets(text[start:end])]
+
+        offsets = [new_start for _, new_start in clean] + [start for start, _ in regions]
+        for found in await asyncio.gather(*(region_offsets(start, end) for start, end in regions)):
+            offsets.extend(found)
+        document = build_document(text, offsets, previous.chunks)
+        return diff_chunks(previous, document, rechunked_chars=sum(end - start for start, end in regions))
+
+    async def resplit_file(self, file_path: str, previous: ChunkedDocument, margin_chunks: int = 1) -> ChunkDiff:
+        return await self.resplit_document(previous, self.reader.read(file_path), margin_chunks)
+
+    async def split_files(self,
+                          sources: Union[str, Path, Iterable[Union[str, Path]]],
+                          bulk_reader: Optional[BulkFileReader] = None,
+                          max_documents: int = 4) -> AsyncIterator[Tuple[ParsedDocument, List[str]]]:
+        """
+        Parse many files in a process pool and split each as soon as it is parsed.
+
+        Parsing (``bulk_reader``, one worker per core by default) and LLM
+        chunking overlap: a document is split while the next ones are still
+        being converted, at most ``max_documents`` at a time; further parsed
+        documents wait for a free slot, so memory stays bounded. Results are
+        yielded in completion order. A document that failed to parse or split
+        is yielded with its ``error`` set and no chunks.
+
+        Example:
+            async for doc, chunks in pipeline.split_files("docs/*.pdf"):
+                print(doc.path, doc.elapsed_s, doc.error or len(chunks))
+
+        Args:
+            sources: Files, directories or glob patterns, see ``expand_document_sources``
+            bulk_reader: Reader for the files, ``BulkFileReader()`` if omitted
+            max_documents: Maximum number of documents being split concurrently
+        """
+        bulk_reader = bulk_reader or BulkFileReader()
+        semaphore = asyncio.Semaphore(max_documents)
+        results: asyncio.Queue = asyncio.Queue()
+        splits = []
+
+        async def split(doc: ParsedDocument) -> None:
+            chunks = []
+            try:
+                chunks = await self.split_text(doc.text)
+            except Exception as e:
+                doc.error = f"{type(e).__name__}: {e}"
+            finally:
+                semaphore.release()
+            await results.put((doc, chunks))
+
+        async def parse_all() -> None:
+            try:
+                async for doc in bulk_reader.aread_all(sources):
+                    if doc.ok:
+                        # Wait for a free slot before taking the next document,
+                        # so parsed texts do not pile up ahead of the LLM
+                        await semaphore.acquire()
+                        splits.append(asyncio.create_task(split(doc)))
+                    else:
+                        await results.put((doc, []))
+                await asyncio.gather(*splits)
+            finally:
+                await results.put(None)
+
+        producer = asyncio.create_task(parse_all())
+        try:
+            while (item := await results.get()) is not None:
+                yield item
+            # Re-raise what stopped the parsing, e.g. a source without documents
+            await producer
+        finally:
+            for task in [producer] + splits:
+                task.cancel()
@@ -1,5 +1,9 @@
+import asyncio
 from dataclasses import dataclass, field
+from typing import Optional
+
 from openai import AsyncClient
+from ai_toolkits.files.cache import LLMResultCache
 from ai_toolkits.llms.openai_provider import (
     create_async_client,
 )
@@ -32,25 +36,40 @@ Here is the document you need to plan for chunking
 class SplitPlanner:
     
     client: AsyncClient = field(default_factory=create_async_client)
+    model: str = "gpt-4o"
+    cache: Optional[LLMResultCache] = None
     
     async def run(self, document:str) -> str:
         """
         Create a split plan for the given document.
         
+        With a ``cache``, the plan is looked up by a hash of the document,
+        prompt template and model first, and stored after the LLM call.
+        
         Args:
             document (str): The document to create a split plan for.
         
         Returns:
             str: The split plan as a string.
         """
+        key = None
+        if self.cache is not None:
+            key = LLMResultCache.make_key("SplitPlanner", PLAN_PROMPT, self.model, document)
+            # SQLite I/O off the event loop, other windows' calls keep running
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+        
         prompt = PLAN_PROMPT.format(document=document)
         
         response = await self.client.chat.completions.create(
-            model="gpt-4o",
+            model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0)
         
         if response:
             response = response.choices[0].message.content
-            
+        
+        if key is not None and response:
+            await asyncio.to_thread(self.cache.put, key, response)
         return response
@@ -0,0 +1,247 @@
+import bisect
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Ignored by the fuzzy fallback: whitespace and ASCII/CJK punctuation
+_PUNCTUATION = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~，。！？；：、“”‘’（）《》〈〉【】「」『』〔〕…—－·～"
+_IGNORED = re.compile(r"[\s" + re.escape(_PUNCTUATION) + r"]+")
+_KEPT = re.compile(r"[^\s" + re.escape(_PUNCTUATION) + r"]+")
+
+
+@dataclass
+class ResolvedAnchor:
+    """
+    An anchor sentence and the document offset where its chunk starts.
+
+    ``fuzzy`` is set when the anchor was only found ignoring whitespace and
+    punctuation (the LLM misquoted it).
+    """
+    text: str
+    offset: int
+    fuzzy: bool = False
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton: all occurrences of many patterns in one pass.
+
+    While no pattern is partially matched, the scan jumps to the next
+    character that starts a pattern with a regex search, so text that cannot
+    match is skipped at C speed.
+
+    Example:
+        automaton = AhoCorasick(["第一节", "总结"])
+        for start, index in automaton.iter_matches(text):
+            ...
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add(pattern, index)
+        self._link()
+        first_chars = "".join(re.escape(c) for c in self._goto[0])
+        self._first = re.compile(f"[{first_chars}]") if first_chars else None
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] += (index,)
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs include those of the failure state."""
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                out[nxt] += out[fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start offset, pattern index)`` for every occurrence, by end offset."""
+        if self._first is None:
+            return
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        search = self._first.search
+        state, i, n = 0, 0, len(text)
+        while i < n:
+            if state == 0:
+                m = search(text, i)
+                if m is None:
+                    return
+                i = m.start()
+            ch = text[i]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield i - len(patterns[index]) + 1, index
+            i += 1
+
+
+def _normalize(text: str) -> Tuple[str, List[int], List[int]]:
+    """
+    ``text`` without whitespace and punctuation, plus what maps offsets back:
+    the normalized and original start of every kept run.
+    """
+    runs = [(m.start(), m.group()) for m in _KEPT.finditer(text)]
+    normalized_starts, original_starts, total = [], [], 0
+    for start, run in runs:
+        normalized_starts.append(total)
+        original_starts.append(start)
+        total += len(run)
+    return "".join(run for _, run in runs), normalized_starts, original_starts
+
+
+def _original_offset(offset: int, normalized_starts: List[int], original_starts: List[int]) -> int:
+    run = bisect.bisect_right(normalized_starts, offset) - 1
+    return original_starts[run] + offset - normalized_starts[run]
+
+
+def _include_leading_markup(text: str, offset: int, anchor: str) -> int:
+    """
+    Move a fuzzy match back over the ignored characters just before it
+    (within its line) if the anchor starts with such characters, so that
+    the chunk of a misquoted ``"## 第二节 方法"`` starts at the ``"## "``.
+    """
+    lead = _IGNORED.match(anchor)
+    if lead is None:
+        return offset
+    markup = set(lead.group()) | {" ", "\t", "\u3000"}
+    markup.discard("\n")
+    while offset > 0 and text[offset - 1] in markup:
+        offset -= 1
+    return offset
+
+
+def _ordered_choice(occurrences: List[List[int]]) -> List[Optional[int]]:
+    """
+    Pick at most one occurrence per anchor so that the picked offsets increase
+    in anchor order, for as many anchors as possible (longest increasing
+    subsequence; earliest offsets on ties).
+    """
+    tails: List[int] = []         # smallest end offset of a chain of each length
+    tail_items: List[tuple] = []  # (anchor, offset) ending that chain
+    parent: Dict[tuple, Optional[tuple]] = {}
+    for anchor, offsets in enumerate(occurrences):
+        # Descending, so one anchor never extends a chain ending in itself
+        for offset in sorted(offsets, reverse=True):
+            length = bisect.bisect_left(tails, offset)
+            item = (anchor, offset)
+            parent[item] = tail_items[length - 1] if length else None
+            if length == len(tails):
+                tails.append(offset)
+                tail_items.append(item)
+            elif offset < tails[length]:
+                tails[length] = offset
+                tail_items[length] = item
+
+    chosen: List[Optional[int]] = [None] * len(occurrences)
+    item = tail_items[-1] if tail_items else None
+    while item is not None:
+        chosen[item[0]] = item[1]
+        item = parent[item]
+    return chosen
+
+
+def _bounded_candidates(occurrences: List[List[int]]) -> List[List[int]]:
+    """
+    Limit each non-unique anchor to its occurrences between the nearest
+    unique anchors before and after it (when those are in order), so a
+    repeated phrase does not bring all of its occurrences into the ordering.
+    """
+    unique = [offsets[0] if len(offsets) == 1 else None for offsets in occurrences]
+    lower, upper = [None] * len(unique), [None] * len(unique)
+    bound = None
+    for i, offset in enumerate(unique):
+        lower[i] = bound
+        if offset is not None:
+            bound = offset
+    bound = None
+    for i in range(len(unique) - 1, -1, -1):
+        upper[i] = bound
+        if unique[i] is not None:
+            bound = unique[i]
+
+    candidates = []
+    for i, offsets in enumerate(occurrences):
+        lo = -1 if lower[i] is None else lower[i]
+        hi = float("inf") if upper[i] is None else upper[i]
+        if len(offsets) > 1 and lo < hi:
+            offsets = sorted(offsets)
+            offsets = offsets[bisect.bisect_right(offsets, lo):bisect.bisect_left(offsets, hi)] or offsets
+        candidates.append(offsets)
+    return candidates
+
+
+def resolve_anchors(text: str, anchors: Sequence[str], fuzzy: bool = True,
+                    min_fuzzy_chars: int = 4) -> List[ResolvedAnchor]:
+    """
+    Find where each anchor starts in ``text``, in one pass over the document.
+
+    All anchors are matched at once (``AhoCorasick``). A non-unique anchor
+    gets the occurrence consistent with the order the anchors were given in
+    (their document order); anchors that contradict that order are kept only
+    if they occur exactly once. Anchors that are not found verbatim are
+    matched ignoring whitespace and punctuation (``fuzzy``) if that leaves at
+    least ``min_fuzzy_chars`` characters; such a match starts at the anchor's
+    leading markup (e.g. ``"## "``) when the text has it too.
+
+    Args:
+        text: The document
+        anchors: Anchor sentences, in document order
+        fuzzy: Fall back to whitespace/punctuation-insensitive matching
+        min_fuzzy_chars: Shortest normalized anchor the fallback may match
+
+    Returns:
+        List[ResolvedAnchor]: Resolved anchors sorted by offset, one per offset
+    """
+    # Identical anchors share one pattern and one occurrence list
+    distinct = list(dict.fromkeys(anchors))
+    found: List[List[int]] = [[] for _ in distinct]
+    for start, index in AhoCorasick(distinct).iter_matches(text):
+        found[index].append(start)
+    by_anchor = dict(zip(distinct, found))
+    occurrences = [list(by_anchor[anchor]) for anchor in anchors]
+
+    fuzzy_found = set()
+    missing = [i for i, offsets in enumerate(occurrences) if not offsets and anchors[i]]
+    if fuzzy and missing:
+        normalized_anchors = {i: _IGNORED.sub("", anchors[i]) for i in missing}
+        normalized_anchors = {i: a for i, a in normalized_anchors.items() if len(a) >= min_fuzzy_chars}
+        if normalized_anchors:
+            normalized, normalized_starts, original_starts = _normalize(text)
+            indexes = list(normalized_anchors)
+            automaton = AhoCorasick([normalized_anchors[i] for i in indexes])
+            for start, k in automaton.iter_matches(normalized):
+                offset = _original_offset(start, normalized_starts, original_starts)
+                occurrences[indexes[k]].append(_include_leading_markup(text, offset, anchors[indexes[k]]))
+                fuzzy_found.add(indexes[k])
+
+    chosen = _ordered_choice(_bounded_candidates(occurrences))
+    resolved: Dict[int, ResolvedAnchor] = {}
+    for index, offset in enumerate(chosen):
+        if offset is None and len(occurrences[index]) == 1:
+            offset = occurrences[index][0]
+        if offset is not None and offset not in resolved:
+            resolved[offset] = ResolvedAnchor(text=anchors[index], offset=offset, fuzzy=index in fuzzy_found)
+    return [resolved[offset] for offset in sorted(resolved)]
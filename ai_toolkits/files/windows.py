@@ -0,0 +1,147 @@
+import re
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from ai_toolkits.files.resolver import ResolvedAnchor, resolve_anchors
+
+# Characters after which a window may be cut without splitting a sentence
+_BOUNDARY_CHARS = "\n。！？；.!?;"
+
+# Lines that look like section headers: markdown, 第X章/节, 1. / 1.2, 一、
+_HEADER_PATTERN = re.compile(
+    r"^\s*(#{1,6}\s|第[一二三四五六七八九十百千零\d]+[章节条部篇]|\d+(\.\d+)*[.、\s]|[一二三四五六七八九十]+、)")
+
+
+@dataclass
+class TextWindow:
+    """
+    A slice ``text[start:end]`` of a document, overlapping its neighbours.
+
+    Anchors found in a window are only kept inside its core region
+    ``[core_start, core_end)``; core regions partition the document, so an
+    anchor seen by two overlapping windows is kept once.
+    """
+    start: int
+    end: int
+    text: str
+    core_start: int = 0
+    core_end: int = 0
+
+
+def _boundary_before(text: str, pos: int, lo: int) -> int:
+    """Position just after the last boundary character in ``text[lo:pos]``, ``pos`` if there is none."""
+    for i in range(pos - 1, lo - 1, -1):
+        if text[i] in _BOUNDARY_CHARS:
+            return i + 1
+    return pos
+
+
+def _boundary_after(text: str, pos: int, hi: int) -> int:
+    """Position just after the first boundary character in ``text[pos:hi]``, ``pos`` if there is none."""
+    for i in range(pos, hi):
+        if text[i] in _BOUNDARY_CHARS:
+            return i + 1
+    return pos
+
+
+def split_windows(text: str, window_chars: int = 8000, overlap_chars: int = 800) -> List[TextWindow]:
+    """
+    Split ``text`` into windows of at most ``window_chars`` that overlap by
+    about ``overlap_chars``, cut at line or sentence ends where possible.
+
+    Args:
+        text: The document
+        window_chars: Maximum window length
+        overlap_chars: Characters shared by neighbouring windows
+
+    Returns:
+        List[TextWindow]: Windows in document order, with their core regions set
+    """
+    if 2 * overlap_chars >= window_chars:
+        raise ValueError("overlap_chars must be less than half of window_chars")
+
+    spans = []
+    start = 0
+    while True:
+        end = min(len(text), start + window_chars)
+        if end < len(text):
+            end = _boundary_before(text, end, end - overlap_chars)
+        spans.append((start, end))
+        if end >= len(text):
+            break
+        start = _boundary_after(text, end - overlap_chars, end)
+
+    windows = [TextWindow(start=s, end=e, text=text[s:e]) for s, e in spans]
+    for i, window in enumerate(windows):
+        # Neighbouring core regions meet in the middle of the overlap
+        window.core_start = 0 if i == 0 else (windows[i - 1].end + window.start) // 2
+        window.core_end = len(text) if i == len(windows) - 1 else (window.end + windows[i + 1].start) // 2
+    return windows
+
+
+def compact_view(text: str, max_chars: int = 4000, excerpt_chars: int = 200) -> str:
+    """
+    A short view of a long document to plan the split from: the opening,
+    the section header lines and evenly spaced excerpts, at most ``max_chars``.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    opening = text[:max_chars // 4]
+    headers = [line.strip() for line in text[len(opening):].splitlines()
+               if _HEADER_PATTERN.match(line) and len(line.strip()) <= 80]
+    budget = max_chars - len(opening)
+    header_text = "\n".join(headers)
+    if len(header_text) > budget // 2:
+        # Too many headers, keep an even sample of them
+        keep = max(1, len(headers) * (budget // 2) // len(header_text))
+        headers = [headers[i * len(headers) // keep] for i in range(keep)]
+        header_text = "\n".join(headers)
+    budget -= len(header_text)
+
+    excerpts = []
+    count = budget // (excerpt_chars + 5)
+    for i in range(1, count + 1):
+        pos = len(text) * i // (count + 1)
+        excerpts.append(text[pos:pos + excerpt_chars].strip())
+
+    parts = [opening, "...", "[section headers]", header_text, "[excerpts]"] + excerpts
+    return "\n".join(part for part in parts if part)[:max_chars]
+
+
+def merge_window_anchors(windows: Sequence[TextWindow],
+                         anchors_per_window: Sequence[Sequence[str]],
+                         min_gap_chars: int = 100) -> List[ResolvedAnchor]:
+    """
+    Resolve the anchors found per window to document offsets and merge them.
+
+    An anchor is kept if ``resolve_anchors`` finds it in its window's text
+    and its offset lies in the window's core region, or if the previous
+    window was cut in the middle of it so only this window saw it whole.
+    Anchors at the same offset, at the very start of the document, or closer
+    than ``min_gap_chars`` to the previous anchor (typically both sides of a
+    window boundary) are dropped.
+    """
+    resolved = []
+    for i, (window, anchors) in enumerate(zip(windows, anchors_per_window)):
+        for anchor in resolve_anchors(window.text, anchors):
+            offset = window.start + anchor.offset
+            in_core = window.core_start <= offset < window.core_end
+            cut_before = i > 0 and offset < window.core_start and offset + len(anchor.text) > windows[i - 1].end
+            if in_core or cut_before:
+                resolved.append(ResolvedAnchor(text=anchor.text, offset=offset, fuzzy=anchor.fuzzy))
+
+    merged: List[ResolvedAnchor] = []
+    last_offset = 0
+    for anchor in sorted(resolved, key=lambda a: a.offset):
+        if anchor.offset - last_offset < min_gap_chars:
+            continue
+        merged.append(anchor)
+        last_offset = anchor.offset
+    return merged
+
+
+def split_at_offsets(text: str, offsets: Sequence[int]) -> List[str]:
+    """Split ``text`` so that a new chunk starts at every offset."""
+    bounds = [0] + sorted(set(o for o in offsets if 0 < o < len(text))) + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
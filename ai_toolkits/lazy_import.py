@@ -0,0 +1,33 @@
+"""Lazy package exports, so importing a package does not import its heavy dependencies."""
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build module ``__getattr__`` / ``__dir__`` (PEP 562) that import a name's
+    submodule on first access.
+
+    Example (in a package ``__init__.py``):
+        _EXPORTS = {"SemanticPipeline": ".pipeline"}
+        __all__ = list(_EXPORTS)
+        __getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+    Args:
+        package: ``__name__`` of the package
+        exports: Exported name -> (relative) module that defines it
+    """
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        namespace[name] = value  # later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
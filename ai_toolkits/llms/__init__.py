@@ -1,3 +1,15 @@
-from .llama_index_provider import LlamaIndeAzureOpenAI
-from .openai_provider import create_sync_client
-from .openai_provider import create_async_client
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from ai_toolkits.lazy_import import lazy_exports
+
+_EXPORTS = {
+    "LlamaIndeAzureOpenAI": ".llama_index_provider",
+    "create_sync_client": ".openai_provider",
+    "create_async_client": ".openai_provider",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .llama_index_provider import LlamaIndeAzureOpenAI
+    from .openai_provider import create_async_client, create_sync_client
@@ -0,0 +1,218 @@
+"""
+Token-budgeted conversation memory.
+
+``ConversationMemory`` replaces the plain ``conversation_history`` list of
+chat handlers. Every message is tokenized once when it is added and the
+prompt size is kept as a running total, so enforcing the budget costs
+nothing per request. When the prompt grows beyond ``max_prompt_tokens`` the
+oldest turns are evicted; with a ``summarizer`` they are folded into a
+running summary in the background. The system prompt is always kept.
+
+Example:
+    memory = ConversationMemory("You are a helpful assistant.", max_prompt_tokens=4000,
+                                summarizer=llm_summarizer(async_client))
+    memory.add("user", "Hi!")
+    response = await client.chat.completions.create(model="gpt-4.1", messages=memory.for_request())
+"""
+
+import asyncio
+import logging
+import re
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, str]
+Summarizer = Callable[[str, List[Message]], Awaitable[str]]
+
+# Per-message framing tokens and reply priming of the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+_CJK = re.compile(r"[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # The encoding files are downloaded on first use
+        logger.warning(f"Could not load tiktoken encoding for {model}, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4.1") -> int:
+    """
+    Number of tokens of ``text`` for ``model``.
+
+    Uses ``tiktoken`` when it is installed and its encoding can be loaded,
+    otherwise estimates one token per CJK character and per four other
+    characters.
+    """
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def llm_summarizer(async_client, model: str = "gpt-4.1", max_words: int = 150) -> Summarizer:
+    """Summarizer that asks the chat model to update the running summary."""
+
+    async def summarize(summary: str, messages: List[Message]) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = (
+            f"Update the summary of a conversation with the new messages below. "
+            f"Keep names, facts, decisions and open questions; at most {max_words} words.\n"
+            f"<summary>\n{summary}\n</summary>\n<messages>\n{transcript}\n</messages>"
+        )
+        response = await async_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return response.choices[0].message.content.strip()
+
+    return summarize
+
+
+class ConversationMemory:
+    """
+    Chat history with a prompt token budget.
+
+    Args:
+        system_prompt: Always the first message of every prompt
+        max_prompt_tokens: Prompt budget (messages, framing and the reply
+            priming); ``None`` keeps everything
+        summarizer: Optional async ``(summary, evicted_messages) -> summary``;
+            evicted turns are dropped without it
+        model: Model name used to pick the tokenizer
+        min_recent_messages: Messages that are never evicted, e.g. the
+            current user message
+
+    The object behaves like the list it replaces: ``append`` takes message
+    dicts and iterating yields the full ``transcript`` (including evicted
+    messages), while ``messages``/``for_request()`` return the prompt.
+    """
+
+    def __init__(self,
+                 system_prompt: str,
+                 max_prompt_tokens: Optional[int] = 8000,
+                 summarizer: Optional[Summarizer] = None,
+                 model: str = "gpt-4.1",
+                 min_recent_messages: int = 2):
+        self.model = model
+        self.max_prompt_tokens = max_prompt_tokens
+        self.summarizer = summarizer
+        self.min_recent_messages = min_recent_messages
+
+        self.system: Message = {"role": "system", "content": system_prompt}
+        self.summary = ""
+        self.transcript: List[Message] = [self.system]
+        self.prompt_tokens_log: List[int] = []
+        self.evicted_messages = 0
+
+        self._recent: List[Message] = []
+        self._recent_tokens: List[int] = []
+        self._system_tokens = self._count(self.system)
+        self._summary_tokens = 0
+        self._total = self._system_tokens + REPLY_PRIMING_TOKENS
+        self._to_summarize: List[Message] = []
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def _count(self, message: Message) -> int:
+        return count_tokens(message.get("content") or "", self.model) + MESSAGE_OVERHEAD_TOKENS
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens of the current prompt, maintained incrementally."""
+        return self._total
+
+    @property
+    def messages(self) -> List[Message]:
+        """The prompt: system prompt, running summary and the recent turns."""
+        prompt = [self.system]
+        if self.summary:
+            prompt.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+        return prompt + self._recent
+
+    def for_request(self) -> List[Message]:
+        """``messages`` for a chat request; records the prompt size in ``prompt_tokens_log``."""
+        self.prompt_tokens_log.append(self._total)
+        return self.messages
+
+    def add(self, role: str, content: str) -> None:
+        self.append({"role": role, "content": content})
+
+    def append(self, message: Message) -> None:
+        tokens = self._count(message)
+        self.transcript.append(message)
+        self._recent.append(message)
+        self._recent_tokens.append(tokens)
+        self._total += tokens
+        self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        if self.max_prompt_tokens is None:
+            return
+        evicted = []
+        while self._total > self.max_prompt_tokens and len(self._recent) > self.min_recent_messages:
+            evicted.append(self._recent.pop(0))
+            self._total -= self._recent_tokens.pop(0)
+        # Never start the window with an assistant reply to a dropped question
+        while self._recent and self._recent[0]["role"] == "assistant" and len(self._recent) > self.min_recent_messages:
+            evicted.append(self._recent.pop(0))
+            self._total -= self._recent_tokens.pop(0)
+        if not evicted:
+            return
+
+        self.evicted_messages += len(evicted)
+        logger.debug(f"Evicted {len(evicted)} messages, prompt is {self._total} tokens")
+        if self.summarizer is not None:
+            self._to_summarize.extend(evicted)
+            self._schedule_summary()
+
+    def _schedule_summary(self) -> None:
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        try:
+            self._summary_task = asyncio.get_running_loop().create_task(self._summarize())
+        except RuntimeError:
+            logger.warning("No running event loop, evicted messages are not summarized")
+            self._to_summarize.clear()
+
+    async def _summarize(self) -> None:
+        while self._to_summarize:
+            batch, self._to_summarize = self._to_summarize, []
+            try:
+                summary = await self.summarizer(self.summary, batch)
+            except Exception as e:
+                logger.warning(f"Conversation summary failed, dropping {len(batch)} messages: {e}")
+                continue
+            self._total -= self._summary_tokens
+            self.summary = summary
+            self._summary_tokens = self._count({"content": f"Summary of the earlier conversation: {summary}"})
+            self._total += self._summary_tokens
+            self._enforce_budget()
+
+    async def wait_for_summary(self) -> None:
+        """Wait until pending summarization has finished."""
+        if self._summary_task is not None:
+            await asyncio.gather(self._summary_task, return_exceptions=True)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.transcript)
+
+    def __len__(self) -> int:
+        return len(self.transcript)
+
+    def __getitem__(self, index):
+        return self.transcript[index]
@@ -1,11 +1,14 @@
-from openai import AzureOpenAI, AsyncAzureOpenAI
 from ai_toolkits.load_env import load_environment
 
+# openai is imported on first use: it is the slowest import in the package.
+
 def create_sync_client(*args, **kwargs):
+    from openai import AzureOpenAI
     load_environment()  
     return AzureOpenAI(*args, **kwargs)
 
 def create_async_client(*args, **kwargs):
+    from openai import AsyncAzureOpenAI
     load_environment()  
     return AsyncAzureOpenAI(*args, **kwargs)
 
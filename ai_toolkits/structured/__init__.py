@@ -1,2 +1,16 @@
-from .extractor import (acreate_object_openai, acreate_object_openai_safe,
-                        acreate_objects_openai_safe, create_object_openai)
+from typing import TYPE_CHECKING
+
+from ai_toolkits.lazy_import import lazy_exports
+
+_EXPORTS = {
+    "acreate_object_openai": ".extractor",
+    "acreate_object_openai_safe": ".extractor",
+    "acreate_objects_openai_safe": ".extractor",
+    "create_object_openai": ".extractor",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .extractor import (acreate_object_openai, acreate_object_openai_safe,
+                            acreate_objects_openai_safe, create_object_openai)
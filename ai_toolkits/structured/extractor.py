@@ -1,6 +1,5 @@
 import asyncio
 
-import instructor
 from openai import Client, AsyncClient
 from pydantic import BaseModel
 from ai_toolkits.llms import create_async_client
@@ -15,6 +14,7 @@ def create_object_openai(
     if not client:
         raise ValueError("Please provide an OpenAI client.")
     
+    import instructor
     client = instructor.from_openai(client)
     return client.chat.completions.create(
         model="gpt-4o",
@@ -32,15 +32,17 @@ class ErrorResponse(BaseModel):
 async def acreate_object_openai(
     output_cls:BaseModel, 
     prompt:str, 
-    client:Client = None) -> BaseModel:
+    client:Client = None,
+    model:str = "gpt-4o") -> BaseModel:
     if not client:
         raise ValueError("Please provide an OpenAI client.")
     
+    import instructor
     client = instructor.from_openai(client)
 
     logger.info(f"Creating object of type {output_cls.__name__} with prompt: {prompt[:30]}...")  # Log the prompt (truncated for brevity)
     return await client.chat.completions.create(
-        model="gpt-4o",
+        model=model,
         response_model=output_cls,
         messages=[
             {"role": "user", "content": prompt}
@@ -51,9 +53,10 @@ async def acreate_object_openai(
 async def acreate_object_openai_safe(
     output_cls:BaseModel,
     prompt:str,
-    client:Client = None):
+    client:Client = None,
+    model:str = "gpt-4o"):
     try:
-        return await acreate_object_openai(output_cls, prompt, client)
+        return await acreate_object_openai(output_cls, prompt, client, model=model)
     except Exception as e:
         print("Object Creation failed:", str(e))
         return ErrorResponse(error=str(e))
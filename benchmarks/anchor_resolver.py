@@ -0,0 +1,111 @@
+"""
+Anchor resolution on multi-MB documents: ``str.replace`` per anchor versus
+one Aho-Corasick pass (``resolve_anchors``).
+
+Builds documents of ``--sizes`` million characters. Each section starts with
+a unique header and ends with the same "总结如下" line, so that line is a
+non-unique anchor. Every section header is an anchor, and every
+``--repeated-every``-th section also has its non-unique summary line as an
+anchor. ``--misquote`` of the header anchors are quoted with different
+spacing and punctuation, the way LLMs misquote. The old approach inserts a
+marker before every occurrence of every anchor and splits on it. The table
+shows the time, the number of chunks and the number of chunk starts that are
+not section starts or chosen summary lines (wrong splits).
+
+Usage:
+    python benchmarks/anchor_resolver.py --sizes 1,4 --section-chars 2000
+"""
+
+import argparse
+import random
+import time
+
+from common import print_table
+
+from ai_toolkits.files.resolver import resolve_anchors
+from ai_toolkits.files.windows import split_at_offsets
+
+WORDS = ["我们", "系统", "数据", "用户", "模型", "服务", "需要", "进行", "处理", "分析", "结果", "方案", "问题", "设计"]
+SUMMARY = "总结如下："
+
+
+def make_document(chars: int, section_chars: int, seed: int = 0):
+    """Document text, section header anchors (in order) and the expected chunk starts."""
+    rng = random.Random(seed)
+    parts, headers, starts, size, i = [], [], [], 0, 0
+    while size < chars:
+        i += 1
+        header = f"第{i}节，{rng.choice(WORDS)}与{rng.choice(WORDS)}的{rng.choice(WORDS)}"
+        body = []
+        while sum(map(len, body)) < section_chars:
+            body.append("".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))) + "。")
+        section = f"{header}\n{''.join(body)}\n{SUMMARY}{rng.choice(WORDS)}。\n"
+        headers.append(header)
+        starts.append(size)
+        parts.append(section)
+        size += len(section)
+    return "".join(parts), headers, starts
+
+
+def misquote(anchor: str) -> str:
+    return anchor.replace("，", " ").replace("与", " 与 ", 1)
+
+
+def replace_split(text: str, anchors):
+    for anchor in anchors:
+        text = text.replace(anchor, f"<new-chunk>{anchor}")
+    return text.split("<new-chunk>")
+
+
+def chunk_starts(chunks):
+    starts, offset = [], 0
+    for chunk in chunks:
+        starts.append(offset)
+        offset += len(chunk)
+    return starts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,4", help="comma separated document sizes in million characters")
+    parser.add_argument("--section-chars", type=int, default=2000)
+    parser.add_argument("--repeated-every", type=int, default=10, help="add the non-unique summary anchor every N sections")
+    parser.add_argument("--misquote", type=float, default=0.1, help="fraction of misquoted header anchors")
+    parser.add_argument("--skip-replace-above", type=float, default=4, help="skip str.replace above N million chars")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    rows = []
+    for size in (float(s) for s in args.sizes.split(",")):
+        text, headers, section_starts = make_document(int(size * 1_000_000), args.section_chars)
+        anchors, expected = [], set(section_starts)
+        for i, (header, start) in enumerate(zip(headers, section_starts)):
+            anchors.append(misquote(header) if rng.random() < args.misquote else header)
+            if i % args.repeated_every == 0:
+                anchors.append(SUMMARY)
+                expected.add(text.index(SUMMARY, start))
+
+        runs = [("resolve_anchors", lambda: split_at_offsets(text, [a.offset for a in resolve_anchors(text, anchors)]))]
+        if size <= args.skip_replace_above:
+            runs.insert(0, ("str.replace", lambda: replace_split(text, anchors)))
+        for name, split in runs:
+            started = time.perf_counter()
+            chunks = split()
+            elapsed = time.perf_counter() - started
+            starts = set(chunk_starts(chunks))
+            rows.append({
+                "doc_mchars": len(text) / 1e6,
+                "anchors": len(anchors),
+                "method": name,
+                "seconds": elapsed,
+                "chunks": len(chunks),
+                "expected": len(expected),
+                "wrong_splits": len(starts - expected - {0}),
+                "missed": len(expected - starts - {0}),
+            })
+
+    print_table(rows, ["doc_mchars", "anchors", "method", "seconds", "chunks", "expected", "wrong_splits", "missed"])
+
+
+if __name__ == "__main__":
+    main()
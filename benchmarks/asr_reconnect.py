@@ -0,0 +1,95 @@
+"""
+ASR reconnect recovery: what is lost on a dropped connection, and what replay costs.
+
+LocalASRServer drops every connection after ``--disconnect-after-s``. The
+same recording is run without drops (reference), then with drops for each
+``TencentASR(replay_buffer_ms=...)`` value. ``0`` only resends the message
+whose send failed (the previous behaviour, minus the reordering). For each run
+the benchmark reports the recognized speech relative to the reference (the
+local server's transcripts grow with the audio heard), reconnects, total
+outage time and the audio replayed with its send time.
+
+Usage:
+    python benchmarks/asr_reconnect.py --disconnect-after-s 2.5 --replay-ms 0,1000,5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import local_asr_server, print_table, synth_speech_wav
+
+from ai_toolkits.audio.base import BaseTextHandler
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.real_time import RealTimeTask
+from ai_toolkits.audio.tencent_asr import TencentASR
+
+
+class CollectingHandler(BaseTextHandler):
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    async def do_process(self, text: str) -> str:
+        self.texts.append(text)
+        return text
+
+
+def recognized_words(texts) -> int:
+    # "utterance N: w1 w2 ..." - one word per 250 ms of speech heard
+    return sum(len(text.split(":", 1)[-1].split()) for text in texts)
+
+
+async def run(wav_path: str, base_url: str, replay_ms: int, args) -> dict:
+    handler = CollectingHandler()
+    asr = TencentASR(vad_silence=args.vad_silence, base_url=base_url, replay_buffer_ms=replay_ms)
+    task = RealTimeTask(
+        audio_input_provider=FileAudioReader(wav_path, speed=args.speed),
+        text_handler=handler,
+        stt_service=asr,
+        trace_conversation=False,
+        verbose=False,
+    )
+    await task.run()
+    stats = asr.reconnect_stats
+    return {
+        "texts": len(handler.texts),
+        "words": recognized_words(handler.texts),
+        "reconnects": stats["reconnects"],
+        "outage_ms": stats["outage_ms"],
+        "replayed_audio_ms": stats["replayed_audio_ms"],
+        "replay_send_ms": stats["replay_send_ms"],
+        "replay_dropped_ms": stats["replay_dropped_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--disconnect-after-s", type=float, default=2.5)
+    parser.add_argument("--replay-ms", default="0,1000,5000", help="comma separated replay_buffer_ms values")
+    parser.add_argument("--utterances", type=int, default=5)
+    parser.add_argument("--vad-silence", type=int, default=500, help="server VAD silence (ms)")
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        synth_speech_wav(wav_path, utterances=args.utterances)
+        with local_asr_server() as base_url:
+            reference = asyncio.run(run(wav_path, base_url, 5000, args))
+        rows = [{"run": "no drops", **reference}]
+        with local_asr_server(disconnect_after_s=args.disconnect_after_s) as base_url:
+            for replay_ms in (int(r) for r in args.replay_ms.split(",")):
+                rows.append({"run": f"replay {replay_ms}ms", **asyncio.run(run(wav_path, base_url, replay_ms, args))})
+
+    for row in rows:
+        row["speech_recovered"] = row["words"] / reference["words"] if reference["words"] else 0.0
+    print_table(rows, ["run", "texts", "words", "speech_recovered", "reconnects", "outage_ms",
+                       "replayed_audio_ms", "replay_send_ms", "replay_dropped_ms"])
+
+
+if __name__ == "__main__":
+    main()
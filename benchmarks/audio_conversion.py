@@ -0,0 +1,64 @@
+"""
+Cost of converting audio to the ASR engine input format, per audio-hour.
+
+Each case streams one minute of audio through ``AudioConverter`` in 40 ms
+chunks (as the ASR send path does) and as one whole buffer, and reports the
+CPU seconds that would be spent per hour of audio.
+
+Usage:
+    python benchmarks/audio_conversion.py --seconds 60
+"""
+
+import argparse
+import time
+
+import numpy as np
+from common import print_table
+
+from ai_toolkits.audio.audio_format import AudioConverter, AudioFormat
+
+CASES = [
+    ("mulaw 8k -> pcm 8k", AudioFormat(8000, "mulaw"), 8000),
+    ("alaw 8k -> pcm 8k", AudioFormat(8000, "alaw"), 8000),
+    ("pcm 8k -> pcm 16k", AudioFormat(8000), 16000),
+    ("pcm 16k -> pcm 8k", AudioFormat(16000), 8000),
+    ("pcm 44.1k stereo -> 16k", AudioFormat(44100, channels=2), 16000),
+    ("pcm 48k -> pcm 16k", AudioFormat(48000), 16000),
+]
+
+
+def make_input(fmt: AudioFormat, seconds: float) -> bytes:
+    rng = np.random.default_rng(0)
+    n = int(fmt.sample_rate * seconds) * fmt.channels
+    if fmt.encoding != "pcm_s16le":
+        return rng.integers(0, 256, n, dtype=np.uint8).tobytes()
+    return rng.normal(0, 3000, n).astype("<i2").tobytes()
+
+
+def cpu_per_hour(fmt: AudioFormat, target_rate: int, data: bytes, chunk_bytes: int, seconds: float) -> float:
+    converter = AudioConverter(fmt, target_rate)
+    start = time.process_time()
+    for offset in range(0, len(data), chunk_bytes):
+        converter.convert(data[offset:offset + chunk_bytes])
+    return (time.process_time() - start) * 3600 / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60, help="audio duration per case")
+    args = parser.parse_args()
+
+    rows = []
+    for name, fmt, target_rate in CASES:
+        data = make_input(fmt, args.seconds)
+        chunk_bytes = int(fmt.bytes_per_second * 0.04)
+        rows.append({
+            "conversion": name,
+            "chunked_cpu_s_per_hour": cpu_per_hour(fmt, target_rate, data, chunk_bytes, args.seconds),
+            "whole_cpu_s_per_hour": cpu_per_hour(fmt, target_rate, data, len(data), args.seconds),
+        })
+    print_table(rows, ["conversion", "chunked_cpu_s_per_hour", "whole_cpu_s_per_hour"])
+
+
+if __name__ == "__main__":
+    main()
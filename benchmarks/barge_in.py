@@ -0,0 +1,71 @@
+"""
+Barge-in: how fast a streaming reply stops when the user speaks again.
+
+The synthetic recording has short pauses, so the next utterance starts while
+the (scripted, slow) LLM is still streaming the previous reply. With barge-in
+the reply is cancelled on the VAD start / first partial of the next
+utterance. The benchmark reports interruptions, the cancel latency (speech
+frame -> reply task finished) and the LLM tokens generated with and without
+barge-in.
+
+Usage:
+    python benchmarks/barge_in.py --pause-ms 1200 --tokens-per-s 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import ScriptedChatClient, local_asr_server, percentiles, print_table, synth_speech_wav
+
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.real_time import RealTimeTask
+from ai_toolkits.audio.render import HeadlessRenderer
+from ai_toolkits.audio.tencent_asr import TencentASR
+from ai_toolkits.audio.text_processor import INTERRUPTED_MARK, ConversationStreamHandler
+
+
+async def run(barge_in: bool, wav_path: str, base_url: str, args) -> dict:
+    client = ScriptedChatClient(ttft_ms=args.ttft_ms, tokens_per_s=args.tokens_per_s, reply_tokens=args.reply_tokens)
+    handler = ConversationStreamHandler(async_client=client, barge_in=barge_in, renderer=HeadlessRenderer())
+    task = RealTimeTask(
+        audio_input_provider=FileAudioReader(wav_path, speed=1.0),
+        text_handler=handler,
+        stt_service=TencentASR(vad_silence=args.vad_silence, base_url=base_url, stream_partials=True),
+        trace_conversation=False,
+        verbose=False,
+    )
+    await task.run()
+    interrupted = [m for m in handler.conversation_history if m["content"].endswith(INTERRUPTED_MARK)]
+    return {
+        "barge_in": barge_in,
+        "turns": len(handler.turn_stats),
+        "interrupted": len(interrupted),
+        **{f"cancel_{k}_ms": v for k, v in percentiles(handler.barge_in_latencies_ms).items()},
+        "llm_tokens": client.tokens_sent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=5)
+    parser.add_argument("--pause-ms", type=int, default=1200, help="silence between utterances")
+    parser.add_argument("--vad-silence", type=int, default=500)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-s", type=float, default=10)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        synth_speech_wav(wav_path, utterances=args.utterances, silence_ms=args.pause_ms)
+        with local_asr_server() as base_url:
+            rows = [asyncio.run(run(barge_in, wav_path, base_url, args)) for barge_in in (False, True)]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
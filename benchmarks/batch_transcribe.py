@@ -0,0 +1,66 @@
+"""
+Batch transcription throughput versus the number of concurrent ASR sessions.
+
+Transcribes ``--files`` synthetic recordings with ``BatchTranscriber`` for
+each ``--concurrency`` value against a local Tencent-compatible ASR server
+that refuses connections above ``--backend-limit`` (an account's concurrency
+quota). Files are replayed at ``--speed`` times real time, like a service that
+paces recognition. Throughput (audio seconds per wall second) should grow
+with concurrency up to the backend limit and flatten beyond it, where refused
+sessions wait for a slot (``refused``) instead of failing.
+
+Usage:
+    python benchmarks/batch_transcribe.py --files 16 --concurrency 1,2,4,8,16 --backend-limit 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import local_asr_server, print_table, synth_speech_wav
+
+from ai_toolkits.audio.batch import BatchTranscriber
+from ai_toolkits.audio.tencent_asr import TencentASRConfig
+
+
+async def run(paths, output: str, base_url: str, concurrency: int, args) -> dict:
+    transcriber = BatchTranscriber(
+        concurrency=concurrency,
+        asr_config=TencentASRConfig(base_url=base_url),
+        speed=args.speed,
+        max_retries=args.retries,
+        retry_backoff_s=0.5,
+    )
+    return await transcriber.run(paths, output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--utterances", type=int, default=2, help="utterances per file (2.4 s each)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="comma separated session counts")
+    parser.add_argument("--backend-limit", type=int, default=8, help="server concurrent session limit")
+    parser.add_argument("--speed", type=float, default=4.0, help="replay speed, 0 for as fast as possible")
+    parser.add_argument("--retries", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            paths.append(os.path.join(tmp, f"call_{i:03d}.wav"))
+            synth_speech_wav(paths[-1], utterances=args.utterances, seed=i)
+        output = os.path.join(tmp, "transcripts.jsonl")
+        with local_asr_server(max_sessions=args.backend_limit) as base_url:
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                summary = asyncio.run(run(paths, output, base_url, concurrency, args))
+                rows.append({"concurrency": concurrency, **summary})
+
+    print_table(rows, ["concurrency", "ok", "failed", "retries", "refused", "audio_s", "elapsed_s", "audio_s_per_s"])
+
+
+if __name__ == "__main__":
+    main()
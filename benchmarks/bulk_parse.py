@@ -0,0 +1,119 @@
+"""
+Serial versus process-pool document parsing, and parse/chunking overlap.
+
+Writes ``--docs`` synthetic documents to a temporary directory and reads
+them with a CPU-bound simulated converter (``--parse-ms-per-kchar`` of busy
+CPU per 1000 characters, standing in for MarkItDown's PDF/DOCX conversion):
+
+- ``serial``: ``reader.read`` file by file, like ``SemanticPipeline.split_file``
+- ``bulk xN``: ``BulkFileReader(max_workers=N).read_all``
+
+With ``--chunk``, each document is also split with ``SemanticPipeline``
+(the LLM is simulated as in ``semantic_windows.py``): serially, parse then
+split file by file, versus ``SemanticPipeline.split_files``, where parsing
+and LLM chunking overlap. Parse speedup is bounded by the cores available
+(printed first).
+
+Usage:
+    python benchmarks/bulk_parse.py --docs 32 --workers 1,2,4,8 --chunk
+"""
+
+import argparse
+import asyncio
+import functools
+import logging
+import os
+import tempfile
+import time
+
+from common import print_table
+from semantic_windows import SimulatedAnchorFinder, make_document
+
+from ai_toolkits.files.bulk import BulkFileReader
+from ai_toolkits.files.parse import BaseFileReader
+from ai_toolkits.files.pipeline import SemanticPipeline
+
+
+class BusyReader(BaseFileReader):
+    """Returns the file's text after burning CPU in proportion to its length."""
+
+    def __init__(self, ms_per_kchar: float):
+        self.ms_per_kchar = ms_per_kchar
+
+    def read(self, fp: str) -> str:
+        with open(fp, encoding="utf-8") as f:
+            text = f.read()
+        deadline = time.process_time() + len(text) / 1000 * self.ms_per_kchar / 1000
+        while time.process_time() < deadline:
+            pass
+        return text
+
+
+async def chunk_serial(paths, reader: BaseFileReader, pipeline: SemanticPipeline) -> int:
+    chunks = 0
+    for path in paths:
+        chunks += len(await pipeline.split_text(reader.read(path)))
+    return chunks
+
+
+async def chunk_streaming(directory: str, bulk: BulkFileReader, pipeline: SemanticPipeline) -> int:
+    chunks = 0
+    async for doc, doc_chunks in pipeline.split_files(directory, bulk_reader=bulk):
+        chunks += len(doc_chunks)
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=32)
+    parser.add_argument("--sections", type=int, default=10, help="sections (~1000 chars) per document")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma separated process pool sizes")
+    parser.add_argument("--parse-ms-per-kchar", type=float, default=10, help="simulated conversion CPU time")
+    parser.add_argument("--chunk", action="store_true", help="also compare serial versus streaming chunking")
+    parser.add_argument("--base-ms", type=float, default=300, help="simulated per-call LLM latency")
+    parser.add_argument("--ms-per-kchar", type=float, default=40, help="simulated LLM latency per 1000 prompt chars")
+    parser.add_argument("--context-chars", type=int, default=100_000, help="simulated context limit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    print(f"cores available: {os.cpu_count()}")
+    factory = functools.partial(BusyReader, args.parse_ms_per_kchar)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.docs):
+            path = os.path.join(tmp, f"doc{i:04d}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(make_document(args.sections, seed=i))
+            paths.append(path)
+
+        rows = []
+        started = time.perf_counter()
+        for path in paths:
+            factory().read(path)
+        rows.append({"mode": "serial", "docs": args.docs, "wall_s": time.perf_counter() - started})
+        for workers in (int(w) for w in args.workers.split(",")):
+            bulk = BulkFileReader(max_workers=workers, reader_factory=factory)
+            started = time.perf_counter()
+            docs = list(bulk.read_all(tmp))
+            failed = sum(not d.ok for d in docs)
+            rows.append({"mode": f"bulk x{workers}", "docs": len(docs) - failed, "wall_s": time.perf_counter() - started})
+        print_table(rows, ["mode", "docs", "wall_s"])
+
+        if args.chunk:
+            rows = []
+            workers = max(int(w) for w in args.workers.split(","))
+            for mode in ("serial parse+split", f"split_files x{workers}"):
+                pipeline = SemanticPipeline(anchor_finder=SimulatedAnchorFinder(args))
+                started = time.perf_counter()
+                if mode.startswith("serial"):
+                    chunks = asyncio.run(chunk_serial(paths, factory(), pipeline))
+                else:
+                    bulk = BulkFileReader(max_workers=workers, reader_factory=factory)
+                    chunks = asyncio.run(chunk_streaming(tmp, bulk, pipeline))
+                rows.append({"mode": mode, "chunks": chunks, "wall_s": time.perf_counter() - started})
+            print_table(rows, ["mode", "chunks", "wall_s"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Utterance coalescing in BaseTextHandler: LLM calls vs. latency.
+
+A recording of short phrases separated by pauses slightly longer than the
+server VAD silence produces many back-to-back sentences. For every
+``merge_window_ms`` the benchmark reports how many ``do_process`` (LLM) calls
+were made, how many sentences each call merged, and the per-utterance
+queue-wait, merge-wait and processing times recorded in ``utterance_stats``.
+
+Usage:
+    python benchmarks/coalescing.py --windows 0,500,1500 --max-wait-ms 3000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import local_asr_server, percentiles, print_table, synth_speech_wav
+
+from ai_toolkits.audio.base import BaseTextHandler
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.real_time import RealTimeTask
+from ai_toolkits.audio.tencent_asr import TencentASR
+
+
+class SlowTextHandler(BaseTextHandler):
+    """Pretend every utterance costs one LLM call of ``call_ms``."""
+
+    def __init__(self, call_ms: float, **kwargs):
+        super().__init__(**kwargs)
+        self.call_ms = call_ms
+
+    async def do_process(self, text: str) -> str:
+        await asyncio.sleep(self.call_ms / 1000)
+        return text
+
+
+async def run_window(window_ms, wav_path, base_url, args) -> dict:
+    handler = SlowTextHandler(args.call_ms, merge_window_ms=window_ms, max_wait_ms=args.max_wait_ms)
+    task = RealTimeTask(
+        audio_input_provider=FileAudioReader(wav_path, speed=1.0),
+        text_handler=handler,
+        stt_service=TencentASR(vad_silence=args.vad_silence, base_url=base_url, stream_partials=True),
+        trace_conversation=False,
+        verbose=False,
+    )
+    await task.run()
+    stats = handler.utterance_stats
+    row = {
+        "window_ms": window_ms,
+        "llm_calls": len(stats),
+        "sentences_per_call": sum(s["sentences"] for s in stats) / len(stats) if stats else 0.0,
+    }
+    for key in ("queue_wait_ms", "merge_wait_ms", "processing_ms"):
+        p = percentiles(s[key] for s in stats if s[key] is not None)
+        row[f"{key[:-3]}_p50"] = p["p50"]
+        row[f"{key[:-3]}_p95"] = p["p95"]
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", default="0,300,800,1500")
+    parser.add_argument("--max-wait-ms", type=float, default=3000)
+    parser.add_argument("--utterances", type=int, default=8)
+    parser.add_argument("--speech-ms", type=int, default=600)
+    parser.add_argument("--pause-ms", type=int, default=500)
+    parser.add_argument("--vad-silence", type=int, default=300)
+    parser.add_argument("--call-ms", type=float, default=300, help="simulated LLM call duration")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        synth_speech_wav(wav_path, utterances=args.utterances, speech_ms=args.speech_ms, silence_ms=args.pause_ms)
+        with local_asr_server() as base_url:
+            rows = [asyncio.run(run_window(float(w), wav_path, base_url, args)) for w in args.windows.split(",")]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Shared helpers for the benchmark scripts in this directory."""
+
+import asyncio
+import multiprocessing
+import socket
+import time
+import wave
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def synth_speech_wav(
+    path: str,
+    utterances: int = 5,
+    speech_ms: int = 1200,
+    silence_ms: int = 1200,
+    sampling_rate: int = 8000,
+    amplitude: int = 3000,
+    seed: int = 0) -> List[float]:
+    """
+    Write a WAV file of noise bursts ("speech") separated by silence.
+
+    Returns:
+        List[float]: End-of-speech offset in seconds for every utterance.
+    """
+    rng = np.random.default_rng(seed)
+    silence = np.zeros(int(sampling_rate * silence_ms / 1000), dtype=np.float32)
+    parts, end_offsets, samples = [silence], [], silence.size
+    for _ in range(utterances):
+        burst = rng.normal(0, amplitude, int(sampling_rate * speech_ms / 1000)).astype(np.float32)
+        parts.extend([burst, silence])
+        samples += burst.size
+        end_offsets.append(samples / sampling_rate)
+        samples += silence.size
+
+    pcm = np.clip(np.concatenate(parts), -32768, 32767).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sampling_rate)
+        wav.writeframes(pcm.tobytes())
+    return end_offsets
+
+
+def percentiles(values: Iterable[float], qs=(50, 95, 99)) -> Dict[str, float]:
+    values = list(values)
+    if not values:
+        return {f"p{q}": float("nan") for q in qs}
+    return {f"p{q}": float(np.percentile(values, q)) for q in qs}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(port: int, server_kwargs: dict) -> None:
+    import asyncio
+    from ai_toolkits.audio.asr_server import LocalASRServer
+
+    asyncio.run(LocalASRServer(port=port, **server_kwargs).serve_forever())
+
+
+@contextmanager
+def local_asr_server(**server_kwargs):
+    """
+    Run ``LocalASRServer`` in a separate process and yield its base URL.
+
+    Running the server out of process keeps its CPU usage out of the
+    client-side measurements.
+    """
+    port = free_port()
+    process = multiprocessing.Process(target=_serve, args=(port, server_kwargs), daemon=True)
+    process.start()
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Local ASR server did not start")
+                time.sleep(0.05)
+        yield f"ws://127.0.0.1:{port}/asr/v2/0?"
+    finally:
+        process.terminate()
+        process.join()
+
+
+class ScriptedChatClient:
+    """
+    Stand-in for the async OpenAI client with a fixed time to first token.
+
+    ``client.chat.completions.create(..., stream=True)`` streams ``reply_tokens``
+    short tokens at ``tokens_per_s`` (``0``: as fast as possible) after ``ttft_ms``; without ``stream`` it
+    returns the whole reply after the full generation time. With
+    ``stream_options={"include_usage": True}`` the stream ends with a usage
+    chunk. ``requests`` and ``tokens_sent`` count what the "API" was asked
+    for and produced.
+    """
+
+    def __init__(self, ttft_ms: float = 400, tokens_per_s: float = 50, reply_tokens: int = 20):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_s = tokens_per_s
+        self.reply_tokens = reply_tokens
+        self.requests = 0
+        self.tokens_sent = 0
+        self.prompts: List[list] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _tokens(self, messages: list) -> List[str]:
+        words = ["sure", "here", "is", "a", "short", "reply", "."]
+        return [words[i % len(words)] + " " for i in range(self.reply_tokens)]
+
+    async def _create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        self.requests += 1
+        self.prompts.append(list(messages))
+        tokens = self._tokens(messages)
+        if not stream:
+            await asyncio.sleep(self.ttft_ms / 1000 + (len(tokens) / self.tokens_per_s if self.tokens_per_s else 0))
+            self.tokens_sent += len(tokens)
+            message = SimpleNamespace(content="".join(tokens))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        include_usage = (kwargs.get("stream_options") or {}).get("include_usage", False)
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        return self._stream(tokens, prompt_tokens if include_usage else None)
+
+    async def _stream(self, tokens: List[str], prompt_tokens: Optional[int] = None):
+        await asyncio.sleep(self.ttft_ms / 1000)
+        for token in tokens:
+            self.tokens_sent += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))], usage=None)
+            await asyncio.sleep(1 / self.tokens_per_s if self.tokens_per_s else 0)
+        if prompt_tokens is not None:
+            # Like OpenAI with stream_options={"include_usage": True}: a last chunk without choices
+            usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(tokens))
+            yield SimpleNamespace(choices=[], usage=usage)
+
+
+def print_table(rows: List[Dict], columns: List[str]) -> None:
+    widths = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(c)).rjust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
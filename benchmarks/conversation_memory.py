@@ -0,0 +1,66 @@
+"""
+Prompt tokens per turn with and without a ConversationMemory budget.
+
+Runs ``--turns`` scripted turns through ``ConversationStreamHandler`` and
+reports the prompt size of the first, middle and last request, the total
+prompt tokens sent over the session and how many messages were evicted:
+
+    - ``unbounded``: the whole history is resent every turn (previous behaviour)
+    - ``budget``: oldest turns are evicted beyond ``--budget`` tokens
+    - ``summary``: evicted turns are folded into a running summary
+
+Usage:
+    python benchmarks/conversation_memory.py --turns 60 --budget 1000 --reply-tokens 40
+"""
+
+import argparse
+import asyncio
+import logging
+
+from common import ScriptedChatClient, print_table
+
+from ai_toolkits.audio.render import HeadlessRenderer
+from ai_toolkits.audio.text_processor import ConversationStreamHandler
+
+
+async def run(mode: str, args) -> dict:
+    client = ScriptedChatClient(ttft_ms=0, tokens_per_s=0, reply_tokens=args.reply_tokens)
+    handler = ConversationStreamHandler(
+        async_client=client,
+        renderer=HeadlessRenderer(),
+        max_history_tokens=None if mode == "unbounded" else args.budget,
+        summarize_history=mode == "summary",
+    )
+    for i in range(args.turns):
+        await handler.do_process(f"Question number {i}: could you tell me a little more about topic {i}?")
+    memory = handler.conversation_history
+    await memory.wait_for_summary()
+
+    log = memory.prompt_tokens_log
+    return {
+        "mode": mode,
+        "turn_1": log[0],
+        f"turn_{len(log) // 2}": log[len(log) // 2 - 1],
+        f"turn_{len(log)}": log[-1],
+        "max": max(log),
+        "total_prompt_tokens": sum(log),
+        "evicted": memory.evicted_messages,
+        "transcript": len(memory),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=1000)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--modes", default="unbounded,budget,summary")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rows = [asyncio.run(run(mode, args)) for mode in args.modes.split(",")]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cost of audio frame objects on the hot audio path.
+
+Compares creating pydantic ``AudioInputFrame`` objects with the
+``__slots__``-based ``FastAudioFrame`` for 40 ms chunks of 8 kHz audio:
+frames per second, per-frame memory overhead (excluding the audio payload)
+and the cost of converting between the two at component boundaries.
+
+Usage:
+    python benchmarks/frames.py --frames 200000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from common import print_table
+
+from ai_toolkits.audio.types import AudioInputFrame, FastAudioFrame
+
+CHUNK = b"\x00" * 640  # 40 ms of 8 kHz 16-bit PCM
+
+
+def frames_per_second(factory, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        factory(i)
+    return n / (time.perf_counter() - start)
+
+
+def bytes_per_frame(factory, n: int) -> float:
+    tracemalloc.start()
+    frames = [factory(i) for i in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del frames
+    # The payload is shared, so this is pure per-frame overhead
+    return current / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=100_000)
+    args = parser.parse_args()
+
+    fast = FastAudioFrame(CHUNK, sampling_rate=8000)
+    pydantic = fast.to_frame()
+    cases = [
+        ("AudioInputFrame", lambda i: AudioInputFrame(data=CHUNK, sequence_id=i, sampling_rate=8000)),
+        ("FastAudioFrame", lambda i: FastAudioFrame(CHUNK, sequence_id=i, sampling_rate=8000)),
+        ("FastAudioFrame.to_frame", lambda i: fast.to_frame()),
+        ("FastAudioFrame.from_frame", lambda i: FastAudioFrame.from_frame(pydantic)),
+    ]
+
+    rows = []
+    for name, factory in cases:
+        fps = frames_per_second(factory, args.frames)
+        rows.append({
+            "frame": name,
+            "frames_per_s": fps,
+            "us_per_frame": 1e6 / fps,
+            "bytes_per_frame": bytes_per_frame(factory, min(args.frames, 50_000)),
+        })
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
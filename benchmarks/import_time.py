@@ -0,0 +1,81 @@
+"""
+Import-time budget for the package and the ``gotalk`` CLI.
+
+Imports each entry point in a fresh interpreter with ``python -X importtime``
+(best of ``--repeat`` runs). It reports the cumulative import time against a
+budget and lists the heavy dependencies that were imported but should not
+have been. The slowest imports are listed with ``--top``. The script exits
+with status 1 if any entry point is over budget or imports a forbidden module,
+so CI can run it to catch startup regressions.
+
+Usage:
+    python benchmarks/import_time.py --repeat 5 --top 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from common import print_table
+
+HEAVY = ("openai", "llama_index", "pyaudio", "markitdown", "sentence_transformers", "instructor", "rich", "faker")
+
+# module -> (budget ms, heavy packages it must not import)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "ai_toolkits.audio.cli": (150, HEAVY),
+    "ai_toolkits.llms": (50, HEAVY),
+    "ai_toolkits.embedding": (50, HEAVY),
+    "ai_toolkits.files": (50, HEAVY),
+    "ai_toolkits.structured": (50, HEAVY),
+    "ai_toolkits.faker": (50, HEAVY),
+    "ai_toolkits.audio.tencent_asr": (600, HEAVY),
+    "ai_toolkits.audio.real_time": (900, ("openai", "llama_index", "pyaudio", "markitdown")),
+}
+
+
+def import_profile(module: str) -> List[Tuple[str, float, float]]:
+    """``(module, self ms, cumulative ms)`` for every module imported by ``import module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    profile = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports per entry point")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI machines)")
+    args = parser.parse_args()
+
+    rows, failed = [], False
+    for module, (budget_ms, forbidden) in BUDGETS.items():
+        profiles = [import_profile(module) for _ in range(args.repeat)]
+        best = min(profiles, key=lambda p: p[-1][2])
+        total_ms = best[-1][2]
+        leaked = sorted({name.split(".")[0] for name, _, _ in best} & set(forbidden))
+        ok = total_ms <= budget_ms * args.scale and not leaked
+        failed |= not ok
+        rows.append({"module": module, "import_ms": total_ms, "budget_ms": budget_ms * args.scale,
+                     "heavy_imported": ",".join(leaked) or "-", "ok": "yes" if ok else "NO"})
+        if args.top:
+            print(f"{module}: slowest imports (cumulative ms)")
+            for name, _, cumulative in sorted(best, key=lambda p: -p[2])[1:args.top + 1]:
+                print(f"  {cumulative:9.1f}  {name.strip()}")
+
+    print_table(rows, ["module", "import_ms", "budget_ms", "heavy_imported", "ok"])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
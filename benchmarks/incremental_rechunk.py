@@ -0,0 +1,92 @@
+"""
+Full versus incremental re-chunking of an edited document.
+
+Splits a synthetic document of ``--sections`` sections with
+``SemanticPipeline.split_document``, edits ``--edits`` sentences in
+random sections, and chunks the new version twice: from scratch, and with
+``resplit_document`` (only the edited chunks plus ``--margin`` neighbours go
+back to the LLM). The LLM is simulated as in ``semantic_windows.py``. The
+table shows LLM calls, characters re-chunked, wall time, and the chunk ids
+added/removed/unchanged relative to the first version.
+
+Usage:
+    python benchmarks/incremental_rechunk.py --sections 40,200 --edits 1,5 --margin 1
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+import time
+
+from common import print_table
+from semantic_windows import SimulatedAnchorFinder, make_document
+
+from ai_toolkits.files.incremental import diff_chunks
+from ai_toolkits.files.pipeline import SemanticPipeline
+
+
+def edit_document(text: str, edits: int, seed: int = 0) -> str:
+    """Replace one sentence in each of ``edits`` random sections."""
+    rng = random.Random(seed)
+    sentences = [m.span() for m in re.finditer(r"(?<=。)[^。\n]+。", text)]
+    for start, end in sorted(rng.sample(sentences, min(edits, len(sentences))), reverse=True):
+        text = text[:start] + "这是修改过的句子。" + text[end:]
+    return text
+
+
+async def compare(sections: int, edits: int, args) -> list:
+    document = make_document(sections)
+    finder = SimulatedAnchorFinder(args)
+    pipeline = SemanticPipeline(window_chars=args.window_chars, max_concurrency=args.concurrency,
+                                anchor_finder=finder)
+    previous = await pipeline.split_document(document)
+    edited = edit_document(document, edits)
+
+    rows = []
+    for mode in ("full", "incremental"):
+        finder.calls, finder.client.requests = 0, 0
+        started = time.perf_counter()
+        if mode == "full":
+            diff = diff_chunks(previous, await pipeline.split_document(edited), rechunked_chars=len(edited))
+        else:
+            diff = await pipeline.resplit_document(previous, edited, margin_chunks=args.margin)
+        rows.append({
+            "doc_chars": len(edited),
+            "edits": edits,
+            "mode": mode,
+            "llm_calls": finder.calls + finder.client.requests,
+            "rechunked_chars": diff.rechunked_chars,
+            "wall_s": time.perf_counter() - started,
+            "added": len(diff.added),
+            "removed": len(diff.removed),
+            "unchanged": len(diff.unchanged),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", default="40,200", help="comma separated document sizes (~1000 chars each)")
+    parser.add_argument("--edits", default="1,5", help="comma separated numbers of edited sentences")
+    parser.add_argument("--margin", type=int, default=1, help="neighbouring chunks re-chunked with a dirty one")
+    parser.add_argument("--window-chars", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-ms", type=float, default=300, help="simulated per-call latency")
+    parser.add_argument("--ms-per-kchar", type=float, default=40, help="simulated latency per 1000 prompt chars")
+    parser.add_argument("--context-chars", type=int, default=100_000, help="simulated context limit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    rows = []
+    for sections in (int(s) for s in args.sections.split(",")):
+        for edits in (int(e) for e in args.edits.split(",")):
+            rows.extend(asyncio.run(compare(sections, edits, args)))
+
+    print_table(rows, ["doc_chars", "edits", "mode", "llm_calls", "rechunked_chars", "wall_s",
+                       "added", "removed", "unchanged"])
+
+
+if __name__ == "__main__":
+    main()
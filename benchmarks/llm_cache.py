@@ -0,0 +1,85 @@
+"""
+Cold versus warm re-ingestion of a corpus with the planner/anchor result cache.
+
+Splits ``--docs`` synthetic documents (``--sections`` sections each, cycled)
+with ``SemanticPipeline`` and an ``LLMResultCache`` in a temporary
+directory, three times: cold (empty cache), warm (unchanged corpus), and
+after editing one section of ``--edited`` documents. The LLM is simulated as
+in ``semantic_windows.py``. The table shows LLM calls, wall time, cache
+hits/misses and the cache size; a warm run should make no LLM calls.
+
+Usage:
+    python benchmarks/llm_cache.py --docs 50 --sections 4,12,40 --edited 5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from common import print_table
+from semantic_windows import SimulatedAnchorFinder, make_document
+
+from ai_toolkits.files.cache import LLMResultCache
+from ai_toolkits.files.pipeline import SemanticPipeline
+
+
+async def ingest(corpus, cache: LLMResultCache, args) -> dict:
+    finder = SimulatedAnchorFinder(args, cache=cache)
+    pipeline = SemanticPipeline(window_chars=args.window_chars, max_concurrency=args.concurrency,
+                                anchor_finder=finder)
+    before = dict(cache.stats)
+    started = time.perf_counter()
+    chunks = 0
+    for document in corpus:
+        chunks += len(await pipeline.split_text(document))
+    return {
+        "llm_calls": finder.calls + finder.client.requests,
+        "wall_s": time.perf_counter() - started,
+        "chunks": chunks,
+        "hits": cache.stats["hits"] - before["hits"],
+        "misses": cache.stats["misses"] - before["misses"],
+        "evictions": cache.stats["evictions"] - before["evictions"],
+        "cache_kb": cache.size_bytes / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--sections", default="4,12,40", help="comma separated document sizes, cycled over the corpus")
+    parser.add_argument("--edited", type=int, default=5, help="documents changed before the last run")
+    parser.add_argument("--window-chars", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-mb", type=float, default=256, help="cache size bound")
+    parser.add_argument("--base-ms", type=float, default=300, help="simulated per-call latency")
+    parser.add_argument("--ms-per-kchar", type=float, default=40, help="simulated latency per 1000 prompt chars")
+    parser.add_argument("--context-chars", type=int, default=100_000, help="simulated context limit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    sizes = [int(s) for s in args.sections.split(",")]
+    corpus = [make_document(sizes[i % len(sizes)], seed=i) for i in range(args.docs)]
+    edited = list(corpus)
+    for i in range(min(args.edited, len(edited))):
+        # Rewrite one sentence in the middle of the document
+        middle = len(edited[i]) // 2
+        edited[i] = edited[i][:middle] + "这是修改过的句子。" + edited[i][middle:]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_results.sqlite")
+        for run, docs in (("cold", corpus), ("warm", corpus), (f"{args.edited} edited", edited)):
+            # A fresh cache object per run: results come from disk, like a new process
+            cache = LLMResultCache(path, max_bytes=int(args.max_mb * 1024 * 1024))
+            row = asyncio.run(ingest(docs, cache, args))
+            rows.append({"run": run, "docs": len(docs), **row})
+            cache.close()
+
+    print_table(rows, ["run", "docs", "llm_calls", "wall_s", "chunks", "hits", "misses", "evictions", "cache_kb"])
+
+
+if __name__ == "__main__":
+    main()
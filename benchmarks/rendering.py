@@ -0,0 +1,83 @@
+"""
+Token consumption rate of ConversationStreamHandler with and without rendering.
+
+A scripted LLM streams tokens as fast as possible. Modes:
+
+- ``legacy``: the previous per-token loop (new ``Text`` + ``Panel`` and
+  ``live.update`` for every token plus ``asyncio.sleep(0.005)``)
+- ``rich``: ``RichRenderer`` sampling the token buffer at ``--fps``
+- ``headless``: ``HeadlessRenderer``, no rendering at all
+
+Rich output goes to an in-memory terminal so the numbers do not depend on
+the real terminal. Reports tokens per second and CPU ms per 1000 tokens.
+
+Usage:
+    python benchmarks/rendering.py --tokens 5000 --fps 10
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from common import ScriptedChatClient, print_table
+from rich.console import Console
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+from ai_toolkits.audio.render import HeadlessRenderer, RichRenderer
+from ai_toolkits.audio.text_processor import ConversationStreamHandler
+
+
+def offscreen_console() -> Console:
+    return Console(file=io.StringIO(), force_terminal=True, width=100)
+
+
+async def legacy_reply(client) -> None:
+    console = offscreen_console()
+    stream = await client.chat.completions.create(model="gpt-4.1", messages=[], stream=True)
+    buffer = ""
+    title = "🤖 Assistant (streaming)"
+    with Live(Panel("", title=title), console=console, refresh_per_second=10, transient=True) as live:
+        async for chunk in stream:
+            content = chunk.choices[0].delta.content
+            await asyncio.sleep(0.005)
+            buffer += content
+            live.update(Panel(Text(buffer, overflow="fold", no_wrap=False), title=title,
+                              title_align="left", border_style="blue", padding=(0, 1)))
+
+
+async def run(mode: str, args) -> dict:
+    client = ScriptedChatClient(ttft_ms=0, tokens_per_s=0, reply_tokens=args.tokens)
+    if mode == "legacy":
+        reply = legacy_reply(client)
+    else:
+        renderer = HeadlessRenderer() if mode == "headless" else RichRenderer(offscreen_console(), fps=args.fps)
+        handler = ConversationStreamHandler(async_client=client, renderer=renderer)
+        reply = handler.do_process("hello")
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await reply
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    return {
+        "mode": mode,
+        "tokens": args.tokens,
+        "tokens_per_s": args.tokens / wall,
+        "cpu_ms_per_1k_tokens": cpu * 1000 / args.tokens * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--modes", default="legacy,rich,headless")
+    args = parser.parse_args()
+
+    rows = [asyncio.run(run(mode, args)) for mode in args.modes.split(",")]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
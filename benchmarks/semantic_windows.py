@@ -0,0 +1,120 @@
+"""
+Windowed (map-reduce) versus single-prompt semantic chunking of long documents.
+
+Splits synthetic documents of ``--sections`` sections with
+``SemanticPipeline``, either as one prompt (``window_chars=None``) or
+window by window with ``--concurrency`` concurrent anchor calls. The LLM is
+simulated: a call takes ``--base-ms`` plus ``--ms-per-kchar`` per thousand
+prompt characters, fails above ``--context-chars`` like a context limit, and
+returns the section headers of its text as anchors. The table shows wall
+time, LLM calls, and how many section starts were recovered as chunk
+boundaries.
+
+Usage:
+    python benchmarks/semantic_windows.py --sections 20,80,320 --concurrency 1,4,16
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+import time
+
+from common import ScriptedChatClient, print_table
+
+from ai_toolkits.files.anchor import AnchorFinder, SemanticSplitAnchors
+from ai_toolkits.files.pipeline import SemanticPipeline
+from ai_toolkits.files.planner import SplitPlanner
+from ai_toolkits.structured.extractor import ErrorResponse
+
+WORDS = ["我们", "系统", "数据", "用户", "模型", "服务", "需要", "进行", "处理", "分析", "结果", "方案", "问题", "设计"]
+
+
+def make_document(sections: int, section_chars: int = 1000, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for i in range(1, sections + 1):
+        body = []
+        while sum(map(len, body)) < section_chars:
+            body.append("".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))) + "。")
+        parts.append(f"第{i}节 {rng.choice(WORDS)}{rng.choice(WORDS)}{i}\n" + "".join(body) + "\n")
+    return "".join(parts)
+
+
+class PrefillChatClient(ScriptedChatClient):
+    """``ScriptedChatClient`` whose latency grows with the prompt length."""
+
+    def __init__(self, ms_per_kchar: float, **kwargs):
+        super().__init__(**kwargs)
+        self.ms_per_kchar = ms_per_kchar
+
+    async def _create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        chars = sum(len(m["content"]) for m in messages)
+        await asyncio.sleep(chars / 1000 * self.ms_per_kchar / 1000)
+        return await super()._create(model, messages, stream=stream, **kwargs)
+
+
+class SimulatedAnchorFinder(AnchorFinder):
+    """Anchor calls answered with the section headers in the text, at LLM-like latency."""
+
+    def __init__(self, args, cache=None):
+        client = PrefillChatClient(args.ms_per_kchar, ttft_ms=args.base_ms, tokens_per_s=0)
+        super().__init__(client=client, planner=SplitPlanner(client=client, cache=cache), cache=cache)
+        self.args = args
+        self.calls = 0
+
+    async def request_anchors(self, text: str, plan: str):
+        self.calls += 1
+        if len(text) > self.args.context_chars:
+            return ErrorResponse(error=f"context length exceeded ({len(text)} chars)")
+        await asyncio.sleep((self.args.base_ms + len(text) / 1000 * self.args.ms_per_kchar) / 1000)
+        return SemanticSplitAnchors(anchor_sentences=re.findall(r"^第\d+节 \S+", text, flags=re.M))
+
+
+async def run(document: str, sections: int, window_chars, concurrency: int, args) -> dict:
+    finder = SimulatedAnchorFinder(args)
+    pipeline = SemanticPipeline(window_chars=window_chars, max_concurrency=concurrency, anchor_finder=finder)
+    started = time.perf_counter()
+    try:
+        chunks = await pipeline.split_text(document)
+        error = "-"
+    except AttributeError:
+        # run() returned an ErrorResponse: the single prompt failed as a whole
+        chunks, error = [], "failed"
+    elapsed = time.perf_counter() - started
+    starts = sum(1 for c in chunks if re.match(r"第\d+节", c))
+    return {
+        "doc_chars": len(document),
+        "mode": "single" if window_chars is None else f"windowed x{concurrency}",
+        "llm_calls": finder.calls + finder.client.requests,
+        "wall_s": elapsed,
+        "chunks": len(chunks),
+        "sections_found": f"{starts}/{sections}",
+        "error": error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", default="20,80,320", help="comma separated document sizes (~1000 chars each)")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated windowed concurrency limits")
+    parser.add_argument("--window-chars", type=int, default=8000)
+    parser.add_argument("--base-ms", type=float, default=300, help="simulated per-call latency")
+    parser.add_argument("--ms-per-kchar", type=float, default=40, help="simulated latency per 1000 prompt chars")
+    parser.add_argument("--context-chars", type=int, default=100_000, help="simulated context limit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    rows = []
+    for sections in (int(s) for s in args.sections.split(",")):
+        document = make_document(sections)
+        rows.append(asyncio.run(run(document, sections, None, 1, args)))
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            rows.append(asyncio.run(run(document, sections, args.window_chars, concurrency, args)))
+
+    print_table(rows, ["doc_chars", "mode", "llm_calls", "wall_s", "chunks", "sections_found", "error"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare ASR send-side batch sizes (``TencentASR(send_batch_ms=...)``).
+
+Runs the same concurrent sessions against LocalASRServer once per batch size
+and reports client CPU, WebSocket messages sent and end-of-speech latency.
+
+Usage:
+    python benchmarks/send_batching.py --sessions 50 --batches 0,80,120,200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import local_asr_server, print_table, synth_speech_wav
+from voice_pipeline import run_sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--batches", default="0,80,120,200", help="comma separated send_batch_ms values")
+    parser.add_argument("--max-delay-ms", type=int, default=100, help="send_max_delay_ms of every run")
+    parser.add_argument("--utterances", type=int, default=4)
+    parser.add_argument("--vad-silence", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        end_offsets = synth_speech_wav(wav_path, utterances=args.utterances)
+
+        rows = []
+        with local_asr_server() as base_url:
+            for batch_ms in (int(b) for b in args.batches.split(",")):
+                stt_kwargs = {"send_batch_ms": batch_ms, "send_max_delay_ms": args.max_delay_ms}
+                row = asyncio.run(run_sessions(
+                    args.sessions, wav_path, end_offsets, base_url, 1.0, args.vad_silence,
+                    stt_kwargs=stt_kwargs))
+                rows.append({"batch_ms": batch_ms, **row})
+
+    print_table(rows, ["batch_ms", "sessions", "ws_messages", "cpu_s_per_session",
+                       "lat_p50_ms", "lat_p95_ms", "lat_p99_ms", "texts"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Sessions-per-core benchmark for SessionManager against LocalASRServer.
+
+N sessions replay a synthetic recording at real-time speed through one
+SessionManager. The client process CPU time is divided by the wall time to
+get the cores used; ``sessions_per_core`` is how many real-time sessions
+one core can sustain at that concurrency.
+
+Usage:
+    python benchmarks/sessions_per_core.py --sessions 10,50,200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from common import local_asr_server, print_table, synth_speech_wav
+
+from ai_toolkits.audio.base import BaseTextHandler
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.sessions import SessionManager
+from ai_toolkits.audio.tencent_asr import TencentASRConfig
+
+
+class CountingTextHandler(BaseTextHandler):
+    """Cheapest possible handler: only counts transcripts."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    async def do_process(self, text: str) -> str:
+        self.count += 1
+        return text
+
+
+async def run_level(n: int, wav_path: str, base_url: str, speed: float) -> dict:
+    manager = SessionManager(max_sessions=n, asr_config=TencentASRConfig(base_url=base_url))
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    sessions = [
+        await manager.start_session(FileAudioReader(wav_path, speed=speed), CountingTextHandler)
+        for _ in range(n)
+    ]
+    await manager.wait_all()
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    audio_seconds = sum(s.task.audio_input_provider.audio_seconds_sent for s in sessions)
+    cores_used = cpu / wall
+    return {
+        "sessions": n,
+        "completed": manager.stats["completed"],
+        "transcripts": sum(s.task.text_handler.count for s in sessions),
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cores_used": cores_used,
+        "cpu_ms_per_audio_s": cpu * 1000 / audio_seconds,
+        "sessions_per_core": n / cores_used if cores_used else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="10,50,100", help="comma separated concurrency levels")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed of every session")
+    parser.add_argument("--utterances", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        synth_speech_wav(wav_path, utterances=args.utterances)
+        with local_asr_server() as base_url:
+            rows = [asyncio.run(run_level(int(n), wav_path, base_url, args.speed))
+                    for n in args.sessions.split(",")]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
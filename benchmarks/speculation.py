@@ -0,0 +1,83 @@
+"""
+Speculative LLM generation: hit rate and latency saved per speculation window.
+
+Sessions replay a synthetic recording through ``TencentASR(stream_partials=True)``
+into ``ConversationStreamHandler(speculative=True)`` backed by a scripted LLM
+with a fixed time to first token. For every ``speculation_window_ms`` the
+benchmark reports the hit rate, the mean latency saved on hits, the number of
+wasted (cancelled after launch) LLM requests and the final-transcript ->
+first-token latency.
+
+Usage:
+    python benchmarks/speculation.py --windows 0,200,400,800 --vad-silence 800
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import ScriptedChatClient, local_asr_server, percentiles, print_table, synth_speech_wav
+
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.real_time import RealTimeTask
+from ai_toolkits.audio.render import HeadlessRenderer
+from ai_toolkits.audio.tencent_asr import TencentASR
+from ai_toolkits.audio.text_processor import ConversationStreamHandler
+
+
+async def run_window(window_ms, wav_path, base_url, vad_silence, ttft_ms, sessions) -> dict:
+    client = ScriptedChatClient(ttft_ms=ttft_ms)
+    handlers, tasks = [], []
+    for _ in range(sessions):
+        handler = ConversationStreamHandler(
+            async_client=client, speculative=window_ms is not None,
+            speculation_window_ms=window_ms or 0, renderer=HeadlessRenderer())
+        handlers.append(handler)
+        tasks.append(RealTimeTask(
+            audio_input_provider=FileAudioReader(wav_path, speed=1.0),
+            text_handler=handler,
+            stt_service=TencentASR(vad_silence=vad_silence, base_url=base_url, stream_partials=True),
+            trace_conversation=False,
+            verbose=False,
+        ))
+    await asyncio.gather(*(t.run() for t in tasks))
+
+    turns = [turn for h in handlers for turn in h.turn_stats]
+    hits = [t for t in turns if t["speculation"] == "hit"]
+    return {
+        "window_ms": "off" if window_ms is None else window_ms,
+        "turns": len(turns),
+        "hit_rate": len(hits) / len(turns) if turns else 0.0,
+        "saved_ms": sum(t["latency_saved_ms"] for t in hits) / len(hits) if hits else 0.0,
+        "wasted_llm_calls": sum(t["wasted_speculations"] for t in turns),
+        "llm_calls": client.requests,
+        **{f"ttft_{k}_ms": v for k, v in percentiles(t["ttft_ms"] for t in turns if t["ttft_ms"] is not None).items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", default="off,0,200,400,800", help="comma separated windows (ms), 'off' disables")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--utterances", type=int, default=4)
+    parser.add_argument("--vad-silence", type=int, default=800, help="server VAD silence (ms)")
+    parser.add_argument("--ttft-ms", type=float, default=400, help="scripted LLM time to first token")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        synth_speech_wav(wav_path, utterances=args.utterances, silence_ms=max(1200, args.vad_silence + 800))
+        with local_asr_server() as base_url:
+            rows = []
+            for window in args.windows.split(","):
+                window_ms = None if window == "off" else int(window)
+                rows.append(asyncio.run(run_window(
+                    window_ms, wav_path, base_url, args.vad_silence, args.ttft_ms, args.sessions)))
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-stage latency breakdown of the voice pipeline.
+
+Runs synthetic speech through ``FileAudioReader`` (real time, as frames), a
+local Tencent-compatible ASR server, and a streaming chat handler with a
+scripted LLM, then prints the ``LatencyRecorder`` summary that
+``RealTimeTask`` reports at session end. ``--speak`` uses
+``SpeakOutStreamHandler`` with a simulated TTS backend so the
+``tts_first_audio`` stage is included.
+
+Usage:
+    python benchmarks/stage_latency.py --utterances 6 --ttft-ms 400 --speak --report latency.prom
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from common import ScriptedChatClient, local_asr_server, synth_speech_wav
+
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.real_time import RealTimeTask
+from ai_toolkits.audio.render import HeadlessRenderer
+from ai_toolkits.audio.tencent_asr import TencentASR
+from ai_toolkits.audio.text_processor import ConversationStreamHandler, SpeakOutStreamHandler
+from ai_toolkits.audio.tts import NullBackend
+
+
+async def run(wav_path: str, base_url: str, args) -> RealTimeTask:
+    client = ScriptedChatClient(ttft_ms=args.ttft_ms)
+    if args.speak:
+        handler = SpeakOutStreamHandler(
+            async_client=client, tts_backend=NullBackend(synth_ms_per_char=args.synth_ms_per_char))
+    else:
+        handler = ConversationStreamHandler(async_client=client, renderer=HeadlessRenderer())
+    task = RealTimeTask(
+        audio_input_provider=FileAudioReader(wav_path, speed=1.0, emit_frames=True),
+        text_handler=handler,
+        stt_service=TencentASR(vad_silence=args.vad_silence, base_url=base_url, stream_partials=True),
+        trace_conversation=False,
+        latency_report=args.report,
+        verbose=False,
+    )
+    await task.run()
+    return task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=6)
+    parser.add_argument("--vad-silence", type=int, default=500, help="server VAD silence (ms)")
+    parser.add_argument("--ttft-ms", type=float, default=400, help="scripted LLM time to first token")
+    parser.add_argument("--speak", action="store_true", help="speak replies through a simulated TTS backend")
+    parser.add_argument("--synth-ms-per-char", type=float, default=5.0)
+    parser.add_argument("--report", default=None, help="write the histograms (.prom for Prometheus, else JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        synth_speech_wav(wav_path, utterances=args.utterances, silence_ms=max(1200, args.vad_silence + 800))
+        with local_asr_server() as base_url:
+            task = asyncio.run(run(wav_path, base_url, args))
+    print(task.latency.summary())
+
+
+if __name__ == "__main__":
+    main()
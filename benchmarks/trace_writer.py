@@ -0,0 +1,99 @@
+"""
+Conversation trace cost on the event loop: shutdown ``json.dump`` vs. ``TraceWriter``.
+
+``dump`` is the previous behaviour: the whole history is written with
+``json.dump(..., indent=4)`` when the session ends, blocking the loop, and
+nothing is on disk before that. ``jsonl`` / ``jsonl.gz`` write one record per
+turn through ``TraceWriter``. For each mode the benchmark reports the time
+spent on the calling (loop) thread per turn and at shutdown, how many turns
+were readable from disk before shutdown and the bytes written.
+
+Usage:
+    python benchmarks/trace_writer.py --turns 5000 --reply-chars 400
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import tempfile
+import time
+
+from common import print_table
+
+from ai_toolkits.audio.trace import TraceWriter, read_trace
+
+
+def make_turn(i: int, reply_chars: int) -> dict:
+    now = time.time() * 1000
+    return {
+        "turn": i,
+        "user": f"第{i}个问题：今天天气怎么样？",
+        "reply": ("今天天气晴朗，适合出门散步。" * reply_chars)[:reply_chars],
+        "asr_final_ms": now,
+        "llm_first_token_ms": now + 350,
+        "llm_done_ms": now + 1200,
+        "prompt_tokens": 800 + i,
+        "completion_tokens": reply_chars,
+    }
+
+
+async def run(mode: str, args) -> dict:
+    directory = tempfile.mkdtemp(prefix="trace-bench-")
+    turns = [make_turn(i, args.reply_chars) for i in range(args.turns)]
+    per_turn = 0.0
+
+    if mode == "dump":
+        history = []
+        for turn in turns:
+            start = time.perf_counter()
+            history.append({"role": "user", "content": turn["user"]})
+            history.append({"role": "assistant", "content": turn["reply"]})
+            per_turn += time.perf_counter() - start
+        on_disk = 0
+        start = time.perf_counter()
+        with open(os.path.join(directory, "conversation_history.json"), "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, indent=4)
+        shutdown = time.perf_counter() - start
+    else:
+        trace = TraceWriter(directory, max_bytes=args.max_bytes, compress=mode == "jsonl.gz")
+        for turn in turns:
+            start = time.perf_counter()
+            trace.write(turn)
+            per_turn += time.perf_counter() - start
+            await asyncio.sleep(0)
+        # Give the writer thread a moment, as the gaps between real turns would
+        await asyncio.sleep(0.5)
+        on_disk = sum(1 for path in trace.files for _ in read_trace(path))
+        start = time.perf_counter()
+        await trace.aclose()
+        shutdown = time.perf_counter() - start
+
+    files = glob.glob(os.path.join(directory, "*"))
+    return {
+        "mode": mode,
+        "loop_us_per_turn": per_turn / args.turns * 1e6,
+        "shutdown_ms": shutdown * 1000,
+        "turns_on_disk_before_exit": on_disk,
+        "files": len(files),
+        "bytes": sum(os.path.getsize(path) for path in files),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--reply-chars", type=int, default=400)
+    parser.add_argument("--max-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--modes", default="dump,jsonl,jsonl.gz")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rows = [asyncio.run(run(mode, args)) for mode in args.modes.split(",")]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Sentence TTS: serial speak-inline vs. the pipelined TTSPipeline.
+
+The serial baseline mirrors the previous ``SpeakOutStreamHandler``: each
+sentence is synthesized and played inside the token loop, so the LLM stream
+stalls while speaking and every sentence waits for its own synthesis. The
+pipelined run uses ``SpeakOutStreamHandler`` with the same simulated backend.
+
+Reported per mode (mean over replies): time to first audio, mean/max gap
+between sentences, time until the LLM stream was fully consumed and total
+reply time.
+
+Usage:
+    python benchmarks/tts_pipeline.py --synth-ms-per-char 15 --chars-per-second 15
+"""
+
+import argparse
+import asyncio
+import time
+
+from common import ScriptedChatClient, print_table
+
+from ai_toolkits.audio.text_processor import SpeakOutStreamHandler
+from ai_toolkits.audio.tts import NullBackend, SentenceSegmenter, TTSStats
+
+
+async def serial_reply(client, backend) -> dict:
+    stats = TTSStats()
+    stream = await client.chat.completions.create(model="gpt-4.1", messages=[], stream=True)
+    segmenter = SentenceSegmenter()
+    last_end = None
+
+    async def speak(sentence):
+        nonlocal last_end
+        clip = await backend.synthesize(sentence)
+        start = time.monotonic()
+        if stats.first_audio_at is None:
+            stats.first_audio_at = start
+        else:
+            stats.gaps_ms.append((start - last_end) * 1000)
+        stats.sentences += 1
+        await backend.play(clip)
+        last_end = time.monotonic()
+
+    async for chunk in stream:
+        for sentence in segmenter.feed(chunk.choices[0].delta.content):
+            await speak(sentence)
+    consumed_at = time.monotonic()
+    if (rest := segmenter.flush()):
+        await speak(rest)
+    return {**stats.to_dict(),
+            "llm_consumed_ms": (consumed_at - stats.started_at) * 1000,
+            "reply_ms": (time.monotonic() - stats.started_at) * 1000}
+
+
+async def pipelined_reply(client, backend) -> dict:
+    handler = SpeakOutStreamHandler(async_client=client, tts_backend=backend)
+    consumed = []
+    original = client._stream
+
+    async def tracking_stream(*args):
+        async for chunk in original(*args):
+            yield chunk
+        consumed.append(time.monotonic())
+
+    client._stream = tracking_stream
+    start = time.monotonic()
+    try:
+        await handler.do_process("hello")
+    finally:
+        client._stream = original
+        await handler.close()
+    return {**handler.tts_stats[-1],
+            "llm_consumed_ms": (consumed[0] - start) * 1000,
+            "reply_ms": (time.monotonic() - start) * 1000}
+
+
+async def run(mode, args) -> dict:
+    rows = []
+    for _ in range(args.replies):
+        client = ScriptedChatClient(ttft_ms=args.ttft_ms, tokens_per_s=args.tokens_per_s, reply_tokens=args.reply_tokens)
+        backend = NullBackend(synth_ms_per_char=args.synth_ms_per_char, chars_per_second=args.chars_per_second)
+        if mode == "serial":
+            rows.append(await serial_reply(client, backend))
+            await backend.close()
+        else:
+            rows.append(await pipelined_reply(client, backend))
+    mean = {k: sum(r[k] for r in rows) / len(rows) for k in rows[0]}
+    return {"mode": mode, **mean}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replies", type=int, default=3)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-s", type=float, default=40)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--synth-ms-per-char", type=float, default=10)
+    parser.add_argument("--chars-per-second", type=float, default=15)
+    args = parser.parse_args()
+
+    rows = [asyncio.run(run(mode, args)) for mode in ("serial", "pipelined")]
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+End-to-end benchmark of the real-time voice pipeline against LocalASRServer.
+
+Every session replays the same synthetic recording through
+``FileAudioReader -> TencentASR -> text handler`` and the benchmark reports,
+for each concurrency level:
+
+- per-session and aggregate throughput (seconds of audio per wall second)
+- p50/p95/p99 end-of-speech -> text latency (includes the server VAD silence;
+  only meaningful for paced replay, with ``--speed 0`` it is measured from
+  the session start)
+- client CPU seconds per session
+- with ``--vad``, the fraction of audio the client-side VAD did not send
+
+Usage:
+    python benchmarks/voice_pipeline.py --sessions 1,4,16,64 --speed 1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import List
+
+from common import local_asr_server, percentiles, print_table, synth_speech_wav
+
+from ai_toolkits.audio.base import BaseTextHandler
+from ai_toolkits.audio.file_reader import FileAudioReader
+from ai_toolkits.audio.real_time import RealTimeTask
+from ai_toolkits.audio.tencent_asr import TencentASR
+from ai_toolkits.audio.vad import EnergyVAD
+
+
+class LatencyProbeHandler(BaseTextHandler):
+    """Record end-of-speech -> text latency for the synthetic utterances."""
+
+    def __init__(self, reader: FileAudioReader, end_offsets: List[float]):
+        super().__init__()
+        self.reader = reader
+        self.end_offsets = end_offsets
+        self.latencies: List[float] = []
+
+    async def do_process(self, text: str) -> str:
+        now = asyncio.get_running_loop().time()
+        speed = self.reader.speed or float("inf")
+        for index in re.findall(r"utterance (\d+)", text):
+            end_of_speech = self.reader.started_at + self.end_offsets[int(index)] / speed
+            self.latencies.append(now - end_of_speech)
+        return text
+
+
+def build_session(wav_path, end_offsets, base_url, speed, vad_silence, use_vad, stt_kwargs=None) -> RealTimeTask:
+    reader = FileAudioReader(wav_path, speed=speed)
+    return RealTimeTask(
+        audio_input_provider=reader,
+        text_handler=LatencyProbeHandler(reader, end_offsets),
+        stt_service=TencentASR(vad_silence=vad_silence, base_url=base_url,
+                               vad=EnergyVAD() if use_vad else None, **(stt_kwargs or {})),
+        trace_conversation=False,
+        verbose=False,
+    )
+
+
+async def run_sessions(n, wav_path, end_offsets, base_url, speed, vad_silence, use_vad=False, stt_kwargs=None) -> dict:
+    sessions = [build_session(wav_path, end_offsets, base_url, speed, vad_silence, use_vad, stt_kwargs)
+                for _ in range(n)]
+
+    async def timed(session):
+        start = time.perf_counter()
+        await session.run()
+        return time.perf_counter() - start
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    durations = await asyncio.gather(*(timed(s) for s in sessions))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    audio_seconds = [s.audio_input_provider.audio_seconds_sent for s in sessions]
+    latencies = [lat for s in sessions for lat in s.text_handler.latencies]
+    expected = len(end_offsets) * n
+    vads = [s.stt_service.vad for s in sessions if s.stt_service.vad is not None]
+    return {
+        "sessions": n,
+        "wall_s": wall,
+        "session_rtf": sum(a / d for a, d in zip(audio_seconds, durations)) / n,
+        "aggregate_rtf": sum(audio_seconds) / wall,
+        **{f"lat_{k}_ms": v * 1000 for k, v in percentiles(latencies).items()},
+        "texts": f"{len(latencies)}/{expected}",
+        "cpu_s_per_session": cpu / n,
+        "vad_saved": sum(v.saved_ratio for v in vads) / len(vads) if vads else 0.0,
+        "ws_messages": sum(s.stt_service.send_stats["messages"] for s in sessions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,4,16", help="comma separated concurrency levels")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, 0 = as fast as possible")
+    parser.add_argument("--utterances", type=int, default=5)
+    parser.add_argument("--vad-silence", type=int, default=500, help="server VAD silence (ms)")
+    parser.add_argument("--delay-ms", type=float, default=50, help="server recognition delay")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="server recognition jitter")
+    parser.add_argument("--vad", action="store_true", help="enable the client-side EnergyVAD")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    levels = [int(n) for n in args.sessions.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "speech.wav")
+        end_offsets = synth_speech_wav(wav_path, utterances=args.utterances)
+
+        rows = []
+        with local_asr_server(recognition_delay_ms=args.delay_ms, jitter_ms=args.jitter_ms) as base_url:
+            for n in levels:
+                rows.append(asyncio.run(run_sessions(
+                    n, wav_path, end_offsets, base_url, args.speed, args.vad_silence, args.vad)))
+
+    print_table(rows, list(rows[0].keys()))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()